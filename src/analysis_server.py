@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from analyzer import analyze_pdf_in_worker, init_worker
+from logger import logger, set_log_level
+from models import GameResult
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class LRUCache:
+    """
+    Size-bounded least-recently-used cache.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class AnalysisService:
+    """
+    Analyzes PDFs in a warm process pool and caches the results by the SHA-256
+    of the PDF content.
+
+    An analysis that exceeds timeout seconds fails with asyncio.TimeoutError,
+    and the pool is killed and replaced, since a hung worker cannot be
+    stopped on its own.
+    """
+
+    def __init__(
+        self,
+        executor_factory: Callable[[], ProcessPoolExecutor],
+        cache_size: int,
+        timeout: float,
+    ):
+        self._executor_factory = executor_factory
+        self.executor = executor_factory()
+        self.timeout = timeout
+        self.cache = LRUCache(cache_size)
+        # 同じPDFへの同時リクエストは1回の解析を共有する
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    def _recycle_executor(self, executor: ProcessPoolExecutor) -> None:
+        # 他のリクエストが既に作り直していれば何もしない
+        if executor is not self.executor:
+            return
+        logger.warning("解析が%s秒を超えたため、ワーカーを再起動します。", self.timeout)
+        # ProcessPoolExecutorには実行中のワーカーを止める公開APIがない。
+        # 送信途中のPDFで止まった送信スレッドを終了時に待たないようにしてから止める
+        executor._call_queue.cancel_join_thread()
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._executor_factory()
+
+    async def _run_in_pool(
+        self, pdf_bytes: bytes
+    ) -> tuple[GameResult, dict[str, float]]:
+        loop = asyncio.get_running_loop()
+        while True:
+            executor = self.executor
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, analyze_pdf_in_worker, pdf_bytes),
+                    timeout=self.timeout,
+                )
+            except asyncio.TimeoutError:
+                self._recycle_executor(executor)
+                raise
+            except BrokenProcessPool:
+                # 他のリクエストの時間切れでプールが作り直された場合はやり直す
+                if executor is self.executor:
+                    raise
+
+    async def analyze(self, pdf_bytes: bytes) -> dict:
+        """
+        Returns the analysis of the PDF as a JSON-serializable dict.
+
+        Args:
+            pdf_bytes (bytes): The content of the PDF.
+
+        Returns:
+            dict: The Stats of both teams and their starting field positions.
+
+        Raises:
+            asyncio.TimeoutError: If the analysis exceeds the timeout.
+        """
+        key = hashlib.sha256(pdf_bytes).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+        if key in self._in_flight:
+            shared = await asyncio.shield(self._in_flight[key])
+            return {**shared, "cached": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            game_result, stage_timings = await self._run_in_pool(pdf_bytes)
+            response = {
+                "sha256": key,
+                **game_result.model_dump(mode="json"),
+                "stage_timings": stage_timings,
+            }
+            self.cache.put(key, response)
+            future.set_result(response)
+            return {**response, "cached": False}
+        except Exception as exc:
+            future.set_exception(exc)
+            # 共有先がいない場合に "exception was never retrieved" を出さない
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def handle(
+        self, method: str, target: str, headers: dict[str, str], body: bytes
+    ) -> tuple[HTTPStatus, dict]:
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/health":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "cache_entries": len(self.cache),
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+            }
+        if url.path != "/analyze":
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"{url.path} is not found")
+        if method not in ("GET", "POST"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed")
+
+        pdf_path = parse_qs(url.query).get("path", [None])[0]
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        if pdf_path is None and content_type == "application/json" and body:
+            try:
+                pdf_path = json.loads(body).get("path")
+            except (json.JSONDecodeError, AttributeError) as exc:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid JSON body") from exc
+
+        if pdf_path is not None:
+            try:
+                pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+            except OSError as exc:
+                raise HTTPError(
+                    HTTPStatus.NOT_FOUND, f"{pdf_path} cannot be read"
+                ) from exc
+        elif method == "POST" and body:
+            pdf_bytes = body
+        else:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                "POST the PDF as the request body or pass ?path=...",
+            )
+
+        try:
+            return HTTPStatus.OK, await self.analyze(pdf_bytes)
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {
+                "error": f"analysis exceeded {self.timeout} seconds"
+            }
+        except Exception as exc:  # noqa: BLE001
+            # 解析中のどんな例外も、そのPDFを処理できないエラーとして返す
+            cause = getattr(exc, "cause", exc)
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {
+                "error": str(cause),
+                "exception": type(cause).__name__,
+                "stage": getattr(exc, "stage", None),
+            }
+
+    async def serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Handles one HTTP/1.1 request per connection.
+        """
+        try:
+            try:
+                status, payload = await self._read_and_handle(reader)
+            except HTTPError as exc:
+                status, payload = exc.status, {"error": exc.message}
+            except (asyncio.IncompleteReadError, ValueError, UnicodeDecodeError):
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": "bad request"}
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                (
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("ascii")
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            logger.debug("client disconnected")
+        finally:
+            writer.close()
+
+    async def _read_and_handle(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[HTTPStatus, dict]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        content_length = int(headers.get("content-length", "0"))
+        if content_length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "PDF is too large")
+        body = await reader.readexactly(content_length) if content_length else b""
+        logger.info("%s %s (%d bytes)", method, target, len(body))
+        return await self.handle(method, target, headers, body)
+
+
+async def run_server(
+    host: str,
+    port: int,
+    config_path: Path,
+    workers: int,
+    cache_size: int,
+    ready: asyncio.Future | None = None,
+    timeout: float = 120.0,
+) -> None:
+    """
+    Starts the HTTP service and serves until cancelled.
+
+    Args:
+        host (str): The address to bind.
+        port (int): The port to bind. 0 picks a free port.
+        config_path (Path): The path to config.json loaded by each worker.
+        workers (int): The number of worker processes.
+        cache_size (int): The maximum number of cached results.
+        ready (asyncio.Future, optional): Set to the bound port once listening.
+        timeout (float): The time budget per PDF in seconds.
+    """
+    # イベントループのスレッドを抱えたままforkしないよう、ワーカーはspawnで起動する
+    service = AnalysisService(
+        partial(
+            ProcessPoolExecutor,
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(config_path,),
+        ),
+        cache_size,
+        timeout,
+    )
+    try:
+        server = await asyncio.start_server(service.serve_connection, host, port)
+        bound_port = server.sockets[0].getsockname()[1]
+        logger.info("http://%s:%d で待ち受けています。", host, bound_port)
+        if ready is not None:
+            ready.set_result(bound_port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+@click.command()
+@click.argument("config_path", type=Path, default="config.json")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8080, show_default=True)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="解析を行うワーカープロセスの数",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help="メモリに保持する解析結果の最大数",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=120.0,
+    show_default=True,
+    help="1つのPDFの解析に許容する秒数。超えた場合は504を返し、ワーカーを再起動する",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    config_path: Path,
+    host: str,
+    port: int,
+    workers: int,
+    cache_size: int,
+    timeout: float,
+    log_level: str,
+):
+    set_log_level(log_level)
+    try:
+        asyncio.run(
+            run_server(host, port, config_path, workers, cache_size, timeout=timeout)
+        )
+    except KeyboardInterrupt:
+        logger.info("サーバーを終了します。")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
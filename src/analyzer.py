@@ -0,0 +1,550 @@
+from collections.abc import Callable, Collection, Iterable
+from concurrent.futures import Executor
+from functools import cache
+from itertools import repeat
+from pathlib import Path
+
+import polars as pl
+import pymupdf  # type: ignore
+
+from break_drive_chart import get_drives, get_series, get_starting_field_position
+from break_personal_stats import (
+    get_kick_off_return_stat,
+    get_player_stats,
+    get_punt_stat,
+)
+from break_team_stats import (
+    break_down_team_stats,
+    extract_fg_stats,
+    extract_fumble,
+    extract_pr_yards,
+    extract_score,
+    extract_td_count,
+    extract_time_possession,
+    get_third_down_info,
+)
+from extractor_cache import ExtractorCache, pdf_digest
+from logics import (
+    ExtractedYards,
+    TeamsExtractedYards,
+    get_kicking_score,
+    get_redzone_info,
+    get_yards,
+)
+from metrics import StageTimer
+from models import (
+    FIELD_TIERS,
+    Config,
+    FGInfo,
+    GameResult,
+    KickoffReturnInfo,
+    PenaltyInfo,
+    PuntInfo,
+    RedzoneInfo,
+    SeriesStatsInfo,
+    StartingFieldPosition,
+    Stats,
+    TeamFGInfo,
+    TeamKickoffReturnInfo,
+    TeamPenaltyInfo,
+    TeamPuntInfo,
+    TeamRedzoneInfo,
+    TeamSeriesStatsInfo,
+    TeamStartingFieldPosition,
+    TeamTouchDownInfo,
+    TouchDownInfo,
+)
+from page_layout import extract_header_lines, extract_summary_table
+from utils import (
+    load_config_from_file,
+    load_team_names_from_file,
+    open_pdf,
+    pdf_document_to_list,
+    stats_to_flat_dict,
+)
+
+PdfSource = Path | str | bytes | pymupdf.Document
+
+# ワーカープロセスごとに一度だけ読み込む設定とチーム名
+_worker_context: dict = {}
+
+
+class GameAnalysisError(Exception):
+    """
+    Raised when one of the extraction stages fails for a game.
+
+    Attributes:
+        stage (str): The name of the stage that failed.
+        cause (Exception): The original exception raised by the stage.
+    """
+
+    def __init__(self, stage: str, cause: Exception):
+        super().__init__(f"{stage}: {type(cause).__name__}: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+    def __reduce__(self):
+        # ワーカープロセスから親プロセスへ送れるようにする
+        return (self.__class__, (self.stage, self.cause))
+
+
+def resolve_fields(fields: Collection[str]) -> tuple[str, ...]:
+    """
+    Validates the requested field tiers and returns them in FIELD_TIERS order.
+    boxscore is always included because the team names are read from page 0.
+
+    Raises:
+        ValueError: If an unknown tier is requested.
+    """
+    unknown = set(fields) - set(FIELD_TIERS)
+    if unknown:
+        raise ValueError(f"不明なフィールドです: {', '.join(sorted(unknown))}")
+    return tuple(
+        tier for tier in FIELD_TIERS if tier == "boxscore" or tier in set(fields)
+    )
+
+
+def _run_stage(
+    stage: str,
+    stage_callback: Callable[[str], None] | None,
+    func: Callable,
+    *args,
+    **kwargs,
+):
+    """
+    Runs a single extraction stage, tagging any failure with the stage name.
+    """
+    if stage_callback is not None:
+        stage_callback(stage)
+    try:
+        return func(*args, **kwargs)
+    except Exception as exc:
+        raise GameAnalysisError(stage, exc) from exc
+
+
+def analyze_pdf(
+    pdf_path: PdfSource,
+    config: Config,
+    team_names_list: list[str],
+    team_abbreviation_dict: dict[str, str],
+    team_abbreviation_by_team_dict: dict[str, str],
+    stage_callback: Callable[[str], None] | None = None,
+    fields: Collection[str] = FIELD_TIERS,
+    extractor_cache: ExtractorCache | None = None,
+) -> GameResult:
+    """
+    Runs the extractors of the requested field tiers against one PDF and
+    assembles the Stats of both teams.
+
+    Only the pages needed by the requested tiers are read; the Stats fields of
+    the other tiers keep empty placeholder values (see GameResult.fields).
+
+    Args:
+        pdf_path (PdfSource): The path to the PDF file of the game, its content
+            or an opened pymupdf.Document.
+        config (Config): The configuration used to build Stats.
+        team_names_list (list[str]): The team names loaded from teams.json.
+        team_abbreviation_dict (dict[str, str]): Abbreviation -> team name.
+        team_abbreviation_by_team_dict (dict[str, str]): Team name -> abbreviation.
+        stage_callback (Callable[[str], None], optional):
+            Called with the stage name before each stage starts.
+        fields (Collection[str]): The field tiers to extract (see FIELD_TIERS).
+        extractor_cache (ExtractorCache, optional): Where the outputs of the
+            extractors are reused and stored; only the extractors whose
+            version or inputs changed are run (see EXTRACTOR_VERSIONS).
+
+    Returns:
+        GameResult: The Stats of both teams and their starting field positions.
+
+    Raises:
+        GameAnalysisError: If any stage fails.
+    """
+    requested = resolve_fields(fields)
+
+    def run_extractor(stage: str, func: Callable, *args):
+        # 版と入力が前回と同じ段階は、保存しておいた出力を使う
+        if extractor_cache is None or pdf_key is None:
+            return _run_stage(stage, stage_callback, func, *args)
+        return _run_stage(
+            stage,
+            stage_callback,
+            extractor_cache.get_or_run,
+            stage,
+            pdf_key,
+            func,
+            *args,
+        )
+
+    pdf_document = _run_stage("open_pdf", stage_callback, open_pdf, pdf_path)
+    pdf_key = pdf_digest(pdf_path) if extractor_cache is not None else None
+    stat_table = run_extractor(
+        "extract_summary_table", extract_summary_table, pdf_document
+    )
+    header_lines = run_extractor(
+        "extract_header_lines", extract_header_lines, pdf_document
+    )
+    # チーム名は1ページ目から取得するため、boxscoreは常に抽出する
+    team_break_down_stats_info = run_extractor(
+        "break_down_team_stats",
+        break_down_team_stats,
+        stat_table,
+        header_lines,
+        team_names_list,
+    )
+    team_list_in_file = [
+        team_break_down_stats_info.home_team_break_down_stats.team_name,
+        team_break_down_stats_info.visitor_team_break_down_stats.team_name,
+    ]
+    team_abbreviation_in_file = [
+        team_abbreviation_by_team_dict[team] for team in team_list_in_file
+    ]
+    team_third_down_stats = run_extractor(
+        "get_third_down_info", get_third_down_info, stat_table
+    )
+    team_fumble_info = run_extractor("extract_fumble", extract_fumble, stat_table)
+    score_tuple = run_extractor("extract_score", extract_score, stat_table)
+    team_time_possession = run_extractor(
+        "extract_time_possession",
+        extract_time_possession,
+        stat_table,
+    )
+    team_pr_info = run_extractor("extract_pr_yards", extract_pr_yards, stat_table)
+
+    if "playbyplay" in requested:
+        same_line_words_list = run_extractor(
+            "open_pdf_to_list", pdf_document_to_list, pdf_document
+        )
+        team_extracted_yards, team_penalty_info = run_extractor(
+            "get_yards",
+            get_yards,
+            pdf_document,
+            team_abbreviation_dict,
+            team_list_in_file,
+        )
+        team_redzone_info = run_extractor(
+            "get_redzone_info",
+            get_redzone_info,
+            same_line_words_list,
+            team_list_in_file,
+            team_abbreviation_in_file,
+        )
+        kicking_score_tuple = run_extractor(
+            "get_kicking_score",
+            get_kicking_score,
+            same_line_words_list,
+            team_list_in_file,
+        )
+        team_fg_stats = run_extractor(
+            "extract_fg_stats",
+            extract_fg_stats,
+            stat_table,
+            same_line_words_list,
+            team_list_in_file,
+        )
+        team_td_info = run_extractor(
+            "extract_td_count",
+            extract_td_count,
+            team_list_in_file,
+            same_line_words_list,
+        )
+    else:
+        team_extracted_yards = TeamsExtractedYards(
+            home_team_extracted_yards=ExtractedYards(
+                team_name=team_list_in_file[0], rushing_yards=[], passing_yards=[]
+            ),
+            visitor_team_extracted_yards=ExtractedYards(
+                team_name=team_list_in_file[1], rushing_yards=[], passing_yards=[]
+            ),
+        )
+        team_penalty_info = TeamPenaltyInfo(
+            home_team_penalty_info=PenaltyInfo(count=0, yards=0),
+            visitor_team_penalty_info=PenaltyInfo(count=0, yards=0),
+        )
+        empty_redzone_info = RedzoneInfo(
+            play_count=0, fg_score_count=0, touchdown_count=0, series_count=0
+        )
+        team_redzone_info = TeamRedzoneInfo(
+            home_team_redzone_info=empty_redzone_info,
+            visitor_team_redzone_info=empty_redzone_info,
+        )
+        kicking_score_tuple = (0, 0)
+        empty_fg_info = FGInfo(
+            fg_success=0,
+            fg_blocks=0,
+            fg_block_yards=0,
+            fg_trials=0,
+            fg_good_trial_yards=0,
+        )
+        team_fg_stats = TeamFGInfo(
+            home_fg_info=empty_fg_info, visitor_fg_info=empty_fg_info
+        )
+        empty_td_info = TouchDownInfo(run_touchdown=0, pass_touchdown=0)
+        team_td_info = TeamTouchDownInfo(
+            home_team_touchdown_info=empty_td_info,
+            visitor_team_touchdown_info=empty_td_info,
+        )
+
+    if "drives" in requested:
+        drives = run_extractor(
+            "get_drives",
+            get_drives,
+            pdf_document,
+            team_list_in_file,
+            team_abbreviation_in_file,
+        )
+        team_series_info = run_extractor(
+            "get_series", get_series, drives, team_list_in_file
+        )
+        team_starting_field_position = run_extractor(
+            "get_starting_field_position",
+            get_starting_field_position,
+            drives,
+            team_list_in_file,
+        )
+    else:
+        drives = []
+        empty_series_info = SeriesStatsInfo(series_count=0, score_count=0)
+        team_series_info = TeamSeriesStatsInfo(
+            home_series_stats=empty_series_info,
+            visitor_series_stats=empty_series_info,
+        )
+        team_starting_field_position = TeamStartingFieldPosition(
+            home_team_starting_field_position=StartingFieldPosition(field_position=[]),
+            visitor_team_starting_field_position=StartingFieldPosition(
+                field_position=[]
+            ),
+        )
+
+    if "personal" in requested:
+        player_stats = run_extractor(
+            "get_player_stats",
+            get_player_stats,
+            pdf_document,
+            team_list_in_file,
+        )
+        team_kickoff_return_stats = run_extractor(
+            "get_kick_off_return_stat",
+            get_kick_off_return_stat,
+            player_stats,
+            team_list_in_file,
+        )
+        team_punt_stats = run_extractor(
+            "get_punt_stat",
+            get_punt_stat,
+            player_stats,
+            team_list_in_file,
+        )
+    else:
+        player_stats = []
+        empty_kickoff_return_info = KickoffReturnInfo(return_num=0, return_yards=0)
+        team_kickoff_return_stats = TeamKickoffReturnInfo(
+            home_kickoff_return_info=empty_kickoff_return_info,
+            visitor_kickoff_return_info=empty_kickoff_return_info,
+        )
+        empty_punt_info = PuntInfo(punt_num=0, punt_yards=0)
+        team_punt_stats = TeamPuntInfo(
+            home_punt_info=empty_punt_info, visitor_punt_info=empty_punt_info
+        )
+
+    stats_list = []
+    for (
+        extracted_yards,
+        third_down_stats,
+        penalty_info,
+        redzone_info,
+        team_stats_info,
+        series_info,
+        fumble_info,
+        score,
+        kicking_score,
+        kickoff_return_stats,
+        punt_stats,
+        fg_stats,
+        time_possession,
+        pr_info,
+        td_info,
+    ) in [
+        (
+            team_extracted_yards.home_team_extracted_yards,
+            team_third_down_stats.home_team_third_down_stats,
+            team_penalty_info.home_team_penalty_info,
+            team_redzone_info.home_team_redzone_info,
+            team_break_down_stats_info.home_team_break_down_stats,
+            team_series_info.home_series_stats,
+            team_fumble_info.home_team_fumble_info,
+            score_tuple[0],
+            kicking_score_tuple[0],
+            team_kickoff_return_stats.home_kickoff_return_info,
+            team_punt_stats.home_punt_info,
+            team_fg_stats.home_fg_info,
+            team_time_possession.home_team_time_possession,
+            team_pr_info.home_team_PRInfo,
+            team_td_info.home_team_touchdown_info,
+        ),
+        (
+            team_extracted_yards.visitor_team_extracted_yards,
+            team_third_down_stats.visitor_team_third_down_stats,
+            team_penalty_info.visitor_team_penalty_info,
+            team_redzone_info.visitor_team_redzone_info,
+            team_break_down_stats_info.visitor_team_break_down_stats,
+            team_series_info.visitor_series_stats,
+            team_fumble_info.visitor_team_fumble_info,
+            score_tuple[1],
+            kicking_score_tuple[1],
+            team_kickoff_return_stats.visitor_kickoff_return_info,
+            team_punt_stats.visitor_punt_info,
+            team_fg_stats.visitor_fg_info,
+            team_time_possession.visitor_team_time_possession,
+            team_pr_info.visitor_team_PRInfo,
+            team_td_info.visitor_team_touchdown_info,
+        ),
+    ]:
+        stats_list.append(
+            _run_stage(
+                "build_stats",
+                stage_callback,
+                Stats,
+                team_score=score,
+                offense_score=score - kicking_score,
+                run_yards=extracted_yards.rushing_yards,
+                pass_yards=extracted_yards.passing_yards,
+                third_down_stats=third_down_stats,
+                penalty_info=penalty_info,
+                fumble_info=fumble_info,
+                redzone_info=redzone_info,
+                team_stats_info=team_stats_info,
+                series_info=series_info,
+                config=config,
+                kickoff_return_stats=kickoff_return_stats,
+                punt_stats=punt_stats,
+                fg_stats=fg_stats,
+                time_possession=time_possession,
+                pr_info=pr_info,
+                run_td=td_info.run_touchdown,
+                pass_td=td_info.pass_touchdown,
+            )
+        )
+
+    return GameResult(
+        home_stats=stats_list[0],
+        visitor_stats=stats_list[1],
+        field_position=team_starting_field_position,
+        page_count=len(pdf_document),
+        player_stats=player_stats,
+        drives=drives,
+        fields=requested,
+    )
+
+
+@cache
+def load_analysis_context(
+    config_path: Path, teams_path: Path
+) -> tuple[Config, tuple[list[str], dict[str, str], dict[str, str]]]:
+    """
+    Loads config.json and teams.json once per process and path.
+
+    Returns:
+        tuple: The Config and the team names returned by load_team_names_from_file.
+    """
+    return load_config_from_file(config_path), load_team_names_from_file(teams_path)
+
+
+def analyze_game(
+    source: PdfSource,
+    config_path: Path = Path("config.json"),
+    teams_path: Path = Path("teams.json"),
+) -> GameResult:
+    """
+    Analyzes one game in memory. Nothing is written to the filesystem.
+
+    Args:
+        source (PdfSource): The path to the PDF file, its content or an opened
+            pymupdf.Document.
+        config_path (Path): The path to config.json.
+        teams_path (Path): The path to teams.json.
+
+    Returns:
+        GameResult: The Stats of both teams and their starting field positions.
+
+    Raises:
+        GameAnalysisError: If any stage fails.
+    """
+    config, team_names = load_analysis_context(Path(config_path), Path(teams_path))
+    return analyze_pdf(source, config, *team_names)
+
+
+def game_results_to_frame(game_results: Iterable[GameResult]) -> pl.DataFrame:
+    """
+    Builds the per-game stats table (one row per team and game) with the same
+    columns as the per-game CSV files, ready for summarize_stats.
+    """
+    return pl.DataFrame(
+        [
+            stats_to_flat_dict(stats, game_result.fields)
+            for game_result in game_results
+            for stats in (game_result.home_stats, game_result.visitor_stats)
+        ]
+    )
+
+
+def analyze_games(
+    sources: Iterable[PdfSource],
+    executor: Executor | None = None,
+    config_path: Path = Path("config.json"),
+    teams_path: Path = Path("teams.json"),
+) -> pl.DataFrame:
+    """
+    Analyzes several games in memory and returns their per-game stats rows.
+
+    Args:
+        sources (Iterable[PdfSource]): The PDFs to analyze.
+        executor (Executor, optional): Runs analyze_game concurrently when given.
+            PyMuPDF is not thread safe, so use a ProcessPoolExecutor with paths
+            or bytes as sources.
+        config_path (Path): The path to config.json.
+        teams_path (Path): The path to teams.json.
+
+    Returns:
+        pl.DataFrame: Two rows per game (home, visitor) in the order of sources.
+    """
+    if executor is None:
+        game_results = (
+            analyze_game(source, config_path, teams_path) for source in sources
+        )
+    else:
+        game_results = executor.map(
+            analyze_game, sources, repeat(config_path), repeat(teams_path)
+        )
+    return game_results_to_frame(game_results)
+
+
+def init_worker(config_path: Path, teams_path: Path = Path("teams.json")) -> None:
+    """
+    Loads config.json and teams.json once in a pool worker process.
+
+    Args:
+        config_path (Path): The path to config.json.
+        teams_path (Path): The path to teams.json.
+    """
+    config, team_names = load_analysis_context(Path(config_path), Path(teams_path))
+    _worker_context["config"] = config
+    _worker_context["team_names"] = team_names
+
+
+def analyze_pdf_in_worker(
+    pdf_path: Path | bytes,
+) -> tuple[GameResult, dict[str, float]]:
+    """
+    Analyzes one PDF (a path or its content) with the context loaded by init_worker.
+
+    Returns:
+        tuple[GameResult, dict[str, float]]: The result and the stage timings.
+    """
+    stage_timer = StageTimer()
+    game_result = analyze_pdf(
+        pdf_path,
+        _worker_context["config"],
+        *_worker_context["team_names"],
+        stage_callback=stage_timer,
+    )
+    return game_result, stage_timer.finish()
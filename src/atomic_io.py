@@ -0,0 +1,82 @@
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import polars as pl
+
+TMP_SUFFIX = ".tmp"
+
+
+def tmp_path_for(file_path: Path) -> Path:
+    """
+    Returns the temporary path used while file_path is being written.
+
+    The name does not end with the original suffix, so globs such as
+    "*stats*.csv" never pick up a half-written file.
+    """
+    return file_path.with_name(f".{file_path.name}{TMP_SUFFIX}")
+
+
+@contextmanager
+def atomic_write(
+    file_path: Path, newline: str | None = None, encoding: str = "utf-8"
+) -> Iterator[IO[str]]:
+    """
+    Opens a temporary file for writing and renames it to file_path on success.
+
+    Readers see either the previous file or the complete new file, never a
+    partially written one, even if the process is killed mid-write.
+
+    Args:
+        file_path (Path): The final path of the file.
+        newline (str, optional): Passed to open().
+        encoding (str): Passed to open().
+
+    Yields:
+        IO[str]: The file object to write to.
+    """
+    file_path = Path(file_path)
+    tmp_path = tmp_path_for(file_path)
+    try:
+        with open(tmp_path, "w", newline=newline, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_parquet(df: "pl.DataFrame", file_path: Path) -> None:
+    """
+    Writes df to file_path as Parquet through a temporary file, like atomic_write.
+    """
+    file_path = Path(file_path)
+    tmp_path = tmp_path_for(file_path)
+    try:
+        df.write_parquet(tmp_path, statistics=True)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_bytes(data: bytes, file_path: Path) -> None:
+    """
+    Writes data to file_path through a temporary file, like atomic_write.
+    """
+    file_path = Path(file_path)
+    tmp_path = tmp_path_for(file_path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -1,88 +1,224 @@
+import polars as pl
 import pymupdf
-from logger import logger
-from models import TeamStartingFieldPosition, StartingFieldPosition
-
-
-def get_drive_chart_page(pdf_document: pymupdf.Document):
-    margin = 3
-    same_line_words = []
-    for page_num in range(len(pdf_document)):
-        page = pdf_document.load_page(page_num)
-        words = page.get_text()
-        tmp_same_line = []
-        current_y0 = 0
-        if "ドライブチャート" in words:
-            current_words = page.get_text("words")
-            for word in current_words:
-                if word[1] - current_y0 < margin:
-                    tmp_same_line.append(word[4])
-                else:
-                    same_line_words.append(" ".join(tmp_same_line))
-                    tmp_same_line = [word[4]]
-                    current_y0 = word[1]
-            drive_chart_idx = same_line_words.index("ドライブチャート")
-            return same_line_words[drive_chart_idx:]
-    raise ValueError("ドライブチャートが見つかりません")
+from models import (
+    Drive,
+    FieldPositionRecord,
+    SeriesStatsInfo,
+    TeamSeriesStatsInfo,
+    TeamStartingFieldPosition,
+    StartingFieldPosition,
+)
+from page_layout import parse_clock
+from text_lines import TextLine, find_page_with_text, page_lines
 
+# 見出し行の文字位置から列の境界を決めるときの余裕(pt)
+DRIVE_COLUMN_SLACK = 6.0
+DRIVE_SCHEMA = {
+    "team_name": pl.String,
+    "opponent_name": pl.String,
+    "quarter": pl.Int64,
+    "start_time": pl.String,
+    "end_time": pl.String,
+    "possession_seconds": pl.Int64,
+    "start_play": pl.String,
+    "start_yard_line": pl.Int64,
+    "play_count": pl.Int64,
+    "gain_yards": pl.Int64,
+    "penalty_yards": pl.Int64,
+    "total_yards": pl.Int64,
+    "first_downs": pl.Int64,
+    "end_yard_line": pl.Int64,
+    "result": pl.String,
+    "scored": pl.Boolean,
+    "points": pl.Int64,
+}
 
-def get_starting_field_position(
+
+def get_drive_chart_lines(pdf_document: pymupdf.Document) -> list[TextLine]:
+    page_num = find_page_with_text(pdf_document, "ドライブチャート")
+    if page_num < 0:
+        raise ValueError("ドライブチャートが見つかりません")
+    lines = page_lines(pdf_document, page_num)
+    drive_chart_idx = next(
+        ct for ct, line in enumerate(lines) if line.text == "ドライブチャート"
+    )
+    return lines[drive_chart_idx:]
+
+
+def _clock_to_seconds(clock: str) -> int:
+    minutes, seconds = parse_clock(clock)
+    return minutes * 60 + seconds
+
+
+def _own_yard_line(ball_on: list[str], own_abbreviation: str) -> int:
+    # "FF 20" のように陣地のチーム略称とヤードで記載されている。
+    # 50ヤードラインはどちらの陣地でもないため "50" とだけ記載される
+    if len(ball_on) == 1:
+        return int(ball_on[0])
+    side, yard = ball_on
+    return int(yard) if side == own_abbreviation else 100 - int(yard)
+
+
+def _parse_drive_row(
+    columns: list[list[str]],
+    team_name: str,
+    opponent_name: str,
+    own_abbreviation: str,
+) -> Drive:
+    total_yards = int(columns[9][0])
+    start_yard_line = _own_yard_line(columns[5], own_abbreviation)
+    if columns[11] and int(columns[11][-1]) != 0:
+        end_yard_line = _own_yard_line(columns[11], own_abbreviation)
+    else:
+        # ファンブルでは終了位置が空欄、ゴールラインはどちらの陣地でも "0" と
+        # 記載されるため、開始位置と獲得ヤードから求める
+        end_yard_line = min(max(start_yard_line + total_yards, 0), 100)
+    return Drive(
+        team_name=team_name,
+        opponent_name=opponent_name,
+        quarter=int(columns[0][0]),
+        start_time=columns[1][0],
+        end_time=columns[2][0],
+        possession_seconds=_clock_to_seconds(columns[3][0]),
+        start_play=" ".join(columns[4]),
+        start_yard_line=start_yard_line,
+        play_count=int(columns[6][0]),
+        gain_yards=int(columns[7][0]),
+        penalty_yards=int(columns[8][0]),
+        total_yards=total_yards,
+        first_downs=int(columns[10][0]),
+        end_yard_line=end_yard_line,
+        result=" ".join(columns[12]),
+    )
+
+
+def get_drives(
     pdf_document: pymupdf.Document,
     team_name_in_file: list[str],
     team_abbreviation_in_file: list[str],
+) -> list[Drive]:
+    """
+    Parses every drive of both teams from the ドライブチャート page.
+
+    The page has one table per team (home first), each introduced by the
+    team name and a two-line header. The x positions of the second header
+    line give the column boundaries, so multi-word cells such as
+    "4th Down ×" stay in their column.
+
+    Args:
+        pdf_document (pymupdf.Document): The PDF document of the game.
+        team_name_in_file (list[str]): The home and visitor team names.
+        team_abbreviation_in_file (list[str]): Their abbreviations.
+
+    Returns:
+        list[Drive]: The drives in the order of the page.
+
+    Raises:
+        ValueError: If the page or a team's table is not found.
+    """
+    # チームごとの(チーム名, 相手チーム名, 略称)を先に組み立てておく
+    teams = [
+        (team_name, team_name_in_file[1 - index], team_abbreviation_in_file[index])
+        for index, team_name in enumerate(team_name_in_file)
+    ]
+    drives: list[Drive] = []
+    team = None
+    boundaries = None
+    for line in get_drive_chart_lines(pdf_document):
+        first_word = line.words[0][4]
+        # ドライブの行は必ずクォーターの数字から始まる
+        if boundaries is not None and first_word.isdigit():
+            drives.append(_parse_drive_row(line.columns(*boundaries), *team))
+            continue
+        if first_word == "攻撃時間":
+            break
+        if first_word == "Q":
+            if team is not None:
+                # 列の左端は、右寄せの数値が見出しより少し左に出る分だけ余裕を持たせる
+                boundaries = [word[0] - DRIVE_COLUMN_SLACK for word in line.words[1:]]
+            continue
+        text = line.text
+        matched_teams = [team for team in teams if team[0] in text]
+        if len(matched_teams) == 1:
+            team = matched_teams[0]
+            boundaries = None
+    found_teams = {drive.team_name for drive in drives}
+    for team_name in team_name_in_file:
+        if team_name not in found_teams:
+            raise ValueError(f"{team_name}のドライブチャートが見つかりません")
+    return drives
+
+
+def drives_to_frame(drives: list[Drive]) -> pl.DataFrame:
+    """
+    Returns the drives as a columnar table, with the scored and points columns.
+    """
+    return pl.DataFrame(
+        [
+            {**drive.model_dump(), "scored": drive.scored, "points": drive.points}
+            for drive in drives
+        ],
+        schema=DRIVE_SCHEMA,
+    )
+
+
+def summarize_drives(drives_frame: pl.DataFrame) -> pl.DataFrame:
+    """
+    Returns drive efficiency per team over all the drives in drives_frame.
+
+    Points count touchdowns as 6 and field goals as 3 (PATs are not part of
+    the drive chart).
+    """
+    return (
+        drives_frame.group_by("team_name")
+        .agg(
+            pl.len().alias("drives"),
+            pl.col("scored").sum().alias("scoring_drives"),
+            pl.col("points").mean().alias("points_per_drive"),
+            pl.col("total_yards").mean().alias("yards_per_drive"),
+            pl.col("play_count").mean().alias("plays_per_drive"),
+            pl.col("start_yard_line").mean().alias("average_start_yard_line"),
+        )
+        .sort("team_name")
+    )
+
+
+def get_series(
+    drives: list[Drive], team_name_in_file: list[str]
+) -> TeamSeriesStatsInfo:
+    series_stats = [
+        SeriesStatsInfo(
+            series_count=sum(drive.team_name == team_name for drive in drives),
+            score_count=sum(
+                drive.team_name == team_name and drive.scored for drive in drives
+            ),
+        )
+        for team_name in team_name_in_file
+    ]
+    return TeamSeriesStatsInfo(
+        home_series_stats=series_stats[0], visitor_series_stats=series_stats[1]
+    )
+
+
+def get_starting_field_position(
+    drives: list[Drive], team_name_in_file: list[str]
 ) -> TeamStartingFieldPosition:
-    same_line_words = get_drive_chart_page(pdf_document)
-    start_ct = 0
-    team_index = 0
-    home_field_position_dict_list = []
-    visitor_field_position_dict_list = []
-    for ct, word in enumerate(same_line_words):
-        for team_name in team_name_in_file:
-            if team_name in word:
-                team_index = team_name_in_file.index(team_name)
-        logger.debug("word in get fp: %s", word)
-        if "攻守交代時プレイ" in word:
-            logger.debug("攻守交代時プレイが見つかりました。")
-            start_ct = ct + 1
-            for word in same_line_words[start_ct:]:
-                logger.debug("word in get_stating_field_position: %s", word)
-                # if word in team_name_in_file:
-                #     break
-                if any(team_name in word for team_name in team_name_in_file):
-                    logger.debug("Team name is found in starting fp process")
-                    break
-                split_words = word.split(" ")
-                for ct, split_word in enumerate(split_words):
-                    if split_word in team_abbreviation_in_file:
-                        split_word_index = team_abbreviation_in_file.index(split_word)
-                        if split_word_index == team_index:
-                            field_position = split_words[ct + 1]
-                        else:
-                            field_position = 100 - int(split_words[ct + 1])
-                        if "Good" in split_words or "TouchDown" in split_words:
-                            field_pos_dict = {
-                                "team_name": team_name_in_file[team_index],
-                                "opponent_name": team_name_in_file[1 - team_index],
-                                "field_position": int(field_position),
-                                "score": 1,
-                            }
-                        else:
-                            field_pos_dict = {
-                                "team_name": team_name_in_file[team_index],
-                                "opponent_name": team_name_in_file[1 - team_index],
-                                "field_position": int(field_position),
-                                "score": 0,
-                            }
-                        if team_index == 0:
-                            home_field_position_dict_list.append(field_pos_dict)
-                        else:
-                            visitor_field_position_dict_list.append(field_pos_dict)
-                        logger.debug("field_pos: %s", field_pos_dict)
-                        break
+    field_positions: list[list[FieldPositionRecord]] = [[], []]
+    home_team_name = team_name_in_file[0]
+    for drive in drives:
+        field_positions[drive.team_name != home_team_name].append(
+            FieldPositionRecord(
+                team_name=drive.team_name,
+                opponent_name=drive.opponent_name,
+                field_position=drive.start_yard_line,
+                score=int(drive.scored),
+            )
+        )
     return TeamStartingFieldPosition(
         home_team_starting_field_position=StartingFieldPosition(
-            field_position=home_field_position_dict_list
+            field_position=field_positions[0]
         ),
         visitor_team_starting_field_position=StartingFieldPosition(
-            field_position=visitor_field_position_dict_list,
+            field_position=field_positions[1],
         ),
     )
@@ -1,73 +1,180 @@
 import pymupdf
-from models import KickoffReturnInfo, TeamKickoffReturnInfo, TeamPuntInfo, PuntInfo
-
-
-def get_personal_stats_page(pdf_document: pymupdf.Document):
-    margin = 3
-    same_line_words = []
-    for page_num in range(len(pdf_document)):
-        page = pdf_document.load_page(page_num)
-        words = page.get_text()
-        tmp_same_line = []
-        current_y0 = 0
-        if "個人スタッツ" in words:
-            current_words = page.get_text("words")
-            for word in current_words:
-                if word[1] - current_y0 < margin:
-                    tmp_same_line.append(word[4])
-                else:
-                    same_line_words.append(" ".join(tmp_same_line))
-                    tmp_same_line = [word[4]]
-                    current_y0 = word[1]
-            return same_line_words
-    raise ValueError("個人スタッツが見つかりません")
-
-
-def get_kick_off_return_stat(pdf_document: pymupdf.Document) -> TeamKickoffReturnInfo:
-    same_line_words = get_personal_stats_page(pdf_document)
-    ko_idx = 0
-    for ct, word in enumerate(same_line_words):
-        if "KICKOFF RETURNS " in word:
-            ko_idx = ct
-    for word in same_line_words[ko_idx:]:
-        if "Total" in word:
-            split_words = word.split(" ")
-            home_return_num = split_words[1]
-            home_return_yards = split_words[2]
-            visitor_return_num = split_words[8]
-            visitor_return_yards = split_words[9]
-            return TeamKickoffReturnInfo(
-                home_kickoff_return_info=KickoffReturnInfo(
-                    return_num=int(home_return_num), return_yards=int(home_return_yards)
-                ),
-                visitor_kickoff_return_info=KickoffReturnInfo(
-                    return_num=int(visitor_return_num),
-                    return_yards=int(visitor_return_yards),
-                ),
-            )
-    raise ValueError("KICKOFF RETURNS data not found")
-
-
-def get_punt_stat(pdf_document: pymupdf.Document) -> TeamPuntInfo:
-    same_line_words = get_personal_stats_page(pdf_document)
-    ko_idx = 0
-    for ct, word in enumerate(same_line_words):
-        if "PUNTING" in word:
-            ko_idx = ct
-    for word in same_line_words[ko_idx:]:
-        if "Total" in word:
-            split_words = word.split(" ")
-            home_return_num = split_words[1]
-            home_return_yards = split_words[2]
-            visitor_return_num = split_words[9]
-            visitor_return_yards = split_words[10]
-            return TeamPuntInfo(
-                home_punt_info=PuntInfo(
-                    punt_num=int(home_return_num), punt_yards=int(home_return_yards)
-                ),
-                visitor_punt_info=PuntInfo(
-                    punt_num=int(visitor_return_num),
-                    punt_yards=int(visitor_return_yards),
-                ),
-            )
-    raise ValueError("KICKOFF RETURNS data not found")
+from logger import logger
+from models import (
+    KickoffReturnInfo,
+    PlayerStat,
+    TeamKickoffReturnInfo,
+    TeamPuntInfo,
+    PuntInfo,
+)
+from text_lines import TextLine, find_page_with_text, page_lines
+
+# 個人スタッツのページは左半分がホーム、右半分がビジターの表になっている
+TEAM_COLUMN_SPLIT_X = 297.0
+# 左右に並ぶ表の見出し
+TWO_TEAM_SECTIONS = (
+    "RUSHING",
+    "PASSING",
+    "PASS RECEIVING",
+    "INTERCEPTIONS",
+    "PUNTING",
+    "PUNT RETURNS",
+    "KICKOFF RETURNS",
+    "その他RETURNS",
+)
+# ページ幅いっぱいの表がチームごとに縦に並ぶ見出し
+FULL_WIDTH_SECTIONS = ("FUMBLES",)
+TOTAL_ROW = "Total"
+
+
+def get_personal_stats_page(pdf_document: pymupdf.Document) -> list[TextLine]:
+    page_num = find_page_with_text(pdf_document, "個人スタッツ")
+    if page_num < 0:
+        raise ValueError("個人スタッツが見つかりません")
+    return page_lines(pdf_document, page_num)
+
+
+def _match_section(words: list[str], sections: tuple[str, ...]) -> str | None:
+    text = " ".join(words)
+    return next((section for section in sections if text.startswith(section)), None)
+
+
+def _stat_names(header_words: list[str], section: str) -> list[str]:
+    # 同じ名前の列(FUMBLESのYDS, TDなど)は2つ目以降に連番を付ける
+    names: list[str] = []
+    for name in header_words[len(section.split(" ")) :]:
+        count = names.count(name) + sum(n.startswith(f"{name}_") for n in names)
+        names.append(name if count == 0 else f"{name}_{count + 1}")
+    return names
+
+
+def _parse_player_row(
+    words: list[str], team_name: str, section: str, stat_names: list[str]
+) -> list[PlayerStat]:
+    """Parses "#No name values..." (or "Total values...") into PlayerStat rows."""
+    if len(words) <= len(stat_names):
+        return []
+    name_words = words[: -len(stat_names)]
+    try:
+        values = [float(value) for value in words[-len(stat_names) :]]
+    except ValueError:
+        logger.debug("個人スタッツの行を読み飛ばしました: %s", words)
+        return []
+    number = ""
+    if name_words[0].startswith("#"):
+        number = name_words[0][1:]
+        name_words = name_words[1:]
+    player = " ".join(name_words)
+    return [
+        PlayerStat(
+            team_name=team_name,
+            section=section,
+            number=number,
+            player=player,
+            stat=stat,
+            value=value,
+        )
+        for stat, value in zip(stat_names, values)
+    ]
+
+
+def get_player_stats(
+    pdf_document: pymupdf.Document, team_list_in_file: list[str]
+) -> list[PlayerStat]:
+    """
+    Reads every section of the 個人スタッツ page for both teams in one pass.
+
+    The two-team sections (RUSHING, PASSING, ...) have the home table on the
+    left half of the page and the visitor table on the right half. FUMBLES
+    spans the page width, once per team, home first.
+
+    Args:
+        pdf_document (pymupdf.Document): The PDF document of the game.
+        team_list_in_file (list[str]): The home and visitor team names.
+
+    Returns:
+        list[PlayerStat]: One row per player, section and stat, including the
+            "Total" rows of each team.
+    """
+    player_stats: list[PlayerStat] = []
+    section = None
+    full_width_count = 0
+    stat_names: list[list[str]] = []
+    team_names: list[str] = []
+    for line in get_personal_stats_page(pdf_document):
+        left, right = line.columns(TEAM_COLUMN_SPLIT_X)
+        if two_team_section := _match_section(left, TWO_TEAM_SECTIONS):
+            section = two_team_section
+            stat_names = [_stat_names(left, section), _stat_names(right, section)]
+            team_names = team_list_in_file
+            continue
+        if full_width_section := _match_section(left, FULL_WIDTH_SECTIONS):
+            section = full_width_section
+            stat_names = [_stat_names(left + right, section)]
+            team_names = [team_list_in_file[min(full_width_count, 1)]]
+            full_width_count += 1
+            continue
+        if section is None:
+            continue
+        row_columns = [left, right] if len(stat_names) == 2 else [left + right]
+        for words, team_name, names in zip(row_columns, team_names, stat_names):
+            player_stats.extend(_parse_player_row(words, team_name, section, names))
+    if not player_stats:
+        raise ValueError("個人スタッツの表が見つかりません")
+    return player_stats
+
+
+def get_team_totals(
+    player_stats: list[PlayerStat],
+    team_list_in_file: list[str],
+    section: str,
+    stat: str,
+) -> tuple[int, int]:
+    """
+    Returns the home and visitor "Total" values of a section's stat.
+
+    Raises:
+        ValueError: If either team's Total row is missing.
+    """
+    totals = {
+        row.team_name: int(row.value)
+        for row in player_stats
+        if row.section == section and row.player == TOTAL_ROW and row.stat == stat
+    }
+    if any(team_name not in totals for team_name in team_list_in_file):
+        raise ValueError(f"{section}のTotalが見つかりません")
+    return totals[team_list_in_file[0]], totals[team_list_in_file[1]]
+
+
+def get_kick_off_return_stat(
+    player_stats: list[PlayerStat], team_list_in_file: list[str]
+) -> TeamKickoffReturnInfo:
+    home_num, visitor_num = get_team_totals(
+        player_stats, team_list_in_file, "KICKOFF RETURNS", "NO"
+    )
+    home_yards, visitor_yards = get_team_totals(
+        player_stats, team_list_in_file, "KICKOFF RETURNS", "YDS"
+    )
+    return TeamKickoffReturnInfo(
+        home_kickoff_return_info=KickoffReturnInfo(
+            return_num=home_num, return_yards=home_yards
+        ),
+        visitor_kickoff_return_info=KickoffReturnInfo(
+            return_num=visitor_num, return_yards=visitor_yards
+        ),
+    )
+
+
+def get_punt_stat(
+    player_stats: list[PlayerStat], team_list_in_file: list[str]
+) -> TeamPuntInfo:
+    home_num, visitor_num = get_team_totals(
+        player_stats, team_list_in_file, "PUNTING", "NO"
+    )
+    home_yards, visitor_yards = get_team_totals(
+        player_stats, team_list_in_file, "PUNTING", "YDS"
+    )
+    return TeamPuntInfo(
+        home_punt_info=PuntInfo(punt_num=home_num, punt_yards=home_yards),
+        visitor_punt_info=PuntInfo(punt_num=visitor_num, punt_yards=visitor_yards),
+    )
@@ -1,145 +1,93 @@
+import re
+from functools import cache
+
 import pymupdf  # type: ignore  # noqa
+
+from keyword_matcher import play_matcher
 from logics import get_fg_blocks, get_good_fg_trial_yards
 from models import (
-    TeamBreakDownStatsInfo,
-    ThirdDownStats,
-    TeamThirdDownStats,
     BreakDownStatsInfo,
-    PassingAttempsInfo,
-    TeamPassingAttemptsInfo,
-    FumbleInfo,
-    TeamFumbleInfo,
     FGInfo,
-    TeamFGInfo,
-    TimePossession,
-    TeamTimePossession,
+    FumbleInfo,
+    PassingAttempsInfo,
     PRInfo,
+    TeamBreakDownStatsInfo,
+    TeamFGInfo,
+    TeamFumbleInfo,
+    TeamPassingAttemptsInfo,
     TeamPRInfo,
-    TouchDownInfo,
+    TeamThirdDownStats,
+    TeamTimePossession,
     TeamTouchDownInfo,
+    ThirdDownStats,
+    TimePossession,
+    TouchDownInfo,
+)
+from page_layout import (
+    StatTable,
+    parse_clock,
+    parse_counts,
+    parse_int,
+    parse_ratio,
 )
-from logger import logger
-from utils import open_pdf_to_list_only_page
-import re
-
-
-def get_third_down_info(pdf_document: pymupdf.Document) -> TeamThirdDownStats:
-    # 1枚目のページを取得
-    page = pdf_document.load_page(0)
-
-    # 行単位でテキストを出力
-    text = page.get_text("text")
-    lines = text.split("\n")
-
-    third_down_idx = None
-    for ct, line in enumerate(lines):
-        if "3rd Down" in line:
-            third_down_idx = ct
-
-    if third_down_idx is None:
-        raise ValueError("3rd Downの情報が見つかりませんでした。")
 
-    # "3rd Down コンバージョン"と書かれた箇所の次にホームチームの3rdダウン成功数と試行数が記載されている
-    # その次にビジターチームの3rdダウン成功数と試行数が記載されている
-    home_team_3rd_down_success = lines[third_down_idx + 1].split("(")[0].split("/")[0]
-    home_team_3rd_down_numbers = lines[third_down_idx + 1].split("(")[0].split("/")[1]
-    visitor_team_3rd_down_success = (
-        lines[third_down_idx + 2].split("(")[0].split("/")[0]
-    )
-    visitor_team_3rd_down_numbers = (
-        lines[third_down_idx + 2].split("(")[0].split("/")[1]
-    )
 
+def get_third_down_info(stat_table: StatTable) -> TeamThirdDownStats:
+    # "3rd Down コンバージョン"の行に "成功数/試行数(更新率)" の形式で記載されている
+    home_3rd_down, visitor_3rd_down = stat_table.parse("3rd Down", parse_ratio)
     return TeamThirdDownStats(
         home_team_third_down_stats=ThirdDownStats(
-            third_down_success=home_team_3rd_down_success,
-            third_down_numbers=home_team_3rd_down_numbers,
+            third_down_success=home_3rd_down[0],
+            third_down_numbers=home_3rd_down[1],
         ),
         visitor_team_third_down_stats=ThirdDownStats(
-            third_down_success=visitor_team_3rd_down_success,
-            third_down_numbers=visitor_team_3rd_down_numbers,
+            third_down_success=visitor_3rd_down[0],
+            third_down_numbers=visitor_3rd_down[1],
         ),
     )
 
 
-def extract_stat(same_line_words, stat_name):
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if stat_name in line:
-            logger.debug("%sが見つかりました。", stat_name)
-            logger.debug(words)
-            return words[1], words[2]
-    raise ValueError(f"{stat_name}が見つかりませんでした。")
+def extract_stat(stat_table: StatTable, stat_name: str) -> tuple[int, int]:
+    return stat_table.parse(stat_name, parse_int)
 
 
-def extract_pass_attempts(same_line_words, stat_name) -> TeamPassingAttemptsInfo:
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if stat_name in line:
-            logger.debug("%sが見つかりました。", stat_name)
-            logger.debug(words)
-            home_attempts, home_completion, home_interception = words[-2].split("-")
-            visitor_attempts, visitor_completion, visitor_interception = words[
-                -1
-            ].split("-")
-            return TeamPassingAttemptsInfo(
-                home_info=PassingAttempsInfo(
-                    attempts=int(home_attempts),
-                    completion=int(home_completion),
-                    interception=int(home_interception),
-                ),
-                visitor_info=PassingAttempsInfo(
-                    attempts=int(visitor_attempts),
-                    completion=int(visitor_completion),
-                    interception=int(visitor_interception),
-                ),
-            )
-
-    raise ValueError(f"{stat_name}が見つかりませんでした。")
-
-
-def extract_fumble(same_line_words: list[str]) -> TeamFumbleInfo:
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if "FUMBLE" in line:
-            logger.debug("%sが見つかりました。", "FUMBLE")
-            logger.debug(words)
-            home_fumble, home_lost = words[-2].split("-")
-            visitor_fumble, visitor_lost = words[-1].split("-")
-            return TeamFumbleInfo(
-                home_team_fumble_info=FumbleInfo(
-                    fumble=int(home_fumble),
-                    lost=int(home_lost),
-                ),
-                visitor_team_fumble_info=FumbleInfo(
-                    fumble=int(visitor_fumble),
-                    lost=int(visitor_lost),
-                ),
-            )
-    raise ValueError("FUMBLEが見つかりませんでした。")
+def extract_pass_attempts(
+    stat_table: StatTable, stat_name: str
+) -> TeamPassingAttemptsInfo:
+    home_counts, visitor_counts = stat_table.parse(stat_name, parse_counts)
+    home_attempts, home_completion, home_interception = home_counts
+    visitor_attempts, visitor_completion, visitor_interception = visitor_counts
+    return TeamPassingAttemptsInfo(
+        home_info=PassingAttempsInfo(
+            attempts=home_attempts,
+            completion=home_completion,
+            interception=home_interception,
+        ),
+        visitor_info=PassingAttempsInfo(
+            attempts=visitor_attempts,
+            completion=visitor_completion,
+            interception=visitor_interception,
+        ),
+    )
+
+
+def extract_fumble(stat_table: StatTable) -> TeamFumbleInfo:
+    (home_fumble, home_lost), (visitor_fumble, visitor_lost) = stat_table.parse(
+        "FUMBLE", parse_counts
+    )
+    return TeamFumbleInfo(
+        home_team_fumble_info=FumbleInfo(fumble=home_fumble, lost=home_lost),
+        visitor_team_fumble_info=FumbleInfo(fumble=visitor_fumble, lost=visitor_lost),
+    )
 
 
 def extract_fg_stats(
-    same_line_words: list[str], team_list_in_file: list[str]
+    stat_table: StatTable, same_line_words: list[str], team_list_in_file: list[str]
 ) -> TeamFGInfo:
-    home_fg = None
-    home_fg_success = None
-    visitor_fg = None
-    visitor_fg_success = None
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if "Field Goal成功数" in line:
-            logger.debug("%sが見つかりました。", "FG")
-            logger.debug(words)
-            home_fg_success, home_fg = words[-2].split("-")
-            visitor_fg_success, visitor_fg = words[-1].split("-")
-    if (
-        home_fg is None
-        or visitor_fg is None
-        or home_fg_success is None
-        or visitor_fg_success is None
-    ):
-        raise ValueError("FGが見つかりませんでした。")
+    # 成功数・総数は1ページ目の表から、ブロックと成功距離はプレイバイプレイから取得する
+    (home_fg_success, home_fg), (visitor_fg_success, visitor_fg) = stat_table.parse(
+        "Field Goal成功数", parse_counts
+    )
     home_fg_blocks, home_fg_block_yards, visitor_fg_blocks, visitor_fg_block_yards = (
         get_fg_blocks(same_line_words, team_list_in_file)
     )
@@ -148,54 +96,38 @@ def extract_fg_stats(
     )
     return TeamFGInfo(
         home_fg_info=FGInfo(
-            fg_success=int(home_fg_success),
+            fg_success=home_fg_success,
             fg_blocks=int(home_fg_blocks),
             fg_block_yards=int(home_fg_block_yards),
-            fg_trials=int(home_fg),
+            fg_trials=home_fg,
             fg_good_trial_yards=int(home_fg_trials),
         ),
         visitor_fg_info=FGInfo(
-            fg_success=int(visitor_fg_success),
+            fg_success=visitor_fg_success,
             fg_blocks=int(visitor_fg_blocks),
             fg_block_yards=int(visitor_fg_block_yards),
-            fg_trials=int(visitor_fg),
+            fg_trials=visitor_fg,
             fg_good_trial_yards=int(visitor_fg_trials),
         ),
     )
 
 
-def extract_score(same_line_words: list[str]) -> tuple[int, int]:
-    home_score = None
-    visitor_score = None
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if "ホーム" in line:
-            logger.debug("%sが見つかりました。", "得点")
-            logger.debug(words)
-            home_score = int(words[-1])
-        if "ビジター" in line:
-            logger.debug("%sが見つかりました。", "得点")
-            logger.debug(words)
-            visitor_score = int(words[-1])
-        if home_score is not None and visitor_score is not None:
-            return home_score, visitor_score
-    raise ValueError("得点が見つかりませんでした。")
+def extract_score(stat_table: StatTable) -> tuple[int, int]:
+    return stat_table.parse("最終得点", parse_int)
 
 
 def break_down_team_stats(
-    pdf_document: pymupdf.Document, team_name_list: list[str]
+    stat_table: StatTable, header_lines: list[str], team_name_list: list[str]
 ) -> TeamBreakDownStatsInfo:
-    same_line_words = open_pdf_to_list_only_page(pdf_document, 0)
-
     home_team_name, visitor_team_name = get_home_visitor_team_name(
-        team_name_list, same_line_words
+        team_name_list, header_lines
     )
 
-    team_passing_attempts_info = extract_pass_attempts(same_line_words, "試投数")
+    team_passing_attempts_info = extract_pass_attempts(stat_table, "試投数")
 
-    home_run_gain, visitor_run_gain = extract_stat(same_line_words, "RUN獲得ヤード数")
-    home_run_play, visitor_run_play = extract_stat(same_line_words, "RUNプレイ数")
-    home_pass_gain, visitor_pass_gain = extract_stat(same_line_words, "PASS獲得ヤード")
+    home_run_gain, visitor_run_gain = extract_stat(stat_table, "RUN獲得ヤード数")
+    home_run_play, visitor_run_play = extract_stat(stat_table, "RUNプレイ数")
+    home_pass_gain, visitor_pass_gain = extract_stat(stat_table, "PASS獲得ヤード")
 
     return TeamBreakDownStatsInfo(
         home_team_break_down_stats=BreakDownStatsInfo(
@@ -217,12 +149,17 @@ def break_down_team_stats(
     )
 
 
+@cache
+def compile_team_name_pattern(team_names: tuple[str, ...]) -> re.Pattern:
+    return re.compile("|".join(re.escape(team) for team in team_names))
+
+
 def get_home_visitor_team_name(team_name_list, same_line_words):
     home_team_name = None
     visitor_team_name = None
+    pattern = compile_team_name_pattern(tuple(team_name_list))
     for line in same_line_words:
         if "vs" in line:
-            pattern = re.compile("|".join(re.escape(team) for team in team_name_list))
             matches = pattern.findall(line)
             if len(matches) == 2:
                 home_team_name, visitor_team_name = matches
@@ -232,76 +169,32 @@ def get_home_visitor_team_name(team_name_list, same_line_words):
     return home_team_name, visitor_team_name
 
 
-def extract_time_possession(same_line_words) -> TeamTimePossession:
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if "攻撃時間" in line:
-            logger.debug("%sが見つかりました。", "攻撃時間")
-            logger.debug(words)
-            home_possession_time_min, home_possession_time_sec = words[-2].split(":")
-            visitor_possession_time_min, visitor_possession_time_sec = words[-1].split(
-                ":"
-            )
-            return TeamTimePossession(
-                home_team_time_possession=TimePossession(
-                    minutes=int(home_possession_time_min),
-                    seconds=int(home_possession_time_sec),
-                ),
-                visitor_team_time_possession=TimePossession(
-                    minutes=int(visitor_possession_time_min),
-                    seconds=int(visitor_possession_time_sec),
-                ),
-            )
-    raise ValueError("攻撃時間が見つかりませんでした。")
-
-
-def extract_pr_yards(same_line_words: list[str]) -> TeamPRInfo:
-    home_pr_yards = None
-    home_pr_counts = None
-    visitor_pr_yards = None
-    visitor_pr_counts = None
-    for line in same_line_words:
-        words = [word for word in line.split(" ") if word]
-        if "PUNTリターン" in line:
-            logger.debug("%sが見つかりました。", "PR")
-            logger.debug(words)
-            if "--" in words[-2]:
-                home_pr_yards = int("-" + words[-2].split("--")[1])
-                home_pr_counts = int(words[-2].split("--")[0])
-            else:
-                home_pr_yards = int(words[-2].split("-")[1])
-                home_pr_counts = int(words[-2].split("-")[0])
-            if "--" in words[-1]:
-                visitor_pr_yards = int("-" + words[-1].split("--")[1])
-                visitor_pr_counts = int(words[-1].split("--")[0])
-            else:
-                visitor_pr_yards = int(words[-1].split("-")[1])
-                visitor_pr_counts = int(words[-1].split("-")[0])
-        if (
-            home_pr_yards is not None
-            and home_pr_counts is not None
-            and visitor_pr_yards is not None
-            and visitor_pr_counts is not None
-        ):
-            return TeamPRInfo(
-                home_team_PRInfo=PRInfo(
-                    return_num=home_pr_counts, return_yards=home_pr_yards
-                ),
-                visitor_team_PRInfo=PRInfo(
-                    return_num=visitor_pr_counts, return_yards=visitor_pr_yards
-                ),
-            )
-    raise ValueError("PRヤード数が見つかりませんでした。")
+def extract_time_possession(stat_table: StatTable) -> TeamTimePossession:
+    (home_min, home_sec), (visitor_min, visitor_sec) = stat_table.parse(
+        "攻撃時間", parse_clock
+    )
+    return TeamTimePossession(
+        home_team_time_possession=TimePossession(minutes=home_min, seconds=home_sec),
+        visitor_team_time_possession=TimePossession(
+            minutes=visitor_min, seconds=visitor_sec
+        ),
+    )
+
+
+def extract_pr_yards(stat_table: StatTable) -> TeamPRInfo:
+    # マイナスのヤードは "回数--ヤード" と記載されている
+    (home_num, home_yards), (visitor_num, visitor_yards) = stat_table.parse(
+        "PUNTリターン", parse_counts
+    )
+    return TeamPRInfo(
+        home_team_PRInfo=PRInfo(return_num=home_num, return_yards=home_yards),
+        visitor_team_PRInfo=PRInfo(return_num=visitor_num, return_yards=visitor_yards),
+    )
 
 
 def extract_td_count(
     team_name_list: list[str], same_line_words: list[str]
 ) -> TeamTouchDownInfo:
-    def count_touchdowns(team_name: str, td_type: str, line: str, td_counts: dict):
-        """タッチダウンのカウントを更新するヘルパー関数"""
-        if team_name in line and td_type in line:
-            td_counts[team_name][td_type] += 1
-
     # 初期化
     td_counts = {
         team_name_list[0]: {"RUN": 0, "PASS": 0},  # ホームチーム
@@ -315,11 +208,15 @@ def extract_td_count(
     if start_idx is None:
         raise ValueError("得点経過が見つかりませんでした。")
 
-    # "得点経過"以降の行を処理
-    for line in same_line_words[start_idx:]:
+    # "得点経過"以降の行を処理。チーム名とRUN/PASSを1回の検索で調べる
+    matcher = play_matcher(tuple(team_name_list))
+    for match in matcher.match_lines(same_line_words[start_idx:]):
+        keywords = match.keywords
         for team_name in team_name_list:
-            count_touchdowns(team_name, "RUN", line, td_counts)
-            count_touchdowns(team_name, "PASS", line, td_counts)
+            if team_name in keywords:
+                for td_type in ("RUN", "PASS"):
+                    if td_type in keywords:
+                        td_counts[team_name][td_type] += 1
 
     # 結果を返却
     return TeamTouchDownInfo(
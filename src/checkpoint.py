@@ -0,0 +1,136 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from atomic_io import TMP_SUFFIX
+from logger import logger
+
+JOURNAL_FILE_NAME = "journal.jsonl"
+# --ndjsonの出力は出力先にファイルを残さないため、CSVのジャーナルとは分けて記録する
+NDJSON_JOURNAL_FILE_NAME = "ndjson_journal.jsonl"
+FAILURE_REPORT_FILE_NAME = "failures.json"
+
+
+class JournalEntry(BaseModel):
+    game: str
+    pdf_path: str
+    # 解析したPDFのサイズと更新時刻(ns)。内容が変わったPDFは再解析する
+    size: int
+    mtime_ns: int
+    completed_at: str
+
+
+def file_signature(pdf_path: Path) -> tuple[int, int] | None:
+    """
+    Returns the size and mtime (ns) of a file, or None if it does not exist.
+    """
+    try:
+        stat = pdf_path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of the games whose outputs have been fully written.
+
+    One JSON line is appended and fsynced after each completed PDF, so a run
+    that is killed can be resumed without redoing finished games. Each entry
+    records the size and mtime of the analyzed PDF, so a corrected PDF saved
+    under the same name is analyzed again.
+    """
+
+    def __init__(
+        self, output_dir: Path, resume: bool, file_name: str = JOURNAL_FILE_NAME
+    ):
+        self.output_dir = output_dir
+        self.journal_path = output_dir / file_name
+        self._completed: dict[str, tuple[int, int]] = {}
+        if resume:
+            self._completed = self._load_completed_games()
+            removed = self.cleanup_partial_outputs()
+            logger.info(
+                "再開します。完了済み: %d試合, 削除した書きかけファイル: %d",
+                len(self._completed),
+                removed,
+            )
+        elif self.journal_path.exists():
+            self.journal_path.unlink()
+
+    def _load_completed_games(self) -> dict[str, tuple[int, int]]:
+        completed: dict[str, tuple[int, int]] = {}
+        if not self.journal_path.exists():
+            return completed
+        with open(self.journal_path, "rb+") as f:
+            # 書き込み途中で停止した場合、次の追記が同じ行に続かないよう改行を補う
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        with open(self.journal_path, "r", encoding="utf-8", errors="replace") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = JournalEntry(**json.loads(line))
+                except (json.JSONDecodeError, ValidationError, TypeError):
+                    # 書き込み途中で停止した最終行は無視する
+                    logger.warning(
+                        "%s の%d行目を読み込めませんでした。",
+                        self.journal_path,
+                        line_no,
+                    )
+                    continue
+                completed[entry.game] = (entry.size, entry.mtime_ns)
+        return completed
+
+    def cleanup_partial_outputs(self) -> int:
+        """
+        Removes temporary files left behind by an interrupted atomic write.
+
+        Returns:
+            int: The number of removed files.
+        """
+        removed = 0
+        for tmp_path in self.output_dir.glob(f".*{TMP_SUFFIX}"):
+            logger.debug("removing partial output: %s", tmp_path)
+            tmp_path.unlink()
+            removed += 1
+        return removed
+
+    def is_completed(self, pdf_path: Path) -> bool:
+        """
+        Returns whether pdf_path was completed and has not changed since.
+        """
+        recorded = self._completed.get(pdf_path.stem)
+        return recorded is not None and recorded == file_signature(pdf_path)
+
+    def record_completed(
+        self, pdf_path: Path, signature: tuple[int, int] | None = None
+    ) -> None:
+        """
+        Appends a completed game to the journal and flushes it to disk.
+
+        Args:
+            pdf_path (Path): The PDF whose outputs have all been written.
+            signature (tuple[int, int], optional): The size and mtime (ns) of
+                the PDF when it was analyzed. Read from the file if omitted.
+        """
+        size, mtime_ns = signature or file_signature(pdf_path) or (-1, -1)
+        entry = JournalEntry(
+            game=pdf_path.stem,
+            pdf_path=str(pdf_path),
+            size=size,
+            mtime_ns=mtime_ns,
+            completed_at=datetime.now().isoformat(timespec="seconds"),
+        )
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry.model_dump(), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._completed[entry.game] = (size, mtime_ns)
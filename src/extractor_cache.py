@@ -0,0 +1,130 @@
+import hashlib
+import json
+import pickle
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+import pydantic_core
+import pymupdf  # type: ignore
+
+from atomic_io import atomic_write_bytes
+from logger import logger
+
+# 抽出段階ごとの版。段階の関数(またはそれが使う解析処理)の出力が変わる修正では、
+# その段階の版を上げる。ここにない段階(open_pdf, build_stats)はキャッシュしない
+EXTRACTOR_VERSIONS: dict[str, int] = {
+    "extract_summary_table": 1,
+    "extract_header_lines": 1,
+    "break_down_team_stats": 1,
+    "get_third_down_info": 1,
+    "extract_fumble": 1,
+    "extract_score": 1,
+    "extract_time_possession": 1,
+    "extract_pr_yards": 1,
+    "open_pdf_to_list": 1,
+    "get_yards": 1,
+    "get_redzone_info": 1,
+    "get_kicking_score": 1,
+    "extract_fg_stats": 1,
+    "extract_td_count": 1,
+    "get_drives": 1,
+    "get_series": 1,
+    "get_starting_field_position": 1,
+    "get_player_stats": 1,
+    "get_kick_off_return_stat": 1,
+    "get_punt_stat": 1,
+}
+# 複数の段階が使う共通処理の版。ここを上げると全段階のキャッシュが無効になるため、
+# 共通処理の出力が変わる修正で、依存する段階の版を個別に上げる必要はない
+HELPER_VERSIONS: dict[str, int] = {
+    # 行の再構成 (text_lines.group_words_into_lines, page_lines)
+    "text_lines": 1,
+    # 1ページ目の表とヘッダーの切り出し
+    "page_layout": 1,
+    # プレイバイプレイの語の検索
+    "keyword_matcher": 1,
+}
+CACHE_SUFFIX = ".pkl"
+# 読めないキャッシュは再抽出する。それ以外の例外(アンピックルしたクラスの不具合など)は隠さない
+UNREADABLE_CACHE_ERRORS = (
+    OSError,
+    EOFError,
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+)
+
+
+def pdf_digest(source: Path | str | bytes | pymupdf.Document) -> str | None:
+    """
+    Returns the SHA-256 of a PDF given as a path or its content.
+
+    Returns:
+        str | None: The hex digest, or None for an already opened
+            pymupdf.Document, whose bytes on disk are unknown.
+    """
+    if isinstance(source, pymupdf.Document):
+        return None
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    return hashlib.sha256(Path(source).read_bytes()).hexdigest()
+
+
+class ExtractorCache:
+    """
+    The outputs of the extraction stages, stored per PDF, stage and version.
+
+    The key of a stage is the hash of its name, its EXTRACTOR_VERSIONS
+    entry and its inputs: the PDF hash for the pymupdf.Document argument
+    and the JSON of every other argument (the outputs of earlier stages,
+    the team names and so on). Bumping the version of one stage therefore
+    re-runs it, and the stages after it only if its output changed.
+    HELPER_VERSIONS is part of every key, so a change in a shared helper
+    re-runs every stage.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def stage_key(self, stage: str, pdf_key: str, args: Sequence[Any]) -> str:
+        inputs = [
+            (
+                pdf_key
+                if isinstance(arg, pymupdf.Document)
+                else hashlib.sha256(pydantic_core.to_json(arg)).hexdigest()
+            )
+            for arg in args
+        ]
+        payload = json.dumps(
+            [stage, EXTRACTOR_VERSIONS[stage], HELPER_VERSIONS, inputs], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{CACHE_SUFFIX}"
+
+    def get_or_run(self, stage: str, pdf_key: str, func: Callable, *args) -> Any:
+        """
+        Returns the stored output of func(*args) for stage, running and
+        storing it when there is none yet.
+
+        Args:
+            stage (str): The stage name, a key of EXTRACTOR_VERSIONS.
+            pdf_key (str): The pdf_digest of the PDF being analyzed.
+            func (Callable): The extractor.
+            *args: The arguments of func.
+        """
+        file_path = self.path_for(self.stage_key(stage, pdf_key, args))
+        if file_path.exists():
+            try:
+                with open(file_path, "rb") as f:
+                    return pickle.load(f)
+            except UNREADABLE_CACHE_ERRORS as exc:
+                logger.warning(
+                    "%s のキャッシュを読めないため再抽出します: %s", stage, exc
+                )
+        result = func(*args)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(pickle.dumps(result), file_path)
+        return result
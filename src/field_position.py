@@ -0,0 +1,337 @@
+import hashlib
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+import click
+import numpy as np
+import polars as pl
+from scipy.special import expit
+
+from atomic_io import atomic_write_parquet
+from logger import logger, set_log_level
+
+# main_multi.pyが試合ごとに書き出すフィールドポジションのCSV
+FIELD_POSITION_GLOB = "*_field_position.csv"
+FIELD_POSITION_FILE_PATTERN = r"([^/\\]+)_(?:home|visitor)_field_position\.csv$"
+# リーグ全体の行のチーム名
+LEAGUE = "全体"
+# 曲線を求める自陣からのヤード
+YARD_LINES = np.arange(1, 100)
+# 全チームが得点(または無得点)の区間でも係数が発散しないようにするL2罰則
+RIDGE_PENALTY = 1e-2
+NEWTON_ITERATIONS = 50
+NEWTON_TOLERANCE = 1e-10
+CURVE_CACHE_DIR_NAME = ".field_position_cache"
+
+
+def field_position_files(folders: Iterable[Path]) -> list[Path]:
+    """
+    Returns the per-game field-position CSVs in the given output folders.
+    """
+    return sorted(
+        file_path
+        for folder in folders
+        for file_path in Path(folder).glob(FIELD_POSITION_GLOB)
+    )
+
+
+def load_field_positions(files: list[Path]) -> pl.DataFrame:
+    """
+    Loads the per-game field-position CSVs into one season dataset.
+
+    Args:
+        files (list[Path]): The *_home/visitor_field_position.csv files,
+            possibly from several seasons.
+
+    Returns:
+        pl.DataFrame: One row per drive with game, team_name, opponent_name,
+            field_position (yards from the own goal line) and score (0/1).
+
+    Raises:
+        ValueError: If files is empty.
+    """
+    if not files:
+        raise ValueError("フィールドポジションのCSVが見つかりません")
+    return (
+        pl.scan_csv(
+            files,
+            schema={
+                "team_name": pl.String,
+                "opponent_name": pl.String,
+                "field_position": pl.Int64,
+                "score": pl.Int64,
+            },
+            include_file_paths="file_path",
+        )
+        .with_columns(
+            pl.col("file_path").str.extract(FIELD_POSITION_FILE_PATTERN).alias("game"),
+            (pl.col("score") > 0).cast(pl.Int8).alias("score"),
+        )
+        .select("game", "team_name", "opponent_name", "field_position", "score")
+        .collect()
+    )
+
+
+def _with_league(field_positions: pl.DataFrame) -> pl.DataFrame:
+    return pl.concat(
+        [field_positions, field_positions.with_columns(team_name=pl.lit(LEAGUE))]
+    )
+
+
+def bucket_scoring_rates(
+    field_positions: pl.DataFrame, bucket_size: int = 10
+) -> pl.DataFrame:
+    """
+    Returns the share of drives that scored per starting yard-line bucket,
+    per team and league-wide (team_name == LEAGUE).
+
+    Args:
+        field_positions (pl.DataFrame): The output of load_field_positions.
+        bucket_size (int): The width of a bucket in yards; bucket 20 covers
+            own 20 to own 20 + bucket_size - 1.
+
+    Returns:
+        pl.DataFrame: team_name, bucket, drives, scores and scoring_rate.
+    """
+    return (
+        _with_league(field_positions)
+        .with_columns(
+            (pl.col("field_position").clip(0, 99) // bucket_size * bucket_size).alias(
+                "bucket"
+            )
+        )
+        .group_by("team_name", "bucket")
+        .agg(
+            pl.len().alias("drives"),
+            pl.col("score").sum().alias("scores"),
+            pl.col("score").mean().alias("scoring_rate"),
+        )
+        .sort("team_name", "bucket")
+    )
+
+
+def _design_matrix(yard_lines: np.ndarray) -> np.ndarray:
+    # ヤードを0-1に縮めて、ニュートン法の条件を良くする
+    return np.column_stack([np.ones(len(yard_lines)), yard_lines / 100.0])
+
+
+def fit_logistic_batch(
+    yard_lines: np.ndarray, scores: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """
+    Fits P(score) = expit(a + b * yard_line / 100) for many weightings at once.
+
+    Every row of weights is one (bootstrap) weighting of the same
+    observations, and all rows are solved together with batched Newton
+    steps, so a thousand bootstrap fits cost about as much as a few
+    single fits.
+
+    Args:
+        yard_lines (np.ndarray): (n,) starting yard lines.
+        scores (np.ndarray): (n,) 0/1 outcomes.
+        weights (np.ndarray): (B, n) non-negative observation weights.
+
+    Returns:
+        np.ndarray: (B, 2) coefficients (a, b).
+    """
+    x = yard_lines / 100.0
+    intercepts = np.zeros(weights.shape[0])
+    slopes = np.zeros(weights.shape[0])
+    for _ in range(NEWTON_ITERATIONS):
+        probabilities = expit(intercepts[:, None] + slopes[:, None] * x)
+        residuals = weights * (scores - probabilities)
+        gradient_a = residuals.sum(axis=1) - RIDGE_PENALTY * intercepts
+        gradient_b = residuals @ x - RIDGE_PENALTY * slopes
+        # 2x2のヘッセ行列は成分ごとに求め、逆行列も直接書き下す
+        curvature = weights * probabilities * (1 - probabilities)
+        hessian_aa = curvature.sum(axis=1) + RIDGE_PENALTY
+        hessian_ab = curvature @ x
+        hessian_bb = curvature @ (x * x) + RIDGE_PENALTY
+        determinant = hessian_aa * hessian_bb - hessian_ab**2
+        step_a = (hessian_bb * gradient_a - hessian_ab * gradient_b) / determinant
+        step_b = (hessian_aa * gradient_b - hessian_ab * gradient_a) / determinant
+        intercepts += step_a
+        slopes += step_b
+        if max(np.abs(step_a).max(), np.abs(step_b).max()) < NEWTON_TOLERANCE:
+            break
+    return np.column_stack([intercepts, slopes])
+
+
+def fit_scoring_curve(
+    field_positions: np.ndarray,
+    scores: np.ndarray,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> dict[str, np.ndarray]:
+    """
+    Fits the scoring probability by starting yard line with bootstrap intervals.
+
+    Drives are resampled with replacement. Because a drive is fully
+    described by its (yard line, score) pair, each resample is drawn as
+    multinomial counts over the distinct pairs (at most 198) instead of
+    over the drives, so the cost does not grow with seasons of data.
+
+    Args:
+        field_positions (np.ndarray): Starting yard lines of the drives.
+        scores (np.ndarray): 0/1 outcome of each drive.
+        n_bootstrap (int): The number of bootstrap resamples.
+        confidence (float): The coverage of the percentile interval.
+        seed (int): The seed of the resampling.
+
+    Returns:
+        dict[str, np.ndarray]: probability, lower and upper over YARD_LINES.
+    """
+    cells, counts = np.unique(
+        np.column_stack([field_positions, scores]), axis=0, return_counts=True
+    )
+    yard_lines, cell_scores = cells[:, 0].astype(float), cells[:, 1].astype(float)
+    rng = np.random.default_rng(seed)
+    bootstrap_counts = rng.multinomial(
+        counts.sum(), counts / counts.sum(), size=n_bootstrap
+    )
+    coefficients = fit_logistic_batch(
+        yard_lines, cell_scores, np.vstack([counts, bootstrap_counts])
+    )
+    curves = expit(coefficients @ _design_matrix(YARD_LINES).T)
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(curves[1:], [alpha, 1 - alpha], axis=0)
+    return {"probability": curves[0], "lower": lower, "upper": upper}
+
+
+def scoring_curves(
+    field_positions: pl.DataFrame,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """
+    Returns the fitted scoring curve of every team and of the league.
+
+    Returns:
+        pl.DataFrame: team_name, drives, yard_line, probability, lower, upper.
+    """
+    frames = []
+    for (team_name,), team_rows in _with_league(field_positions).group_by(
+        "team_name", maintain_order=True
+    ):
+        curve = fit_scoring_curve(
+            team_rows["field_position"].to_numpy(),
+            team_rows["score"].to_numpy(),
+            n_bootstrap=n_bootstrap,
+            confidence=confidence,
+            seed=seed,
+        )
+        frames.append(
+            pl.DataFrame(
+                {
+                    "team_name": team_name,
+                    "drives": len(team_rows),
+                    "yard_line": YARD_LINES,
+                    **curve,
+                }
+            )
+        )
+    return pl.concat(frames).sort("team_name", "yard_line")
+
+
+def _curve_cache_key(files: list[Path], **params: object) -> str:
+    fingerprint = [
+        (str(file_path), file_path.stat().st_size, file_path.stat().st_mtime_ns)
+        for file_path in files
+    ]
+    payload = json.dumps([fingerprint, params], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def load_or_fit_scoring_curves(
+    files: list[Path],
+    cache_dir: Path,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """
+    Returns scoring_curves of the given CSVs, reusing a cached fit when the
+    files (path, size, mtime) and the parameters are unchanged.
+    """
+    key = _curve_cache_key(
+        files, n_bootstrap=n_bootstrap, confidence=confidence, seed=seed
+    )
+    cache_path = Path(cache_dir) / f"curves_{key}.parquet"
+    if cache_path.exists():
+        logger.debug("キャッシュ済みの曲線を使います: %s", cache_path)
+        return pl.read_parquet(cache_path)
+    curves = scoring_curves(
+        load_field_positions(files),
+        n_bootstrap=n_bootstrap,
+        confidence=confidence,
+        seed=seed,
+    )
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_parquet(curves, cache_path)
+    return curves
+
+
+@click.command()
+@click.argument("folders", nargs=-1, required=True, type=Path)
+@click.option("--output-dir", type=Path, required=True)
+@click.option(
+    "--bucket-size", type=click.IntRange(min=1), default=10, show_default=True
+)
+@click.option(
+    "--bootstrap", type=click.IntRange(min=1), default=1000, show_default=True
+)
+@click.option(
+    "--confidence",
+    type=click.FloatRange(0, 1, min_open=True, max_open=True),
+    default=0.95,
+    show_default=True,
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--cache-dir",
+    type=Path,
+    default=None,
+    help=f"曲線のキャッシュ (既定: OUTPUT_DIR/{CURVE_CACHE_DIR_NAME})",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    folders: tuple[Path, ...],
+    output_dir: Path,
+    bucket_size: int,
+    bootstrap: int,
+    confidence: float,
+    seed: int,
+    cache_dir: Path | None,
+    log_level: str,
+):
+    """
+    Scoring probability by starting field position over the per-game
+    field-position CSVs in FOLDERS (e.g. one output folder per season).
+    """
+    set_log_level(log_level)
+    files = field_position_files(folders)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    buckets = bucket_scoring_rates(load_field_positions(files), bucket_size)
+    curves = load_or_fit_scoring_curves(
+        files,
+        cache_dir or output_dir / CURVE_CACHE_DIR_NAME,
+        n_bootstrap=bootstrap,
+        confidence=confidence,
+        seed=seed,
+    )
+    buckets.write_csv(output_dir / "field_position_buckets.csv")
+    curves.write_csv(output_dir / "field_position_curves.csv")
+    logger.info("%d試合分のドライブを集計しました。", len(files) // 2)
+    with pl.Config(tbl_rows=-1):
+        click.echo(buckets.filter(pl.col("team_name") == LEAGUE))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
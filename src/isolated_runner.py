@@ -0,0 +1,191 @@
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from logger import logger
+from metrics import StageTimer
+from models import FailureRecord
+
+
+class IsolatedOutcome(NamedTuple):
+    pdf_path: Path
+    result: Any
+    failure: FailureRecord | None
+    elapsed: float
+    stage_timings: dict[str, float]
+
+
+class _RunningTask:
+    def __init__(
+        self,
+        pdf_path: Path,
+        process: multiprocessing.Process,
+        started: float,
+        deadline: float,
+    ):
+        self.pdf_path = pdf_path
+        self.process = process
+        self.started = started
+        self.deadline = deadline
+        self.stage = "start"
+
+
+def _worker_main(
+    conn: Connection, target: Callable, pdf_path: Path, args: tuple
+) -> None:
+    """
+    Entry point of the worker process. Reports the current stage and the result
+    (or the failure) back to the parent through the pipe, together with the time
+    spent in each stage measured inside the worker.
+    """
+    stage_timer = StageTimer()
+
+    def report_stage(stage: str) -> None:
+        stage_timer(stage)
+        conn.send(("stage", stage))
+
+    try:
+        result = target(pdf_path, *args, stage_callback=report_stage)
+        conn.send(("ok", result, stage_timer.finish()))
+    except Exception as exc:  # noqa: BLE001
+        # 解析中のどんな例外も失敗として親プロセスに返す
+        stage = getattr(exc, "stage", None)
+        cause = getattr(exc, "cause", exc)
+        conn.send(("error", stage, type(cause).__name__, str(cause)))
+    finally:
+        conn.close()
+
+
+def run_isolated(
+    target: Callable,
+    pdf_paths: list[Path],
+    args: tuple,
+    timeout: float,
+    workers: int = 1,
+    on_poll: Callable[[], None] | None = None,
+    poll_interval: float | None = None,
+) -> Iterator[IsolatedOutcome]:
+    """
+    Runs target(pdf_path, *args, stage_callback=...) for each PDF in its own
+    process, killing it when it exceeds the time budget.
+
+    Outcomes are yielded in completion order. A failing or hanging PDF only
+    produces a FailureRecord; the remaining PDFs keep being processed.
+
+    Args:
+        target (Callable): The function analyzing one PDF.
+        pdf_paths (list[Path]): The PDFs to process.
+        args (tuple): Extra positional arguments passed to target.
+        timeout (float): The time budget per PDF in seconds.
+        workers (int): The number of PDFs processed at the same time.
+        on_poll (Callable[[], None], optional): Called at least every
+            poll_interval seconds while waiting for the workers, so progress
+            can be reported while a PDF hangs.
+        poll_interval (float, optional): The longest wait between on_poll calls.
+
+    Yields:
+        IsolatedOutcome: The result or the failure of each PDF.
+    """
+    ctx = multiprocessing.get_context()
+    pending = deque(pdf_paths)
+    running: dict[Connection, _RunningTask] = {}
+
+    def finish(
+        conn: Connection,
+        failure: FailureRecord | None,
+        result: Any,
+        stage_timings: dict[str, float] | None = None,
+    ):
+        task = running.pop(conn)
+        conn.close()
+        task.process.join(timeout=1)
+        if task.process.is_alive():
+            task.process.kill()
+            task.process.join()
+        return IsolatedOutcome(
+            pdf_path=task.pdf_path,
+            result=result,
+            failure=failure,
+            elapsed=time.monotonic() - task.started,
+            stage_timings=stage_timings or {},
+        )
+
+    def make_failure(task: _RunningTask, stage, exception: str, message: str):
+        return FailureRecord(
+            pdf_path=str(task.pdf_path),
+            stage=stage or task.stage,
+            exception=exception,
+            message=message,
+            elapsed=round(time.monotonic() - task.started, 3),
+        )
+
+    while pending or running:
+        while pending and len(running) < max(workers, 1):
+            pdf_path = pending.popleft()
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_worker_main,
+                args=(send_conn, target, pdf_path, args),
+                daemon=True,
+            )
+            started = time.monotonic()
+            process.start()
+            send_conn.close()
+            running[recv_conn] = _RunningTask(
+                pdf_path, process, started, started + timeout
+            )
+            logger.debug("started worker for %s (pid=%s)", pdf_path, process.pid)
+
+        next_deadline = min(task.deadline for task in running.values())
+        wait_seconds = max(next_deadline - time.monotonic(), 0)
+        if poll_interval is not None:
+            wait_seconds = min(wait_seconds, poll_interval)
+        ready = wait(list(running), timeout=wait_seconds)
+        if on_poll is not None:
+            on_poll()
+
+        for conn in ready:
+            task = running[conn]
+            try:
+                message = conn.recv()
+            except EOFError:
+                task.process.join(timeout=1)
+                yield finish(
+                    conn,
+                    make_failure(
+                        task,
+                        None,
+                        "WorkerCrashed",
+                        f"worker exited with code {task.process.exitcode}",
+                    ),
+                    None,
+                )
+                continue
+            if message[0] == "stage":
+                task.stage = message[1]
+            elif message[0] == "ok":
+                yield finish(conn, None, message[1], message[2])
+            else:
+                _, stage, exception, error_message = message
+                yield finish(
+                    conn, make_failure(task, stage, exception, error_message), None
+                )
+
+        now = time.monotonic()
+        for conn, task in list(running.items()):
+            if task.deadline <= now:
+                logger.warning(
+                    "%s timed out after %.1fs in %s", task.pdf_path, timeout, task.stage
+                )
+                task.process.kill()
+                yield finish(
+                    conn,
+                    make_failure(
+                        task, None, "TimeoutError", f"exceeded {timeout} seconds"
+                    ),
+                    None,
+                )
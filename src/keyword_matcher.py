@@ -0,0 +1,154 @@
+import re
+from collections.abc import Iterable
+from functools import cache, lru_cache
+from typing import NamedTuple
+
+# プレイバイプレイと得点経過の解析で調べる語
+PLAY_MARKERS = (
+    "RUN",
+    "PASS",
+    "FG",
+    "GOOD",
+    "TOUCHDOWN",
+    "BLOCK",
+    "Kick-off",
+    "PUNT",
+    "Lineups",
+    "+Penalty",
+    "ディクライン",
+    "オフセット",
+    "yラン",
+    "yパス",
+)
+# 覚えておく行の上限。1試合の行数(数百行)より大きく、常駐プロセスで増え続けない値
+MEMO_LIMIT = 4096
+
+
+class LineMatch(NamedTuple):
+    """The keywords found in one line and the team names among its words."""
+
+    # 行に部分文字列として含まれる語 ("語" in lineと同じ)
+    keywords: frozenset[str]
+    # 空白区切りの語として現れたチームの番号 (行内の順)
+    teams: tuple[int, ...]
+    # 行の最初の語がチーム名ならその番号
+    leading_team: int | None
+
+
+NO_MATCH = LineMatch(frozenset(), (), None)
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of a fixed vocabulary in a line with one regex scan.
+
+    keywords is exactly the set of keywords k with k in line, and teams the
+    teams whose name is a word of line.split(" "). The alternation is
+    ordered longest first, keywords contained in a longer keyword are
+    added when the longer one matches, and the few keywords that a
+    leftmost scan could miss (those partially overlapping another keyword)
+    are checked with the in operator. Only lines containing a team name
+    are split into words.
+    Results are memoized per line, so parsers reading the same lines share
+    a single scan of each. The memo is cleared once it holds more than
+    MEMO_LIMIT lines, so a matcher reused across games by a long-running
+    worker does not keep every line it has seen.
+    """
+
+    def __init__(self, keywords: Iterable[str], team_names: Iterable[str] = ()):
+        self.team_index = {team: index for index, team in enumerate(team_names)}
+        vocabulary = [
+            keyword
+            for keyword in dict.fromkeys([*keywords, *self.team_index])
+            if keyword
+        ]
+        unsafe = {
+            keyword
+            for keyword in vocabulary
+            if any(
+                _partially_overlap(keyword, other)
+                for other in vocabulary
+                if other != keyword
+            )
+        }
+        scanned = sorted(
+            (keyword for keyword in vocabulary if keyword not in unsafe),
+            key=len,
+            reverse=True,
+        )
+        # 検索する語がなければ何にも一致しないパターンにする
+        self._pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in scanned) or "(?!)"
+        )
+        # 他の語を含む語と、その語に含まれる語
+        self._contained: dict[str, frozenset[str]] = {}
+        for keyword in scanned:
+            contained = frozenset(
+                other for other in scanned if other != keyword and other in keyword
+            )
+            if contained:
+                self._contained[keyword] = contained
+        self._unsafe = tuple(unsafe)
+        self._memo: dict[str, LineMatch] = {}
+
+    def match(self, line: str) -> LineMatch:
+        found = self._memo.get(line)
+        if found is None:
+            self._bound_memo()
+            found = self._memo[line] = self._scan(line)
+        return found
+
+    def match_lines(self, lines: Iterable[str]) -> list[LineMatch]:
+        """
+        Returns the LineMatch of every line, scanning only lines not seen yet.
+        """
+        self._bound_memo()
+        memo = self._memo
+        return [
+            memo[line] if line in memo else memo.setdefault(line, self._scan(line))
+            for line in lines
+        ]
+
+    def _bound_memo(self) -> None:
+        # 前の試合の行を捨てる。同じ試合の解析中に消えても再走査するだけ
+        if len(self._memo) > MEMO_LIMIT:
+            self._memo.clear()
+
+    def _scan(self, line: str) -> LineMatch:
+        hits = self._pattern.findall(line)
+        extra = [keyword for keyword in self._unsafe if keyword in line]
+        if not hits and not extra:
+            return NO_MATCH
+        keywords = frozenset(hits).union(extra)
+        if not keywords.isdisjoint(self._contained):
+            keywords = keywords.union(
+                *(
+                    self._contained[keyword]
+                    for keyword in keywords & self._contained.keys()
+                )
+            )
+        # 語としてのチーム名は、チーム名を含む行だけ分割して調べる
+        if keywords.isdisjoint(self.team_index):
+            return LineMatch(keywords, (), None)
+        words = line.split(" ")
+        return LineMatch(
+            keywords,
+            tuple(self.team_index[word] for word in words if word in self.team_index),
+            self.team_index.get(words[0]),
+        )
+
+
+@cache
+def _partially_overlap(keyword: str, other: str) -> bool:
+    # keywordの末尾とotherの先頭(other全体より短い)が重なる。
+    # このときkeywordの一致に続くotherを左から順の検索では見落とす
+    return any(keyword.endswith(other[:length]) for length in range(1, len(other)))
+
+
+@lru_cache(maxsize=16)
+def play_matcher(team_list_in_file: tuple[str, ...]) -> KeywordMatcher:
+    """
+    Returns the matcher of PLAY_MARKERS and the two teams of a game, built
+    once and shared by every parser of the game.
+    """
+    return KeywordMatcher(PLAY_MARKERS, team_list_in_file)
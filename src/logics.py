@@ -1,17 +1,22 @@
 import re
+from collections.abc import Iterable, Iterator
+
 import pymupdf  # type: ignore  # noqa
 from pydantic import BaseModel
 
+from keyword_matcher import play_matcher
 from models import (
     PenaltyInfo,
     TeamPenaltyInfo,
     RedzoneInfo,
     TeamRedzoneInfo,
-    SeriesStatsInfo,
-    TeamSeriesStatsInfo,
 )
 from logger import logger
-from utils import find_page_include_word, open_pdf_to_list_only_page
+
+
+# 獲得ヤードを含みうる行の語
+YARDS_MARKERS = ("yラン", "yパス")
+FG_GOOD = frozenset(("FG", "GOOD"))
 
 
 class ExtractedYards(BaseModel):
@@ -48,45 +53,49 @@ def get_yards(
     Raises:
         ValueError: If the number of teams found in the document is not equal to 2.
     """
-    # 全ページをループして特定の書式のテキストを抽出
+    # "Play by Play"の後の記録を、"Lineups"まで1ページずつ読み出す
+    return get_yards_from_lines(
+        iter_play_by_play_lines(pdf_document), team_abbreviation_dict, team_list_in_file
+    )
+
+
+def get_yards_from_lines(
+    lines: Iterable[str],
+    team_abbreviation_dict: dict[str, str],
+    team_list_in_file: list[str],
+) -> tuple[TeamsExtractedYards, TeamPenaltyInfo]:
+    """
+    Extracts the rushing and passing yards and the penalties of both teams
+    from the lines of the play-by-play section (see get_yards).
+    """
+    # 各行から特定の書式のテキストを抽出
     home_extracted_yards: tuple[list[int], list[int]] = ([], [])
     home_penalty_info: list[int] = [0, 0]
     visitor_extracted_yards: tuple[list[int], list[int]] = ([], [])
     visitor_penalty_info: list[int] = [0, 0]
 
     team_mode = 0
-
-    # 全ページのテキストを一度に取得
-    units = get_text_units(pdf_document)
-
-    # unitsの中から"Play by Play"の後の記録を抽出
-    for ct, unit in enumerate(units):
-        if "Play by Play" in unit:
-            units = units[ct + 1 :]
-            break
-
-    # チーム名が見つかったら、その後の記録をそのチームのものとして処理
-    for unit in units:
-        if unit.split(" ")[0] in team_list_in_file:
-            if unit.split(" ")[0] == team_list_in_file[0]:
-                team_mode = 0
-            else:
-                team_mode = 1
-
-        home_extracted_yards, visitor_extracted_yards = extract_yards(
-            home_extracted_yards, visitor_extracted_yards, team_mode, unit
-        )
-
-        home_penalty_info, visitor_penalty_info = extract_penalty_info(
-            home_penalty_info,
-            visitor_penalty_info,
-            team_list_in_file,
-            unit,
-            team_abbreviation_dict,
-        )
-
-        if "Lineups" in unit:
-            break
+    matcher = play_matcher(tuple(team_list_in_file))
+
+    # 行頭がチーム名なら、その後の記録をそのチームのものとして処理
+    for unit in lines:
+        match = matcher.match(unit)
+        if match.leading_team is not None:
+            team_mode = match.leading_team
+
+        if not match.keywords.isdisjoint(YARDS_MARKERS):
+            home_extracted_yards, visitor_extracted_yards = extract_yards(
+                home_extracted_yards, visitor_extracted_yards, team_mode, unit
+            )
+
+        if "+Penalty" in match.keywords:
+            home_penalty_info, visitor_penalty_info = extract_penalty_info(
+                home_penalty_info,
+                visitor_penalty_info,
+                team_list_in_file,
+                unit,
+                team_abbreviation_dict,
+            )
 
     return TeamsExtractedYards(
         home_team_extracted_yards=ExtractedYards(
@@ -109,14 +118,39 @@ def get_yards(
     )
 
 
-def get_text_units(pdf_document):
-    all_text = ""
-    for page_num in range(len(pdf_document)):
-        page = pdf_document.load_page(page_num)
-        all_text += page.get_text("text") + "\n"
+def iter_play_by_play_lines(
+    pdf_document: pymupdf.Document,
+    start_marker: str = "Play by Play",
+    end_marker: str = "Lineups",
+) -> Iterator[str]:
+    """
+    Yields the text lines of the play-by-play section, one page at a time.
 
-    units = all_text.split("\n")
-    return units
+    Lines are yielded from the line after the first one containing
+    start_marker up to and including the first one containing end_marker.
+    Pages after end_marker are never loaded, and only the current page's
+    text is held in memory.
+
+    Args:
+        pdf_document (pymupdf.Document): The PDF document of the game.
+        start_marker (str): The text marking the start of the section.
+        end_marker (str): The text marking the end of the section.
+
+    Yields:
+        str: The lines of the section in page order.
+    """
+    started = False
+    for page_num in range(len(pdf_document)):
+        text = pdf_document.load_page(page_num).get_text("text")
+        if not started and start_marker not in text:
+            continue
+        for line in text.split("\n"):
+            if not started:
+                started = start_marker in line
+                continue
+            yield line
+            if end_marker in line:
+                return
 
 
 def extract_yards(
@@ -184,11 +218,12 @@ def get_redzone_info(
     tmp_visitor_redzone_count = 0
     visitor_redzone_series_count = 0
     play_by_play_idx = same_line_words_list.index("Play by Play First Quarter")
-    for unit in same_line_words_list[play_by_play_idx + 1 :]:
-        for word in unit.split(" "):
-            if word in team_list_in_file:
-                team_mode = team_list_in_file.index(word)
-        if "RUN" not in unit and "PASS" not in unit and "FG" not in unit:
+    matcher = play_matcher(tuple(team_list_in_file))
+    section = same_line_words_list[play_by_play_idx + 1 :]
+    for unit, match in zip(section, matcher.match_lines(section)):
+        if match.teams:
+            team_mode = match.teams[-1]
+        if match.keywords.isdisjoint(("RUN", "PASS", "FG")):
             continue
         offense_team = team_abbreviation_in_file[team_mode]
         defense_team = team_abbreviation_in_file[1 - team_mode]
@@ -213,23 +248,23 @@ def get_redzone_info(
                 visitor_redzone_series_count += 1
                 tmp_visitor_redzone_count = 0
             continue
-        if "Lineups" in unit:
+        if "Lineups" in match.keywords:
             break
         if team_mode == 0:
             home_redzone_play_count += 1
             tmp_home_redzone_count += 1
             # Touchdownはプレーカウントとスコアをカウント
-            if "TOUCHDOWN" in unit:
+            if "TOUCHDOWN" in match.keywords:
                 home_redzone_td_count += 1
             # FGはスコアのみカウント
-            if "FG" in unit and "GOOD" in unit:
+            if FG_GOOD <= match.keywords:
                 home_redzone_score_fg_count += 1
         else:
             visitor_redzone_play_count += 1
             tmp_visitor_redzone_count += 1
-            if "TOUCHDOWN" in unit:
+            if "TOUCHDOWN" in match.keywords:
                 visitor_redzone_td_count += 1
-            if "FG" in unit and "GOOD" in unit:
+            if FG_GOOD <= match.keywords:
                 visitor_redzone_score_fg_count += 1
 
     return TeamRedzoneInfo(
@@ -248,68 +283,6 @@ def get_redzone_info(
     )
 
 
-def get_series(
-    pdf_document: pymupdf.Document, team_list_in_file: list[str]
-) -> TeamSeriesStatsInfo:
-    start_home_drive_idx = None
-    end_home_drive_idx = None
-    start_visitor_drive_idx = None
-    end_visitor_drive_idx = None
-    page_num = find_page_include_word(pdf_document, "ドライブチャート")
-    drive_chart = open_pdf_to_list_only_page(pdf_document, page_num)
-    for ct, line in enumerate(drive_chart):
-        if team_list_in_file[0] in line:
-            start_home_drive_idx = ct + 3
-        if team_list_in_file[1] in line:
-            end_home_drive_idx = ct - 1
-            start_visitor_drive_idx = ct + 3
-        if "攻撃時間" in line:
-            end_visitor_drive_idx = ct - 1
-            break
-    if start_home_drive_idx is None:
-        raise ValueError("ホームチームのドライブチャートが見つかりません")
-    if end_home_drive_idx is None:
-        raise ValueError("ホームチームのドライブチャートの終わりが見つかりません")
-    if start_visitor_drive_idx is None:
-        raise ValueError("ビジターチームのドライブチャートが見つかりません")
-    if end_visitor_drive_idx is None:
-        end_visitor_drive_idx = -1
-    logger.debug(
-        "start/end home drive idx %s/%s", start_home_drive_idx, end_home_drive_idx
-    )
-    logger.debug("start home line: %s", drive_chart[start_home_drive_idx])
-    logger.debug("end home line: %s", drive_chart[end_home_drive_idx])
-    logger.debug("start visitor drive idx %s", start_visitor_drive_idx)
-    logger.debug("start visitor line: %s", drive_chart[start_visitor_drive_idx])
-    logger.debug("end visitor drive idx %s", end_visitor_drive_idx)
-    logger.debug("end visitor line: %s", drive_chart[end_visitor_drive_idx])
-
-    def count_series_and_scores(start_idx, end_idx):
-        series_count = end_idx - start_idx + 1
-        score_count = sum(
-            1
-            for line in drive_chart[start_idx:end_idx]
-            if "TouchDown" in line or "FG Good" in line
-        )
-        return series_count, score_count
-
-    home_series_count, home_score_count = count_series_and_scores(
-        start_home_drive_idx, end_home_drive_idx
-    )
-    visitor_series_count, visitor_score_count = count_series_and_scores(
-        start_visitor_drive_idx, end_visitor_drive_idx
-    )
-
-    return TeamSeriesStatsInfo(
-        home_series_stats=SeriesStatsInfo(
-            series_count=home_series_count, score_count=home_score_count
-        ),
-        visitor_series_stats=SeriesStatsInfo(
-            series_count=visitor_series_count, score_count=visitor_score_count
-        ),
-    )
-
-
 def get_fg_blocks(
     same_line_words_list: list[str],
     team_list_in_file: list[str],
@@ -322,13 +295,14 @@ def get_fg_blocks(
     search_format = re.compile(r"-?\d+y")
     parse_keyword = "y"
     play_by_play_idx = same_line_words_list.index("Play by Play First Quarter")
-    for unit in same_line_words_list[play_by_play_idx + 1 :]:
-        for word in unit.split(" "):
-            if word in team_list_in_file:
-                team_mode = team_list_in_file.index(word)
-        if "FG" not in unit:
+    matcher = play_matcher(tuple(team_list_in_file))
+    section = same_line_words_list[play_by_play_idx + 1 :]
+    for unit, match in zip(section, matcher.match_lines(section)):
+        if match.teams:
+            team_mode = match.teams[-1]
+        if "FG" not in match.keywords:
             continue
-        if "BLOCK" in unit:
+        if "BLOCK" in match.keywords:
             matches = search_format.findall(unit)
             if matches:
                 logger.debug(
@@ -358,13 +332,14 @@ def get_good_fg_trial_yards(
     search_format = re.compile(r"-?\d+y")
     parse_keyword = "y"
     play_by_play_idx = same_line_words_list.index("Play by Play First Quarter")
-    for unit in same_line_words_list[play_by_play_idx + 1 :]:
-        for word in unit.split(" "):
-            if word in team_list_in_file:
-                team_mode = team_list_in_file.index(word)
-        if "FG" not in unit:
+    matcher = play_matcher(tuple(team_list_in_file))
+    section = same_line_words_list[play_by_play_idx + 1 :]
+    for unit, match in zip(section, matcher.match_lines(section)):
+        if match.teams:
+            team_mode = match.teams[-1]
+        if "FG" not in match.keywords:
             continue
-        if "GOOD" in unit:
+        if "GOOD" in match.keywords:
             matches = search_format.findall(unit)
             if matches:
                 logger.debug(
@@ -385,15 +360,16 @@ def get_kicking_score(
     visitor_kicking_touchdown = 0
     team_mode = 0
     play_by_play_idx = same_line_words_list.index("Play by Play First Quarter")
-    for unit in same_line_words_list[play_by_play_idx + 1 :]:
-        for word in unit.split(" "):
-            if word in team_list_in_file:
-                team_mode = team_list_in_file.index(word)
-        if "Kick-off" not in unit and "PUNT" not in unit:
+    matcher = play_matcher(tuple(team_list_in_file))
+    section = same_line_words_list[play_by_play_idx + 1 :]
+    for unit, match in zip(section, matcher.match_lines(section)):
+        if match.teams:
+            team_mode = match.teams[-1]
+        if match.keywords.isdisjoint(("Kick-off", "PUNT")):
             continue
-        if "Lineups" in unit:
+        if "Lineups" in match.keywords:
             break
-        if "TOUCHDOWN" in unit:
+        if "TOUCHDOWN" in match.keywords:
             if team_mode == 0:
                 visitor_kicking_touchdown += 7
             else:
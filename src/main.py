@@ -1,83 +1,57 @@
+import sys
+from collections.abc import Iterator
+from itertools import chain, islice
 from pathlib import Path
 import click
 
+from analyzer import GameAnalysisError, analyze_pdf
 from logger import logger, set_log_level
-from logics import get_kicking_score, get_yards, get_redzone_info, get_series
-from break_drive_chart import get_starting_field_position
-from break_team_stats import (
-    break_down_team_stats,
-    get_third_down_info,
-    extract_fumble,
-    extract_score,
-    extract_fg_stats,
-    extract_time_possession,
-    extract_pr_yards,
-)
-from break_personal_stats import get_kick_off_return_stat, get_punt_stat
-from models import Stats
+from models import GameResult
 from utils import (
     load_config_from_file,
     load_team_names_from_file,
-    open_pdf,
-    open_pdf_to_list,
-    open_pdf_to_list_only_page,
     export_stats_to_json,
     export_stats_to_csv,
+    game_result_to_records,
+    log_stats_summary,
+    write_ndjson_records,
 )
 
+STDIN_PATH = "-"
+STDIN_GAME_NAME = "stdin"
+PDF_MAGIC = b"%PDF"
 
-@click.command()
-@click.argument("pdf_path", type=Path)
-@click.argument("config_path", type=Path, default="config.json")
-@click.option(
-    "--log-level",
-    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
-    default="INFO",
-)
-def main(pdf_path: Path, config_path: Path, log_level: str):
-    set_log_level(log_level)
-    config = load_config_from_file(config_path)
-    team_names_list, team_abbreviation_dict, team_abbreviation_by_team_dict = (
-        load_team_names_from_file("teams.json")
-    )
-    pdf_document = open_pdf(pdf_path)
-
-    same_line_words_list = open_pdf_to_list(pdf_path)
-    team_break_down_stats_info = break_down_team_stats(pdf_document, team_names_list)
-    team_list_in_file = [
-        team_break_down_stats_info.home_team_break_down_stats.team_name,
-        team_break_down_stats_info.visitor_team_break_down_stats.team_name,
-    ]
-    logger.info("Team names: %s", team_list_in_file)
-    team_abbreviation_in_file = [
-        team_abbreviation_by_team_dict[team] for team in team_list_in_file
-    ]
-    team_extracted_yards, team_penalty_info = get_yards(
-        pdf_document,
-        team_abbreviation_dict,
-        team_list_in_file,
-    )
 
-    team_third_down_stats = get_third_down_info(pdf_document)
-    team_redzone_info = get_redzone_info(
-        same_line_words_list, team_list_in_file, team_abbreviation_in_file
-    )
-    team_series_info = get_series(pdf_document, team_list_in_file)
-    team_fumble_info = extract_fumble(same_line_words_list)
-    score_tuple = extract_score(open_pdf_to_list_only_page(pdf_document, 0))
-    kicking_score_tuple = get_kicking_score(same_line_words_list, team_list_in_file)
-
-    team_kickoff_return_stats = get_kick_off_return_stat(pdf_document)
-    team_punt_stats = get_punt_stat(pdf_document)
-    team_fg_stats = extract_fg_stats(same_line_words_list, team_list_in_file)
-    team_time_possession = extract_time_possession(
-        open_pdf_to_list_only_page(pdf_document, 0)
-    )
-    team_pr_info = extract_pr_yards(open_pdf_to_list_only_page(pdf_document, 0))
-    team_starting_field_position = get_starting_field_position(
-        pdf_document, team_list_in_file, team_abbreviation_in_file
-    )
-    # team_starting_field_position.save_each_position_as_json("field_position.json")
+def read_sources_from_stdin() -> Iterator[tuple[str, Path | bytes]]:
+    """
+    Reads either one PDF or a list of PDF paths (one per line) from stdin.
+
+    Paths are yielded as soon as their line arrives, so a producer such as
+    find can keep writing while the first games are analyzed.
+
+    Yields:
+        tuple[str, Path | bytes]: The game name and the PDF (path or content).
+    """
+    stream = sys.stdin.buffer
+    head = stream.read(len(PDF_MAGIC))
+    if head.startswith(PDF_MAGIC):
+        yield STDIN_GAME_NAME, head + stream.read()
+        return
+    # 先頭の数バイトを読んだ行の残りを補い、以降は届いた行から順に解析する
+    if head and not head.endswith(b"\n"):
+        head += stream.readline()
+    for line in chain(head.splitlines(), stream):
+        line = line.decode("utf-8").strip()
+        if line:
+            pdf_path = Path(line)
+            yield pdf_path.stem, pdf_path
+
+
+def export_game_files(game_result: GameResult) -> None:
+    """
+    Writes the stats and field positions of one game into the current directory.
+    """
+    team_starting_field_position = game_result.field_position
     team_starting_field_position.home_team_starting_field_position.save_as_json(
         Path("home_field_position.json")
     )
@@ -91,105 +65,73 @@ def main(pdf_path: Path, config_path: Path, log_level: str):
         Path("visitor_field_position.csv")
     )
     logger.debug("team_starting_field_position: %s", team_starting_field_position)
-    for ct, (
-        extracted_yards,
-        third_down_stats,
-        penalty_info,
-        redzone_info,
-        team_stats_info,
-        series_info,
-        fumble_info,
-        score,
-        kicking_score,
-        kickoff_return_stats,
-        punt_stats,
-        fg_stats,
-        time_possession,
-        pr_info,
-    ) in enumerate(
-        [
-            (
-                team_extracted_yards.home_team_extracted_yards,
-                team_third_down_stats.home_team_third_down_stats,
-                team_penalty_info.home_team_penalty_info,
-                team_redzone_info.home_team_redzone_info,
-                team_break_down_stats_info.home_team_break_down_stats,
-                team_series_info.home_series_stats,
-                team_fumble_info.home_team_fumble_info,
-                score_tuple[0],
-                kicking_score_tuple[0],
-                team_kickoff_return_stats.home_kickoff_return_info,
-                team_punt_stats.home_punt_info,
-                team_fg_stats.home_fg_info,
-                team_time_possession.home_team_time_possession,
-                team_pr_info.home_team_PRInfo,
-            ),
-            (
-                team_extracted_yards.visitor_team_extracted_yards,
-                team_third_down_stats.visitor_team_third_down_stats,
-                team_penalty_info.visitor_team_penalty_info,
-                team_redzone_info.visitor_team_redzone_info,
-                team_break_down_stats_info.visitor_team_break_down_stats,
-                team_series_info.visitor_series_stats,
-                team_fumble_info.visitor_team_fumble_info,
-                score_tuple[1],
-                kicking_score_tuple[1],
-                team_kickoff_return_stats.visitor_kickoff_return_info,
-                team_punt_stats.visitor_punt_info,
-                team_fg_stats.visitor_fg_info,
-                team_time_possession.visitor_team_time_possession,
-                team_pr_info.visitor_team_PRInfo,
-            ),
-        ]
-    ):
-        stats = Stats(
-            team_score=score,
-            offense_score=score - kicking_score,
-            run_yards=extracted_yards.rushing_yards,
-            pass_yards=extracted_yards.passing_yards,
-            third_down_stats=third_down_stats,
-            penalty_info=penalty_info,
-            fumble_info=fumble_info,
-            redzone_info=redzone_info,
-            team_stats_info=team_stats_info,
-            series_info=series_info,
-            config=config,
-            kickoff_return_stats=kickoff_return_stats,
-            punt_stats=punt_stats,
-            fg_stats=fg_stats,
-            time_possession=time_possession,
-            pr_info=pr_info,
-        )
-        logger.info(
-            "%s had %d runs greater than 15 yards.",
-            stats.team_stats_info.team_name,
-            stats.big_run_count,
-        )
-        logger.info(
-            "%s had %d passes greater than 20 yards.",
-            stats.team_stats_info.team_name,
-            stats.big_pass_count,
-        )
-        logger.info(
-            "%s had a third down conversion rate of %.2d%%.",
-            stats.team_stats_info.team_name,
-            stats.third_down_success_rate,
-        )
-        logger.info(
-            "%s did %d times penalty of %d yards.",
-            stats.team_stats_info.team_name,
-            stats.penalty_info.count,
-            stats.penalty_info.yards,
-        )
-        logger.info(
-            "%s had %d redzone attempts and %d scores.",
-            stats.team_stats_info.team_name,
-            stats.redzone_info.play_count,
-            stats.redzone_info.touchdown_count,
-        )
+    for ct, stats in enumerate([game_result.home_stats, game_result.visitor_stats]):
+        log_stats_summary(stats)
         export_stats_to_json(stats, Path(f"stats_{ct}.json"))
         export_stats_to_csv(stats, Path(f"stats_{ct}.csv"))
 
 
+@click.command()
+@click.argument("pdf_path", type=str)
+@click.argument("config_path", type=Path, default="config.json")
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    default=False,
+    help="ファイルを書き出さず、チームごとの結果を1行1レコードのJSONで標準出力に出力する",
+)
+def main(pdf_path: str, config_path: Path, log_level: str, ndjson: bool):
+    """
+    Analyzes PDF_PATH. Use - to read a PDF, or a list of PDF paths, from stdin.
+    """
+    set_log_level(log_level)
+    config = load_config_from_file(config_path)
+    team_names = load_team_names_from_file("teams.json")
+
+    if pdf_path == STDIN_PATH:
+        sources = read_sources_from_stdin()
+    else:
+        sources = iter([(Path(pdf_path).stem, Path(pdf_path))])
+
+    if not ndjson:
+        # ファイルを書き出す前に、2つ目の入力がないことを確かめる
+        first_sources = list(islice(sources, 2))
+        if len(first_sources) > 1:
+            raise click.UsageError(
+                "複数のPDFを解析するには --ndjson を指定してください。"
+            )
+        sources = iter(first_sources)
+
+    failed = 0
+    for game, source in sources:
+        try:
+            game_result = analyze_pdf(source, config, *team_names)
+        except GameAnalysisError as exc:
+            if not ndjson:
+                raise
+            logger.error("%s の解析に失敗しました。%s", game, exc)
+            failed += 1
+            continue
+        logger.info(
+            "Team names: %s",
+            [
+                game_result.home_stats.team_stats_info.team_name,
+                game_result.visitor_stats.team_stats_info.team_name,
+            ],
+        )
+        if ndjson:
+            write_ndjson_records(game_result_to_records(game_result, game), sys.stdout)
+        else:
+            export_game_files(game_result)
+
+    if failed:
+        raise SystemExit(1)
+
+
 if __name__ == "__main__":
     main()  # pylint: disable=no-value-for-parameter
@@ -1,28 +1,28 @@
+import sys
+import time
+from functools import partial
 from pathlib import Path
 import click
 
-from logger import logger, set_log_level
-from logics import get_kicking_score, get_yards, get_redzone_info, get_series
-from break_drive_chart import get_starting_field_position
-from break_team_stats import (
-    break_down_team_stats,
-    get_third_down_info,
-    extract_fumble,
-    extract_score,
-    extract_fg_stats,
-    extract_time_possession,
-    extract_pr_yards,
-    extract_td_count,
+from analyzer import analyze_pdf, resolve_fields
+from checkpoint import (
+    FAILURE_REPORT_FILE_NAME,
+    JOURNAL_FILE_NAME,
+    NDJSON_JOURNAL_FILE_NAME,
+    CheckpointJournal,
 )
-from break_personal_stats import get_kick_off_return_stat, get_punt_stat
-from models import Stats
+from extractor_cache import ExtractorCache
+from isolated_runner import run_isolated
+from logger import logger, set_log_level
+from metrics import METRICS_FILE_NAME, BatchMetrics
+from models import FIELD_TIERS, FailureReport
+from player_store import PlayerStore
 from utils import (
+    export_game_result,
+    game_result_to_records,
     load_config_from_file,
     load_team_names_from_file,
-    open_pdf,
-    open_pdf_to_list,
-    open_pdf_to_list_only_page,
-    export_stats_to_csv,
+    write_ndjson_records,
 )
 
 
@@ -35,8 +35,104 @@ from utils import (
     type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
     default="INFO",
 )
-def main(pdf_dir: Path, config_path: Path, output_dir: Path, log_level: str):
+@click.option(
+    "--timeout",
+    type=float,
+    default=120.0,
+    show_default=True,
+    help="1つのPDFの解析に許容する秒数",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="同時に解析するPDFの数",
+)
+@click.option(
+    "--retry-failed",
+    is_flag=True,
+    default=False,
+    help=f"output_dir内の{FAILURE_REPORT_FILE_NAME}に記録されたPDFのみを再解析する",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="output_dir内のジャーナルに記録された解析済みのPDFをスキップして再開する",
+)
+@click.option(
+    "--metrics-file",
+    type=Path,
+    default=None,
+    help=f"Prometheusテキスト形式のメトリクスの出力先 (デフォルト: output_dir/{METRICS_FILE_NAME})",
+)
+@click.option(
+    "--report-interval",
+    type=float,
+    default=10.0,
+    show_default=True,
+    help="進捗とメトリクスを出力する間隔(秒)",
+)
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    default=False,
+    help="試合ごとのCSVの代わりに、解析が終わった順にチームごとの結果をJSON Linesで標準出力に出力する",
+)
+@click.option(
+    "--fields",
+    default=",".join(FIELD_TIERS),
+    show_default=True,
+    help=(
+        "抽出する統計のグループ(カンマ区切り)。"
+        "boxscoreは1ページ目のみを読み、常に含まれる。"
+        "playbyplay/drives/personalを省くとそのページの読み込みと解析を行わない"
+    ),
+)
+@click.option(
+    "--player-store",
+    type=Path,
+    default=None,
+    help="試合ごとの個人スタッツを追記するParquetのディレクトリ (personalを抽出する場合のみ)",
+)
+@click.option(
+    "--extractor-cache",
+    type=Path,
+    default=None,
+    help="抽出段階ごとの出力を保存するディレクトリ。版と入力が同じ段階は再実行しない",
+)
+def main(
+    pdf_dir: Path,
+    config_path: Path,
+    output_dir: Path,
+    log_level: str,
+    timeout: float,
+    workers: int,
+    retry_failed: bool,
+    resume: bool,
+    metrics_file: Path | None,
+    report_interval: float,
+    ndjson: bool,
+    fields: str,
+    player_store: Path | None,
+    extractor_cache: Path | None,
+):
     set_log_level(log_level)
+    try:
+        requested_fields = resolve_fields(
+            [field.strip() for field in fields.split(",") if field.strip()]
+        )
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="--fields") from exc
+    logger.debug("fields: %s", requested_fields)
+    store = None
+    if player_store is not None:
+        if "personal" not in requested_fields:
+            raise click.BadParameter(
+                "--fieldsにpersonalを含めてください。", param_hint="--player-store"
+            )
+        store = PlayerStore(player_store)
     config = load_config_from_file(config_path)
     team_names_list, team_abbreviation_dict, team_abbreviation_by_team_dict = (
         load_team_names_from_file("teams.json")
@@ -45,160 +141,101 @@ def main(pdf_dir: Path, config_path: Path, output_dir: Path, log_level: str):
     if not output_dir.exists():
         output_dir.mkdir(parents=True)
 
-    target_pdf = pdf_dir.glob("*.pdf")
+    failure_report_path = output_dir / FAILURE_REPORT_FILE_NAME
+    if retry_failed:
+        if not failure_report_path.exists():
+            logger.warning("%s が見つかりません。", failure_report_path)
+            return
+        previous_report = FailureReport.load_from_json(failure_report_path)
+        target_pdf = [Path(failure.pdf_path) for failure in previous_report.failures]
+    else:
+        target_pdf = sorted(pdf_dir.glob("*.pdf"))
+
+    # 失敗分の再解析では完了済みの記録を残したまま追記する。
+    # --ndjsonではCSVを書かないため、CSVの再開に使うジャーナルには記録しない
+    journal = CheckpointJournal(
+        output_dir,
+        resume=resume or retry_failed,
+        file_name=NDJSON_JOURNAL_FILE_NAME if ndjson else JOURNAL_FILE_NAME,
+    )
+    if resume:
+        skipped = [pdf for pdf in target_pdf if journal.is_completed(pdf)]
+        target_pdf = [pdf for pdf in target_pdf if not journal.is_completed(pdf)]
+        logger.info("解析済みの%d試合をスキップします。", len(skipped))
 
     logger.debug("target_pdf: %s", target_pdf)
     logger.debug("output_dir: %s", output_dir)
-    for pdf_path in target_pdf:
-        logger.debug("pdf_path: %s", pdf_path)
-        pdf_document = open_pdf(pdf_path)
-        same_line_words_list = open_pdf_to_list(pdf_path)
-        team_break_down_stats_info = break_down_team_stats(
-            pdf_document, team_names_list
-        )
-        team_list_in_file = [
-            team_break_down_stats_info.home_team_break_down_stats.team_name,
-            team_break_down_stats_info.visitor_team_break_down_stats.team_name,
-        ]
-        team_abbreviation_in_file = [
-            team_abbreviation_by_team_dict[team] for team in team_list_in_file
-        ]
-        team_extracted_yards, team_penalty_info = get_yards(
-            pdf_document,
+    metrics = BatchMetrics(
+        total=len(target_pdf),
+        metrics_path=metrics_file or output_dir / METRICS_FILE_NAME,
+        report_interval=report_interval,
+    )
+    stage_cache = ExtractorCache(extractor_cache) if extractor_cache else None
+    failures = []
+    for outcome in run_isolated(
+        partial(
+            analyze_pdf,
+            fields=requested_fields,
+            extractor_cache=stage_cache,
+        ),
+        target_pdf,
+        (
+            config,
+            team_names_list,
             team_abbreviation_dict,
-            team_list_in_file,
-        )
-
-        team_third_down_stats = get_third_down_info(pdf_document)
-        team_redzone_info = get_redzone_info(
-            same_line_words_list, team_list_in_file, team_abbreviation_in_file
+            team_abbreviation_by_team_dict,
+        ),
+        timeout=timeout,
+        workers=workers,
+        # 時間切れまで止まっているPDFがあっても、一定間隔で進捗を出力する
+        on_poll=metrics.report,
+        poll_interval=report_interval,
+    ):
+        logger.debug("pdf_path: %s (%.2fs)", outcome.pdf_path, outcome.elapsed)
+        if outcome.failure is not None:
+            logger.error(
+                "%s の解析に失敗しました。stage=%s %s: %s",
+                outcome.pdf_path,
+                outcome.failure.stage,
+                outcome.failure.exception,
+                outcome.failure.message,
+            )
+            failures.append(outcome.failure)
+            metrics.record_failed()
+            metrics.report()
+            continue
+        export_started = time.perf_counter()
+        if ndjson:
+            write_ndjson_records(
+                game_result_to_records(outcome.result, outcome.pdf_path.stem),
+                sys.stdout,
+            )
+        else:
+            export_game_result(outcome.result, outcome.pdf_path, output_dir)
+        if store is not None:
+            store.append(outcome.pdf_path.stem, outcome.result.player_stats)
+        journal.record_completed(outcome.pdf_path)
+        metrics.record_completed(
+            outcome.stage_timings,
+            outcome.result.page_count,
+            time.perf_counter() - export_started,
         )
-        team_series_info = get_series(pdf_document, team_list_in_file)
-        team_fumble_info = extract_fumble(same_line_words_list)
-        score_tuple = extract_score(open_pdf_to_list_only_page(pdf_document, 0))
-        kicking_score_tuple = get_kicking_score(same_line_words_list, team_list_in_file)
+        metrics.report()
+    metrics.report(force=True)
+    if store is not None:
+        store.compact()
 
-        team_kickoff_return_stats = get_kick_off_return_stat(pdf_document)
-        team_punt_stats = get_punt_stat(pdf_document)
-        team_fg_stats = extract_fg_stats(same_line_words_list, team_list_in_file)
-        team_time_possession = extract_time_possession(
-            open_pdf_to_list_only_page(pdf_document, 0)
-        )
-        team_pr_info = extract_pr_yards(open_pdf_to_list_only_page(pdf_document, 0))
-        team_starting_field_position = get_starting_field_position(
-            pdf_document, team_list_in_file, team_abbreviation_in_file
-        )
-        team_td_info = extract_td_count(team_list_in_file, same_line_words_list)
-        team_starting_field_position.home_team_starting_field_position.save_as_csv(
-            output_dir / f"{pdf_path.stem}_home_field_position.csv"
+    if failures:
+        FailureReport(failures=failures).save_as_json(failure_report_path)
+        logger.error(
+            "%d/%d件のPDFの解析に失敗しました。詳細は %s を参照してください。",
+            len(failures),
+            len(target_pdf),
+            failure_report_path,
         )
-        team_starting_field_position.visitor_team_starting_field_position.save_as_csv(
-            output_dir / f"{pdf_path.stem}_visitor_field_position.csv"
-        )
-        logger.debug("team_starting_field_position: %s", team_starting_field_position)
-        for ct, (
-            extracted_yards,
-            third_down_stats,
-            penalty_info,
-            redzone_info,
-            team_stats_info,
-            series_info,
-            fumble_info,
-            score,
-            kicking_score,
-            kickoff_return_stats,
-            punt_stats,
-            fg_stats,
-            time_possession,
-            pr_info,
-            td_info,
-        ) in enumerate(
-            [
-                (
-                    team_extracted_yards.home_team_extracted_yards,
-                    team_third_down_stats.home_team_third_down_stats,
-                    team_penalty_info.home_team_penalty_info,
-                    team_redzone_info.home_team_redzone_info,
-                    team_break_down_stats_info.home_team_break_down_stats,
-                    team_series_info.home_series_stats,
-                    team_fumble_info.home_team_fumble_info,
-                    score_tuple[0],
-                    kicking_score_tuple[0],
-                    team_kickoff_return_stats.home_kickoff_return_info,
-                    team_punt_stats.home_punt_info,
-                    team_fg_stats.home_fg_info,
-                    team_time_possession.home_team_time_possession,
-                    team_pr_info.home_team_PRInfo,
-                    team_td_info.home_team_touchdown_info,
-                ),
-                (
-                    team_extracted_yards.visitor_team_extracted_yards,
-                    team_third_down_stats.visitor_team_third_down_stats,
-                    team_penalty_info.visitor_team_penalty_info,
-                    team_redzone_info.visitor_team_redzone_info,
-                    team_break_down_stats_info.visitor_team_break_down_stats,
-                    team_series_info.visitor_series_stats,
-                    team_fumble_info.visitor_team_fumble_info,
-                    score_tuple[1],
-                    kicking_score_tuple[1],
-                    team_kickoff_return_stats.visitor_kickoff_return_info,
-                    team_punt_stats.visitor_punt_info,
-                    team_fg_stats.visitor_fg_info,
-                    team_time_possession.visitor_team_time_possession,
-                    team_pr_info.visitor_team_PRInfo,
-                    team_td_info.visitor_team_touchdown_info,
-                ),
-            ]
-        ):
-            stats = Stats(
-                team_score=score,
-                offense_score=score - kicking_score,
-                run_yards=extracted_yards.rushing_yards,
-                pass_yards=extracted_yards.passing_yards,
-                third_down_stats=third_down_stats,
-                penalty_info=penalty_info,
-                fumble_info=fumble_info,
-                redzone_info=redzone_info,
-                team_stats_info=team_stats_info,
-                series_info=series_info,
-                config=config,
-                kickoff_return_stats=kickoff_return_stats,
-                punt_stats=punt_stats,
-                fg_stats=fg_stats,
-                time_possession=time_possession,
-                pr_info=pr_info,
-                run_td=td_info.run_touchdown,
-                pass_td=td_info.pass_touchdown,
-            )
-            logger.info(
-                "%s had %d runs greater than 15 yards.",
-                stats.team_stats_info.team_name,
-                stats.big_run_count,
-            )
-            logger.info(
-                "%s had %d passes greater than 20 yards.",
-                stats.team_stats_info.team_name,
-                stats.big_pass_count,
-            )
-            logger.info(
-                "%s had a third down conversion rate of %.2d%%.",
-                stats.team_stats_info.team_name,
-                stats.third_down_success_rate,
-            )
-            logger.info(
-                "%s did %d times penalty of %d yards.",
-                stats.team_stats_info.team_name,
-                stats.penalty_info.count,
-                stats.penalty_info.yards,
-            )
-            logger.info(
-                "%s had %d redzone attempts and %d scores.",
-                stats.team_stats_info.team_name,
-                stats.redzone_info.play_count,
-                stats.redzone_info.touchdown_count,
-            )
-            # export_stats_to_json(stats, output_dir / f"{pdf_path.stem}_stats_{ct}.json")
-            export_stats_to_csv(stats, output_dir / f"{pdf_path.stem}_stats_{ct}.csv")
+        raise SystemExit(1)
+    if failure_report_path.exists():
+        failure_report_path.unlink()
 
 
 if __name__ == "__main__":
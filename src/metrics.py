@@ -0,0 +1,209 @@
+import math
+import time
+from pathlib import Path
+
+from atomic_io import atomic_write
+from logger import logger
+
+# PDFからテキストを取り出して行に組み立てるステージ。それ以外の解析ステージは parsing に分類する
+# get_yards/get_drives/get_player_statsはページを読み込みながら解析するため、
+# 時間の大半を占めるテキストの読み出しに合わせて extraction に含める
+EXTRACTION_STAGES = {
+    "open_pdf",
+    "open_pdf_to_list",
+    "open_pdf_to_list_only_page",
+    "extract_summary_table",
+    "extract_header_lines",
+    "get_yards",
+    "get_drives",
+    "get_player_stats",
+}
+PHASES = ("extraction", "parsing", "export")
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS_FILE_NAME = "metrics.prom"
+
+
+def stage_phase(stage: str) -> str:
+    """
+    Maps a stage name reported by analyze_pdf to extraction or parsing.
+    """
+    return "extraction" if stage in EXTRACTION_STAGES else "parsing"
+
+
+def quantile(sorted_values: list[float], q: float) -> float:
+    """
+    Returns the nearest-rank quantile of an already sorted list.
+
+    Args:
+        sorted_values (list[float]): The values sorted in ascending order.
+        q (float): The quantile between 0 and 1.
+
+    Returns:
+        float: The quantile, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class StageTimer:
+    """
+    Stage callback that measures how long each stage takes.
+
+    Each call marks the start of a new stage and closes the previous one.
+    Stages that run more than once are accumulated.
+    """
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self._current: str | None = None
+        self._started = 0.0
+
+    def __call__(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._close(now)
+        self._current = stage
+        self._started = now
+
+    def _close(self, now: float) -> None:
+        if self._current is not None:
+            self.timings[self._current] = (
+                self.timings.get(self._current, 0.0) + now - self._started
+            )
+        self._current = None
+
+    def finish(self) -> dict[str, float]:
+        """
+        Closes the running stage and returns the accumulated timings.
+        """
+        self._close(time.perf_counter())
+        return self.timings
+
+
+class BatchMetrics:
+    """
+    Throughput and latency metrics of a batch run.
+
+    Stage timings are measured inside the workers and aggregated here, so the
+    numbers cover every worker of the batch.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        metrics_path: Path | None = None,
+        report_interval: float = 10.0,
+    ):
+        self.total = total
+        self.metrics_path = metrics_path
+        self.report_interval = report_interval
+        self.completed = 0
+        self.failed = 0
+        self.pages = 0
+        self.latencies: dict[str, list[float]] = {phase: [] for phase in PHASES}
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    def record_completed(
+        self, stage_timings: dict[str, float], page_count: int, export_seconds: float
+    ) -> None:
+        phase_seconds = {"extraction": 0.0, "parsing": 0.0}
+        for stage, seconds in stage_timings.items():
+            phase_seconds[stage_phase(stage)] += seconds
+        for phase, seconds in phase_seconds.items():
+            self.latencies[phase].append(seconds)
+        self.latencies["export"].append(export_seconds)
+        self.completed += 1
+        self.pages += page_count
+
+    def record_failed(self) -> None:
+        self.failed += 1
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self._started, 1e-9)
+
+    @property
+    def games_per_second(self) -> float:
+        return self.completed / self.elapsed
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed
+
+    def summary_line(self) -> str:
+        latency_text = ", ".join(
+            "{} p50/p95/p99={:.3f}/{:.3f}/{:.3f}s".format(
+                phase, *(quantile(sorted(values), q) for q in QUANTILES)
+            )
+            for phase, values in self.latencies.items()
+        )
+        return (
+            f"{self.completed + self.failed}/{self.total} games "
+            f"(completed={self.completed}, failed={self.failed}), "
+            f"{self.games_per_second:.2f} games/s, "
+            f"{self.pages_per_second:.2f} pages/s, {latency_text}"
+        )
+
+    def render_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP xleague_games_total Number of games targeted by the batch.",
+            "# TYPE xleague_games_total gauge",
+            f"xleague_games_total {self.total}",
+            "# HELP xleague_games_completed_total Number of games analyzed.",
+            "# TYPE xleague_games_completed_total counter",
+            f"xleague_games_completed_total {self.completed}",
+            "# HELP xleague_games_failed_total Number of games that failed or timed out.",
+            "# TYPE xleague_games_failed_total counter",
+            f"xleague_games_failed_total {self.failed}",
+            "# HELP xleague_pages_processed_total Number of PDF pages of analyzed games.",
+            "# TYPE xleague_pages_processed_total counter",
+            f"xleague_pages_processed_total {self.pages}",
+            "# HELP xleague_games_per_second Analyzed games per second since start.",
+            "# TYPE xleague_games_per_second gauge",
+            f"xleague_games_per_second {self.games_per_second:.6f}",
+            "# HELP xleague_pages_per_second Analyzed pages per second since start.",
+            "# TYPE xleague_pages_per_second gauge",
+            f"xleague_pages_per_second {self.pages_per_second:.6f}",
+            "# HELP xleague_stage_latency_seconds Per-game latency of each stage.",
+            "# TYPE xleague_stage_latency_seconds summary",
+        ]
+        for phase, values in self.latencies.items():
+            sorted_values = sorted(values)
+            for q in QUANTILES:
+                lines.append(
+                    f'xleague_stage_latency_seconds{{stage="{phase}",quantile="{q}"}} '
+                    f"{quantile(sorted_values, q):.6f}"
+                )
+            lines.append(
+                f'xleague_stage_latency_seconds_sum{{stage="{phase}"}} '
+                f"{sum(values):.6f}"
+            )
+            lines.append(
+                f'xleague_stage_latency_seconds_count{{stage="{phase}"}} {len(values)}'
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> None:
+        if self.metrics_path is None:
+            return
+        with atomic_write(self.metrics_path) as f:
+            f.write(self.render_prometheus())
+
+    def report(self, force: bool = False) -> None:
+        """
+        Logs the progress and rewrites the metrics file once per report_interval.
+
+        Args:
+            force (bool): Report even if the interval has not elapsed yet.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        logger.info("progress: %s", self.summary_line())
+        self.write_prometheus()
@@ -1,8 +1,11 @@
 import csv
 import json
 from pathlib import Path
+
 from pydantic import BaseModel
 
+from atomic_io import atomic_write
+
 
 class Config(BaseModel):
     run_long_gain_threshold: int
@@ -119,8 +122,19 @@ class TeamFGInfo(BaseModel):
     visitor_fg_info: FGInfo
 
 
+class FieldPositionRecord(BaseModel):
+    """The starting field position of one drive."""
+
+    team_name: str
+    opponent_name: str
+    # 自陣ゴールラインからの距離
+    field_position: int
+    # そのドライブで得点したら1
+    score: int
+
+
 class StartingFieldPosition(BaseModel):
-    field_position: list[dict[str, object]]
+    field_position: list[FieldPositionRecord]
 
     def save_as_json(self, file_path: Path) -> None:
         """
@@ -144,13 +158,44 @@ class StartingFieldPosition(BaseModel):
         Args:
             file_path (str): The file path to save the CSV file.
         """
-        with open(file_path, "w", encoding="utf-8") as f:
+        with atomic_write(file_path) as f:
             writer = csv.DictWriter(
-                f, fieldnames=["team_name", "opponent_name", "field_position", "score"]
+                f, fieldnames=list(FieldPositionRecord.model_fields)
             )
             writer.writeheader()
             for field_pos in self.field_position:
-                writer.writerow(field_pos)
+                writer.writerow(field_pos.model_dump())
+
+
+class Drive(BaseModel):
+    """One row of the ドライブチャート page."""
+
+    team_name: str
+    opponent_name: str
+    quarter: int
+    start_time: str
+    end_time: str
+    possession_seconds: int
+    # 攻守交代時プレイ(ドライブが始まったきっかけ)
+    start_play: str
+    # 自陣ゴールラインからの距離
+    start_yard_line: int
+    play_count: int
+    gain_yards: int
+    penalty_yards: int
+    total_yards: int
+    first_downs: int
+    end_yard_line: int
+    result: str
+
+    @property
+    def scored(self) -> bool:
+        return self.result in ("TouchDown", "FG Good")
+
+    @property
+    def points(self) -> int:
+        # PATはドライブチャートに記載されないため含めない
+        return {"TouchDown": 6, "FG Good": 3}.get(self.result, 0)
 
 
 class TeamStartingFieldPosition(BaseModel):
@@ -274,3 +319,112 @@ class Stats(BaseModel):
             )
             * 100
         )
+
+
+# 抽出する統計のグループ。boxscoreは1ページ目のみ、それ以外は各ページを読む
+FIELD_TIERS = ("boxscore", "playbyplay", "drives", "personal")
+
+# グループごとに出力するStatsの項目
+STATS_FIELDS_BY_TIER = {
+    "boxscore": (
+        "team_score",
+        "third_down_stats",
+        "fumble_info",
+        "team_stats_info",
+        "time_possession",
+        "pr_info",
+        "third_down_success_rate",
+    ),
+    "playbyplay": (
+        "offense_score",
+        "penalty_info",
+        "redzone_info",
+        "fg_stats",
+        "big_run_count",
+        "big_pass_count",
+        "run_td",
+        "pass_td",
+    ),
+    "drives": ("series_info",),
+    "personal": ("kickoff_return_stats", "punt_stats"),
+}
+
+
+class PlayerStat(BaseModel):
+    """One value of the 個人スタッツ page, e.g. RUSHING / #2 / YDS = 82."""
+
+    team_name: str
+    section: str
+    # 背番号。"[TEAM]"や"Total"の行は空文字
+    number: str
+    player: str
+    stat: str
+    value: float
+
+
+class GameResult(BaseModel):
+    home_stats: Stats
+    visitor_stats: Stats
+    field_position: TeamStartingFieldPosition
+    page_count: int = 0
+    # 個人スタッツのページの全項目。personalを抽出しない場合は空
+    player_stats: list[PlayerStat] = []
+    # ドライブチャートの全ドライブ。drivesを抽出しない場合は空
+    drives: list[Drive] = []
+    # 抽出したグループ。含まれないグループの項目は既定値のまま
+    fields: tuple[str, ...] = FIELD_TIERS
+
+
+# 中間ファイルの形式。GameResultの項目を変えたら上げる
+INTERMEDIATE_VERSION = 1
+
+
+class GameIntermediate(BaseModel):
+    """
+    The raw extraction of one game, persisted so that Stats can be derived
+    again under another Config without the PDF.
+    """
+
+    version: int = INTERMEDIATE_VERSION
+    game_result: GameResult
+
+
+class FailureRecord(BaseModel):
+    pdf_path: str
+    stage: str
+    exception: str
+    message: str
+    elapsed: float
+
+
+class FailureReport(BaseModel):
+    failures: list[FailureRecord]
+
+    def save_as_json(self, file_path: Path) -> None:
+        """
+        Saves the failure report as a JSON file.
+
+        Args:
+            file_path (Path): The file path to save the JSON file.
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(
+                self.model_dump(),
+                f,
+                ensure_ascii=False,
+                indent=4,
+            )
+
+    @classmethod
+    def load_from_json(cls, file_path: Path) -> "FailureReport":
+        """
+        Loads a failure report from a JSON file.
+
+        Args:
+            file_path (Path): The path to the JSON file to be loaded.
+
+        Returns:
+            FailureReport: The loaded failure report.
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
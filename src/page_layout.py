@@ -0,0 +1,227 @@
+import json
+import re
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+import pymupdf  # type: ignore
+from pydantic import BaseModel
+
+from logger import logger
+from text_lines import group_words_into_lines
+
+# 画像や合字・空白の保持は不要なので、ページ外の文字を除く指定のみで抽出する
+CLIP_TEXT_FLAGS = pymupdf.TEXT_MEDIABOX_CLIP
+
+# "回数-ヤード" などのハイフン区切り。マイナスの値は "回数--ヤード" と記載されている
+COUNTS_PATTERN = re.compile(r"(?:-(-?\d+))+")
+COUNT_PATTERN = re.compile(r"-(-?\d+)")
+# "成功数/試行数(更新率)"
+RATIO_PATTERN = re.compile(r"(\d+)/(\d+)(?:\(\d+%\))?")
+# "分:秒"
+CLOCK_PATTERN = re.compile(r"(\d+):(\d+)")
+
+T = TypeVar("T")
+
+
+class Page0Layout(BaseModel):
+    """
+    Layout profile of the first page of the game report, in PDF points.
+
+    The team stats table moves up and down with the length of the scoring
+    summary, so its clip rectangle covers the whole column band and the rows
+    are taken from the table_anchor row to the table_end row.
+    """
+
+    header_clip: tuple[float, float, float, float] = (0.0, 120.0, 596.0, 160.0)
+    table_clip: tuple[float, float, float, float] = (100.0, 230.0, 520.0, 842.0)
+    table_anchor: str = "チームスタッツ"
+    table_end: str = "攻撃時間"
+    home_x0: float = 360.0
+    visitor_x0: float = 425.0
+    line_margin: float = 3.0
+
+    @classmethod
+    def load_from_json(cls, file_path: Path) -> "Page0Layout":
+        """
+        Loads a layout profile from a JSON file.
+
+        Args:
+            file_path (Path): The path to the JSON file to be loaded.
+
+        Returns:
+            Page0Layout: The loaded layout profile.
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+DEFAULT_PAGE0_LAYOUT = Page0Layout()
+
+
+def parse_int(cell: str) -> int:
+    """Parses a plain count such as "169"."""
+    return int(cell)
+
+
+def parse_counts(cell: str) -> tuple[int, ...]:
+    """
+    Parses hyphen separated counts such as "17-10-0" or "3-26".
+
+    A negative value is written with a double hyphen, e.g. "2--5" is (2, -5).
+
+    Raises:
+        ValueError: If cell is not in the "a-b-c" form.
+    """
+    # 先頭にハイフンを補うと、各値が "-値" または "--値" の繰り返しになる
+    if not COUNTS_PATTERN.fullmatch("-" + cell):
+        raise ValueError(f"ハイフン区切りの数値ではありません: {cell}")
+    return tuple(int(value) for value in COUNT_PATTERN.findall("-" + cell))
+
+
+def parse_ratio(cell: str) -> tuple[int, int]:
+    """
+    Parses "success/trials(rate%)" such as "3/7(43%)" into (success, trials).
+
+    Raises:
+        ValueError: If cell is not in the "a/b(c%)" form.
+    """
+    match = RATIO_PATTERN.fullmatch(cell)
+    if match is None:
+        raise ValueError(f"成功数/試行数の形式ではありません: {cell}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_clock(cell: str) -> tuple[int, int]:
+    """
+    Parses "mm:ss" such as "14:59" into (minutes, seconds).
+
+    Raises:
+        ValueError: If cell is not in the "mm:ss" form.
+    """
+    match = CLOCK_PATTERN.fullmatch(cell)
+    if match is None:
+        raise ValueError(f"分:秒の形式ではありません: {cell}")
+    return int(match.group(1)), int(match.group(2))
+
+
+class StatTable(dict[str, tuple[str, str]]):
+    """
+    The page-0 team stats table, label -> (home cell, visitor cell).
+
+    Rows are looked up by a keyword contained in the label. The resolved
+    label and the parsed values are memoized, so each row is searched and
+    parsed at most once per parser.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._labels: dict[str, str] = {}
+        self._parsed: dict[tuple[str, Callable], tuple] = {}
+
+    def _resolve(self, keyword: str) -> str:
+        label = self._labels.get(keyword)
+        if label is None:
+            if keyword in self:
+                label = keyword
+            else:
+                label = next((label for label in self if keyword in label), None)
+            if label is None:
+                raise ValueError(f"{keyword}が見つかりませんでした。")
+            logger.debug("%sが見つかりました。", keyword)
+            self._labels[keyword] = label
+        return label
+
+    def cells(self, keyword: str) -> tuple[str, str]:
+        """
+        Returns the raw (home, visitor) cells of the row whose label contains keyword.
+
+        Raises:
+            ValueError: If no row matches.
+        """
+        return self[self._resolve(keyword)]
+
+    def parse(self, keyword: str, parser: Callable[[str], T]) -> tuple[T, T]:
+        """
+        Returns the (home, visitor) values of a row, converted with parser.
+
+        Args:
+            keyword (str): A substring of the row label.
+            parser (Callable[[str], T]): One of parse_int, parse_counts,
+                parse_ratio or parse_clock.
+
+        Raises:
+            ValueError: If no row matches or a cell cannot be parsed.
+        """
+        key = (self._resolve(keyword), parser)
+        if key not in self._parsed:
+            home, visitor = self[key[0]]
+            self._parsed[key] = (parser(home), parser(visitor))
+        return self._parsed[key]
+
+
+def extract_clip_rows(
+    page: pymupdf.Page, clip: tuple[float, float, float, float], margin: float
+) -> list[list[tuple]]:
+    """
+    Extracts the words inside clip and groups them into rows.
+
+    Returns:
+        list[list[tuple]]: The rows, each a list of pymupdf words sorted by x0.
+    """
+    words = page.get_text("words", clip=pymupdf.Rect(clip), flags=CLIP_TEXT_FLAGS)
+    return [list(line.words) for line in group_words_into_lines(words, margin)]
+
+
+def extract_header_lines(
+    pdf_document: pymupdf.Document, layout: Page0Layout = DEFAULT_PAGE0_LAYOUT
+) -> list[str]:
+    """
+    Returns the lines of the page-0 header (date, "home vs visitor", venue).
+    """
+    page = pdf_document.load_page(0)
+    return [
+        " ".join(word[4] for word in row)
+        for row in extract_clip_rows(page, layout.header_clip, layout.line_margin)
+    ]
+
+
+def extract_summary_table(
+    pdf_document: pymupdf.Document, layout: Page0Layout = DEFAULT_PAGE0_LAYOUT
+) -> StatTable:
+    """
+    Reads the page-0 team stats table into label -> (home, visitor).
+
+    Only the table region is extracted, with a clip rectangle, instead of the
+    whole page.
+
+    Args:
+        pdf_document (pymupdf.Document): The PDF document of the game.
+        layout (Page0Layout): The layout profile of page 0.
+
+    Returns:
+        StatTable: The raw cell texts keyed by the row label.
+
+    Raises:
+        ValueError: If the table is not found in the clip region.
+    """
+    page = pdf_document.load_page(0)
+    table = StatTable()
+    in_table = False
+    for row in extract_clip_rows(page, layout.table_clip, layout.line_margin):
+        label = " ".join(word[4] for word in row if word[0] < layout.home_x0)
+        if not in_table:
+            in_table = layout.table_anchor in label
+            continue
+        home = " ".join(
+            word[4] for word in row if layout.home_x0 <= word[0] < layout.visitor_x0
+        )
+        visitor = " ".join(word[4] for word in row if word[0] >= layout.visitor_x0)
+        if label and home and visitor:
+            table[label] = (home, visitor)
+        if layout.table_end in label:
+            break
+    if not table:
+        raise ValueError(f"{layout.table_anchor}の表が見つかりませんでした。")
+    logger.debug("summary table: %s", table)
+    return table
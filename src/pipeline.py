@@ -0,0 +1,146 @@
+from pathlib import Path
+
+import click
+import polars as pl
+
+from analyzer import analyze_pdf, game_results_to_frame
+from checkpoint import FAILURE_REPORT_FILE_NAME
+from isolated_runner import run_isolated
+from logger import logger, set_log_level
+from models import FailureReport
+from summarize_data import summarize_stats, write_summary
+from utils import export_game_result, load_config_from_file, load_team_names_from_file
+
+
+def run_pipeline(
+    pdf_paths: list[Path],
+    config_path: Path,
+    timeout: float,
+    workers: int,
+    output_dir: Path | None = None,
+) -> tuple[pl.DataFrame, FailureReport]:
+    """
+    Analyzes the PDFs and collects the per-game stats rows in memory.
+
+    Args:
+        pdf_paths (list[Path]): The PDFs to analyze.
+        config_path (Path): The path to config.json.
+        timeout (float): The time budget per PDF in seconds.
+        workers (int): The number of PDFs processed at the same time.
+        output_dir (Path, optional): Also write the per-game CSV files here.
+
+    Returns:
+        tuple[pl.DataFrame, FailureReport]: The per-game stats rows and the
+            PDFs that failed.
+    """
+    config = load_config_from_file(config_path)
+    team_names_list, team_abbreviation_dict, team_abbreviation_by_team_dict = (
+        load_team_names_from_file("teams.json")
+    )
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    frames = []
+    failures = []
+    for outcome in run_isolated(
+        analyze_pdf,
+        pdf_paths,
+        (
+            config,
+            team_names_list,
+            team_abbreviation_dict,
+            team_abbreviation_by_team_dict,
+        ),
+        timeout=timeout,
+        workers=workers,
+    ):
+        if outcome.failure is not None:
+            logger.error(
+                "%s の解析に失敗しました。stage=%s %s: %s",
+                outcome.pdf_path,
+                outcome.failure.stage,
+                outcome.failure.exception,
+                outcome.failure.message,
+            )
+            failures.append(outcome.failure)
+            continue
+        logger.debug("pdf_path: %s (%.2fs)", outcome.pdf_path, outcome.elapsed)
+        frames.append(game_results_to_frame([outcome.result]))
+        if output_dir is not None:
+            export_game_result(outcome.result, outcome.pdf_path, output_dir)
+
+    df_games = pl.concat(frames, how="vertical_relaxed") if frames else pl.DataFrame()
+    return df_games, FailureReport(failures=failures)
+
+
+@click.command()
+@click.argument("pdf_dir", type=Path)
+@click.argument("config_path", type=Path, default="config.json")
+@click.argument("result_dir", type=Path, default="result")
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=120.0,
+    show_default=True,
+    help="1つのPDFの解析に許容する秒数",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="同時に解析するPDFの数",
+)
+@click.option(
+    "--output-dir",
+    type=Path,
+    default=None,
+    help="指定した場合、試合ごとのCSVもこのディレクトリに出力する",
+)
+def main(
+    pdf_dir: Path,
+    config_path: Path,
+    result_dir: Path,
+    log_level: str,
+    timeout: float,
+    workers: int,
+    output_dir: Path | None,
+):
+    set_log_level(log_level)
+    target_pdf = sorted(pdf_dir.glob("*.pdf"))
+    logger.debug("target_pdf: %s", target_pdf)
+
+    df_games, failure_report = run_pipeline(
+        target_pdf, config_path, timeout, workers, output_dir
+    )
+    if df_games.is_empty():
+        logger.error("解析できた試合がありません。")
+    else:
+        df_team_stats, df_opponent_stats = summarize_stats(df_games)
+        write_summary(df_team_stats, df_opponent_stats, result_dir)
+        logger.info(
+            "%d試合のチームスタッツを %s に出力しました。",
+            df_games.height // 2,
+            result_dir,
+        )
+
+    if failure_report.failures:
+        result_dir.mkdir(parents=True, exist_ok=True)
+        failure_report_path = result_dir / FAILURE_REPORT_FILE_NAME
+        failure_report.save_as_json(failure_report_path)
+        logger.error(
+            "%d/%d件のPDFの解析に失敗しました。詳細は %s を参照してください。",
+            len(failure_report.failures),
+            len(target_pdf),
+            failure_report_path,
+        )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
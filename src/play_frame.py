@@ -0,0 +1,391 @@
+"""
+Columnar extraction of the play-by-play yards, penalties and FG outcomes of
+many games at once, for backfills over whole seasons.
+
+logics.py stays the authoritative implementation used by analyze_pdf; the
+rules here mirror it. test_matches_python_extractors_on_test_pdfs (and
+--compare on any batch) guards the two against drifting apart, so a change
+to the possession, yards or penalty rules of logics.py must be made here too.
+"""
+
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import click
+import polars as pl
+
+from break_team_stats import get_home_visitor_team_name
+from logger import logger, set_log_level
+from logics import get_fg_blocks, get_good_fg_trial_yards, get_yards_from_lines
+from page_layout import extract_header_lines
+from utils import load_team_names_from_file, open_pdf, pdf_document_to_list
+
+# 再構成した行のうち、この行の次からをプレイバイプレイとして読む
+PLAY_BY_PLAY_START = "Play by Play First Quarter"
+# 獲得ヤードと反則はこの語を含む行まで (logics.get_yardsと同じ)
+SECTION_END = "Lineups"
+RUN_PATTERN = r"(-?\d+)yラン"
+PASS_PATTERN = r"(-?\d+)yパス"
+YARDS_PATTERN = r"(-?\d+)y"
+PENALTY_TEAM_PATTERN = r"(?:^| )\+Penalty +([^ ]+)"
+# 反則のヤードを数えない行
+PENALTY_NO_YARDS = ("ディクライン", "オフセット")
+LINES_SCHEMA = {"game": pl.String, "line_no": pl.UInt32, "text": pl.String}
+TEAMS_SCHEMA = {"game": pl.String, "home_team": pl.String, "visitor_team": pl.String}
+
+
+def play_lines_frame(games: Iterable[tuple[str, list[str]]]) -> pl.DataFrame:
+    """
+    Puts the play-by-play lines of many games into one frame.
+
+    Args:
+        games (Iterable[tuple[str, list[str]]]): (game, lines) pairs, the
+            lines as returned by utils.pdf_document_to_list.
+
+    Returns:
+        pl.DataFrame: game, line_no and text of every line after
+            PLAY_BY_PLAY_START.
+
+    Raises:
+        ValueError: If a game has no PLAY_BY_PLAY_START line.
+    """
+    game_column: list[str] = []
+    text_column: list[str] = []
+    line_no_column: list[int] = []
+    for game, lines in games:
+        section = lines[lines.index(PLAY_BY_PLAY_START) + 1 :]
+        game_column.extend([game] * len(section))
+        text_column.extend(section)
+        line_no_column.extend(range(len(section)))
+    return pl.DataFrame(
+        {"game": game_column, "line_no": line_no_column, "text": text_column},
+        schema=LINES_SCHEMA,
+    )
+
+
+def _team_hits(lines: pl.DataFrame, teams: pl.DataFrame) -> pl.DataFrame:
+    # 行を語に分け、両チーム名と一致する語だけを(試合, 語)の結合で残す
+    team_words = pl.concat(
+        [
+            teams.select("game", pl.col(column).alias("word"), team=pl.lit(team))
+            for team, column in enumerate(("home_team", "visitor_team"))
+        ]
+    ).with_columns(pl.col("team").cast(pl.UInt8))
+    return (
+        lines.select("game", "line_no", pl.col("text").str.split(" ").alias("word"))
+        .with_columns(position=pl.int_ranges(pl.col("word").list.len()))
+        .explode("word", "position")
+        .join(team_words, on=["game", "word"])
+        .group_by("game", "line_no")
+        .agg(
+            pl.col("team").filter(pl.col("position") == 0).first().alias("first_team"),
+            pl.col("team").sort_by("position").last().alias("last_team"),
+        )
+    )
+
+
+def _contains(keyword: str) -> pl.Expr:
+    return pl.col("text").str.contains(keyword, literal=True)
+
+
+def classify_plays(
+    lines: pl.DataFrame,
+    teams: pl.DataFrame,
+    team_abbreviation_dict: dict[str, str],
+) -> pl.DataFrame:
+    """
+    Derives possession, play type, yards, penalties and FG outcomes of every
+    line with Polars string kernels, for all games at once.
+
+    Possession follows the Python extractors: offense is the team whose
+    name starts the line (get_yards), kicking_team the last team name in
+    the line (get_fg_blocks); both carry forward until the next team name.
+
+    Args:
+        lines (pl.DataFrame): The output of play_lines_frame.
+        teams (pl.DataFrame): game, home_team and visitor_team.
+        team_abbreviation_dict (dict[str, str]): Abbreviation -> team name.
+
+    Returns:
+        pl.DataFrame: One row per line with offense, kicking_team (0 = home,
+            1 = visitor), in_section, play_type, run_yards, pass_yards,
+            penalty_team, penalty_yards, fg_block_yards and fg_good_yards.
+    """
+    text = pl.col("text")
+    line_yards = text.str.extract(YARDS_PATTERN).cast(pl.Int64)
+    is_fg = _contains("FG")
+    is_section_end = _contains(SECTION_END).cast(pl.UInt32)
+    penalty_team_name = (
+        text.str.extract(PENALTY_TEAM_PATTERN)
+        .replace_strict(team_abbreviation_dict, default=None)
+        .alias("penalty_team_name")
+    )
+    return (
+        lines.join(_team_hits(lines, teams), on=["game", "line_no"], how="left")
+        .join(teams, on="game", how="left")
+        .sort("game", "line_no")
+        .with_columns(
+            pl.col("first_team")
+            .forward_fill()
+            .over("game")
+            .fill_null(0)
+            .alias("offense"),
+            pl.col("last_team")
+            .forward_fill()
+            .over("game")
+            .fill_null(0)
+            .alias("kicking_team"),
+            # Lineupsを含む最初の行まで
+            (is_section_end.cum_sum().over("game") - is_section_end == 0).alias(
+                "in_section"
+            ),
+            text.str.extract(RUN_PATTERN).cast(pl.Int64).alias("run_yards"),
+            text.str.extract(PASS_PATTERN).cast(pl.Int64).alias("pass_yards"),
+            penalty_team_name,
+            pl.when(
+                pl.any_horizontal(_contains(keyword) for keyword in PENALTY_NO_YARDS)
+            )
+            .then(0)
+            .otherwise(line_yards)
+            .alias("penalty_yards"),
+            pl.when(is_fg & _contains("BLOCK"))
+            .then(line_yards)
+            .alias("fg_block_yards"),
+            pl.when(is_fg & _contains("GOOD")).then(line_yards).alias("fg_good_yards"),
+        )
+        .with_columns(
+            pl.when(pl.col("run_yards").is_not_null())
+            .then(pl.lit("run"))
+            .when(pl.col("pass_yards").is_not_null())
+            .then(pl.lit("pass"))
+            .when(is_fg)
+            .then(pl.lit("fg"))
+            .alias("play_type"),
+            pl.when(pl.col("penalty_team_name").is_not_null())
+            .then((pl.col("penalty_team_name") != pl.col("home_team")).cast(pl.UInt8))
+            .alias("penalty_team"),
+        )
+        .select(
+            "game",
+            "line_no",
+            "text",
+            "offense",
+            "kicking_team",
+            "in_section",
+            "play_type",
+            "run_yards",
+            "pass_yards",
+            "penalty_team",
+            "penalty_yards",
+            "fg_block_yards",
+            "fg_good_yards",
+        )
+    )
+
+
+def summarize_plays(plays: pl.DataFrame, teams: pl.DataFrame) -> pl.DataFrame:
+    """
+    Aggregates the output of classify_plays per game and team.
+
+    Returns:
+        pl.DataFrame: game, team (0 = home, 1 = visitor), team_name,
+            run_yards and pass_yards (lists in play order), penalty_count,
+            penalty_yards, fg_blocks, fg_block_yards and fg_good_trial_yards;
+            the values of logics.get_yards, get_fg_blocks and
+            get_good_fg_trial_yards.
+    """
+    section = plays.filter("in_section")
+    yards = section.group_by("game", pl.col("offense").alias("team")).agg(
+        pl.col("run_yards").drop_nulls(), pl.col("pass_yards").drop_nulls()
+    )
+    penalties = (
+        section.filter(pl.col("penalty_team").is_not_null())
+        .group_by("game", pl.col("penalty_team").alias("team"))
+        .agg(
+            pl.len().alias("penalty_count"),
+            pl.col("penalty_yards").sum(),
+        )
+    )
+    field_goals = plays.group_by("game", pl.col("kicking_team").alias("team")).agg(
+        pl.col("fg_block_yards").count().alias("fg_blocks"),
+        pl.col("fg_block_yards").sum(),
+        pl.col("fg_good_yards").sum().alias("fg_good_trial_yards"),
+    )
+    grid = pl.concat(
+        [
+            teams.select(
+                "game",
+                pl.lit(team, pl.UInt8).alias("team"),
+                pl.col(column).alias("team_name"),
+            )
+            for team, column in enumerate(("home_team", "visitor_team"))
+        ]
+    )
+    return (
+        grid.join(yards, on=["game", "team"], how="left")
+        .join(penalties, on=["game", "team"], how="left")
+        .join(field_goals, on=["game", "team"], how="left")
+        .with_columns(
+            pl.col("run_yards", "pass_yards").fill_null([]),
+            pl.col(
+                "penalty_count",
+                "penalty_yards",
+                "fg_blocks",
+                "fg_block_yards",
+                "fg_good_trial_yards",
+            )
+            .fill_null(0)
+            .cast(pl.Int64),
+        )
+        .sort("game", "team")
+    )
+
+
+def python_summary(
+    lines: list[str],
+    home_team: str,
+    visitor_team: str,
+    team_abbreviation_dict: dict[str, str],
+) -> list[dict]:
+    """
+    Returns the rows of summarize_plays for one game computed by the
+    per-line Python extractors of logics.py, for comparison.
+    """
+    team_list = [home_team, visitor_team]
+    start = lines.index(PLAY_BY_PLAY_START) + 1
+    end = next(
+        (
+            position
+            for position, line in enumerate(lines[start:], start)
+            if SECTION_END in line
+        ),
+        len(lines) - 1,
+    )
+    extracted_yards, penalty_info = get_yards_from_lines(
+        lines[start : end + 1], team_abbreviation_dict, team_list
+    )
+    fg_blocks = get_fg_blocks(lines, team_list)
+    fg_good_trial_yards = get_good_fg_trial_yards(lines, team_list)
+    sides = [
+        (
+            extracted_yards.home_team_extracted_yards,
+            penalty_info.home_team_penalty_info,
+        ),
+        (
+            extracted_yards.visitor_team_extracted_yards,
+            penalty_info.visitor_team_penalty_info,
+        ),
+    ]
+    return [
+        {
+            "team": team,
+            "team_name": team_list[team],
+            "run_yards": yards.rushing_yards,
+            "pass_yards": yards.passing_yards,
+            "penalty_count": penalty.count,
+            "penalty_yards": penalty.yards,
+            "fg_blocks": fg_blocks[2 * team],
+            "fg_block_yards": fg_blocks[2 * team + 1],
+            "fg_good_trial_yards": fg_good_trial_yards[team],
+        }
+        for team, (yards, penalty) in enumerate(sides)
+    ]
+
+
+def load_play_lines(
+    pdf_paths: Iterable[Path], team_names_list: list[str]
+) -> tuple[pl.DataFrame, pl.DataFrame, dict[str, list[str]]]:
+    """
+    Reads the lines and the two teams of every PDF.
+
+    Returns:
+        tuple: The play_lines_frame of all games, their teams (game,
+            home_team, visitor_team) and the raw lines per game.
+    """
+    games: dict[str, list[str]] = {}
+    teams = []
+    for pdf_path in pdf_paths:
+        pdf_document = open_pdf(pdf_path)
+        # チーム名はヘッダーの "home vs visitor" の行だけから取る
+        home_team, visitor_team = get_home_visitor_team_name(
+            team_names_list, extract_header_lines(pdf_document)
+        )
+        games[pdf_path.stem] = pdf_document_to_list(pdf_document)
+        teams.append((pdf_path.stem, home_team, visitor_team))
+    return (
+        play_lines_frame(games.items()),
+        pl.DataFrame(teams, schema=TEAMS_SCHEMA, orient="row"),
+        games,
+    )
+
+
+@click.command()
+@click.argument("pdf_dir", type=Path)
+@click.option("--teams-file", type=Path, default=Path("teams.json"), show_default=True)
+@click.option(
+    "--output", type=Path, default=None, help="試合・チームごとの集計のParquet"
+)
+@click.option(
+    "--compare",
+    is_flag=True,
+    help="logics.pyの抽出処理でも集計し、結果の一致と処理時間を比べる",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    pdf_dir: Path,
+    teams_file: Path,
+    output: Path | None,
+    compare: bool,
+    log_level: str,
+):
+    """
+    Extracts the yards, penalties and FG outcomes of every PDF in PDF_DIR
+    with one columnar pass over all play-by-play lines.
+    """
+    set_log_level(log_level)
+    team_names_list, team_abbreviation_dict, _ = load_team_names_from_file(teams_file)
+    lines, teams, games = load_play_lines(
+        sorted(pdf_dir.glob("*.pdf")), team_names_list
+    )
+    started = time.perf_counter()
+    summary = summarize_plays(
+        classify_plays(lines, teams, team_abbreviation_dict), teams
+    )
+    logger.info(
+        "%d試合 %d行を%.3f秒で集計しました。",
+        len(teams),
+        len(lines),
+        time.perf_counter() - started,
+    )
+    if compare:
+        started = time.perf_counter()
+        expected = {
+            (game, row["team"]): {"game": game, **row}
+            for game, home_team, visitor_team in teams.iter_rows()
+            for row in python_summary(
+                games[game], home_team, visitor_team, team_abbreviation_dict
+            )
+        }
+        logger.info("logics.py: %.3f秒", time.perf_counter() - started)
+        mismatched = [
+            row["game"]
+            for row in summary.iter_rows(named=True)
+            if expected[(row["game"], row["team"])] != row
+        ]
+        if mismatched:
+            logger.error("結果が一致しません: %s", ", ".join(sorted(set(mismatched))))
+        else:
+            logger.info("logics.pyの結果と一致しました。")
+    if output:
+        summary.write_parquet(output)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        click.echo(summary.drop("run_yards", "pass_yards"))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,243 @@
+from pathlib import Path
+
+import click
+import polars as pl
+
+from atomic_io import atomic_write_parquet
+from logger import logger, set_log_level
+from models import PlayerStat
+
+# 選手・チーム・項目などのキーはCategoricalにし、Parquetでは辞書エンコードで保存する
+PLAYER_STORE_SCHEMA = {
+    "game": pl.Categorical,
+    "team_name": pl.Categorical,
+    "section": pl.Categorical,
+    "number": pl.String,
+    "player": pl.Categorical,
+    "stat": pl.Categorical,
+    "value": pl.Float64,
+}
+SEASON_FILE_NAME = "season.parquet"
+PARTS_DIR_NAME = "parts"
+# 選手ではない行
+NON_PLAYER_ROWS = ("Total", "[TEAM]")
+# 試合をまたいで合計できない率の項目(NETはPUNTINGの1回あたりの平均)
+RATE_STATS = ("AVG", "RT", "NET")
+# 合計ではなく最大値をシーズン記録とする項目(最長プレー)
+MAX_STATS = ("LG",)
+PLAYER_KEYS = ("team_name", "number", "player")
+
+
+def _collect(lazy_frame: pl.LazyFrame) -> pl.DataFrame:
+    # ファイルごとに別々のCategorical辞書を、同じ辞書に揃えて読み込む
+    with pl.StringCache():
+        return lazy_frame.collect()
+
+
+class PlayerStore:
+    """
+    Season-long player stats in Parquet, one row per game, player and stat.
+
+    New games are appended as one small file each under parts/, and
+    compact() merges them into season.parquet sorted by team and player,
+    so lookups for a player only read the row groups that can contain
+    them. Appending a game that is already stored replaces it.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.season_path = self.root / SEASON_FILE_NAME
+        self.parts_dir = self.root / PARTS_DIR_NAME
+
+    def _part_paths(self) -> list[Path]:
+        if not self.parts_dir.exists():
+            return []
+        return sorted(self.parts_dir.glob("*.parquet"))
+
+    def append(self, game: str, player_stats: list[PlayerStat]) -> None:
+        """
+        Adds (or replaces) the player stats of one game.
+
+        Args:
+            game (str): The game key, e.g. the PDF file stem.
+            player_stats (list[PlayerStat]): GameResult.player_stats of the game.
+        """
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+        df = pl.DataFrame(
+            [{"game": game, **row.model_dump()} for row in player_stats],
+            schema=PLAYER_STORE_SCHEMA,
+        )
+        atomic_write_parquet(df, self.parts_dir / f"{game}.parquet")
+        logger.debug("%s の個人スタッツを%d行追加しました。", game, len(df))
+
+    def compact(self) -> None:
+        """
+        Merges the appended games into season.parquet and removes the parts.
+        """
+        part_paths = self._part_paths()
+        if not part_paths:
+            return
+        df = _collect(self.scan().sort("team_name", "player", "section", "game"))
+        atomic_write_parquet(df, self.season_path)
+        for part_path in part_paths:
+            part_path.unlink()
+        logger.info("%d試合を%sにまとめました。", len(part_paths), self.season_path)
+
+    def scan(self) -> pl.LazyFrame:
+        """
+        Returns every stored row as a LazyFrame, parts overriding season.parquet.
+        """
+        part_paths = self._part_paths()
+        frames = []
+        if self.season_path.exists():
+            season = pl.scan_parquet(self.season_path)
+            if part_paths:
+                season = season.filter(
+                    ~pl.col("game")
+                    .cast(pl.String)
+                    .is_in([part_path.stem for part_path in part_paths])
+                )
+            frames.append(season)
+        if part_paths:
+            frames.append(pl.scan_parquet(part_paths))
+        if not frames:
+            return pl.LazyFrame(schema=PLAYER_STORE_SCHEMA)
+        return pl.concat(frames)
+
+    def _season_totals(self, rows: pl.LazyFrame) -> pl.LazyFrame:
+        return (
+            rows.filter(
+                ~pl.col("player").cast(pl.String).is_in(NON_PLAYER_ROWS),
+                ~pl.col("stat").cast(pl.String).is_in(RATE_STATS),
+            )
+            .group_by(*PLAYER_KEYS, "section", "stat")
+            .agg(
+                pl.when(pl.col("stat").cast(pl.String).first().is_in(MAX_STATS))
+                .then(pl.col("value").max())
+                .otherwise(pl.col("value").sum())
+                .alias("total"),
+                pl.col("game").n_unique().alias("games"),
+            )
+            .with_columns(
+                pl.when(pl.col("stat").cast(pl.String).is_in(MAX_STATS))
+                .then(None)
+                .otherwise(pl.col("total") / pl.col("games"))
+                .alias("per_game")
+            )
+        )
+
+    def player_season(self, player: str, team_name: str | None = None) -> pl.DataFrame:
+        """
+        Returns the season total and per-game average of every stat of a player.
+
+        Rate stats (AVG, RT, NET) cannot be summed across games and are left
+        out. For the longest play (LG) the total is the season best and
+        per_game is null.
+
+        Args:
+            player (str): The player name as printed on the 個人スタッツ page.
+            team_name (str, optional): Restricts the lookup to one team.
+
+        Returns:
+            pl.DataFrame: One row per section and stat with total, games and
+                per_game.
+        """
+        rows = self.scan().filter(pl.col("player").cast(pl.String) == player)
+        if team_name is not None:
+            rows = rows.filter(pl.col("team_name").cast(pl.String) == team_name)
+        return _collect(self._season_totals(rows).sort("section", "stat"))
+
+    def top_players(self, section: str, stat: str, n: int = 10) -> pl.DataFrame:
+        """
+        Returns the n players with the largest season total of section / stat.
+        """
+        rows = self.scan().filter(
+            pl.col("section").cast(pl.String) == section,
+            pl.col("stat").cast(pl.String) == stat,
+        )
+        return _collect(
+            self._season_totals(rows).sort("total", descending=True).head(n)
+        )
+
+    def top_returners(self, n: int = 10) -> pl.DataFrame:
+        """
+        Returns the n players with the most return yards (punt, kickoff and
+        other returns together).
+        """
+        rows = self.scan().filter(
+            pl.col("section").cast(pl.String).str.ends_with("RETURNS"),
+            pl.col("stat").cast(pl.String) == "YDS",
+        )
+        return _collect(
+            self._season_totals(rows)
+            .group_by(*PLAYER_KEYS)
+            .agg(pl.col("total").sum(), pl.col("games").max())
+            .sort("total", descending=True)
+            .head(n)
+        )
+
+    def team_leaders(self, section: str, stat: str) -> pl.DataFrame:
+        """
+        Returns the player with the largest season total of section / stat for
+        each team.
+        """
+        rows = self.scan().filter(
+            pl.col("section").cast(pl.String) == section,
+            pl.col("stat").cast(pl.String) == stat,
+        )
+        return _collect(
+            self._season_totals(rows)
+            .sort("total", descending=True)
+            .group_by("team_name", maintain_order=True)
+            .first()
+            .sort(pl.col("team_name").cast(pl.String))
+        )
+
+
+@click.group()
+@click.argument("store_dir", type=Path)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+@click.pass_context
+def main(ctx: click.Context, store_dir: Path, log_level: str):
+    """
+    Queries the player store written by main_multi.py --player-store.
+    """
+    set_log_level(log_level)
+    ctx.obj = PlayerStore(store_dir)
+
+
+@main.command()
+@click.argument("player")
+@click.option("--team", default=None, help="チーム名で絞り込む")
+@click.pass_obj
+def player(store: PlayerStore, player: str, team: str | None):
+    """選手のシーズン合計と1試合平均"""
+    with pl.Config(tbl_rows=-1):
+        click.echo(store.player_season(player, team))
+
+
+@main.command("top-returners")
+@click.option("-n", type=click.IntRange(min=1), default=10, show_default=True)
+@click.pass_obj
+def top_returners(store: PlayerStore, n: int):
+    """リターンヤードの上位n人"""
+    with pl.Config(tbl_rows=-1):
+        click.echo(store.top_returners(n))
+
+
+@main.command()
+@click.argument("section")
+@click.argument("stat")
+@click.pass_obj
+def leaders(store: PlayerStore, section: str, stat: str):
+    """チームごとのSECTION / STATのリーダー (例: RUSHING YDS)"""
+    with pl.Config(tbl_rows=-1):
+        click.echo(store.team_leaders(section, stat))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,301 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+import click
+import numpy as np
+import polars as pl
+from scipy.sparse import csr_matrix, identity, vstack
+from scipy.sparse.linalg import lsqr
+
+from atomic_io import atomic_write_parquet
+from logger import logger, set_log_level
+
+# main_multi.pyが試合ごとに書き出すStatsのCSV (末尾の数字は0がホーム、1がビジター)
+STATS_GLOB = "*_stats_*.csv"
+ROWS_FILE_NAME = "rows.parquet"
+RATINGS_FILE_NAME = "ratings.parquet"
+# 指標ごとの(値, 重み)。重みは値の元になったプレイ数などで、0の行は使わない
+METRICS = {
+    "points": (pl.col("team_score").cast(pl.Float64), pl.lit(1.0)),
+    "yards_per_play": (
+        (pl.col("team_stats_info_run_gain") + pl.col("team_stats_info_pass_gain"))
+        / pl.col("plays"),
+        pl.col("plays").cast(pl.Float64),
+    ),
+    "third_down_rate": (
+        pl.col("third_down_stats_third_down_success")
+        / pl.col("third_down_stats_third_down_numbers"),
+        pl.col("third_down_stats_third_down_numbers").cast(pl.Float64),
+    ),
+}
+# 試合数の少ないチームの評価が極端にならないよう、解のノルムにかける罰則
+DEFAULT_DAMP = 0.1
+
+
+def game_key(file_path: Path) -> str:
+    """
+    Returns "folder/game" for a per-game stats CSV, so games with the same
+    file name in different season folders are kept apart.
+    """
+    game = file_path.name.rsplit("_stats_", 1)[0]
+    return f"{file_path.resolve().parent.name}/{game}"
+
+
+def load_game_rows(files: list[Path]) -> pl.DataFrame:
+    """
+    Loads per-game stats CSVs into one row per team and game.
+
+    Returns:
+        pl.DataFrame: game, team_name, opponent_name and, for every metric
+            in METRICS, its value and weight columns.
+    """
+    if not files:
+        return pl.DataFrame(schema=_rows_schema())
+    return (
+        pl.concat(
+            [
+                pl.scan_csv(file_path).with_columns(
+                    pl.lit(game_key(file_path)).alias("game")
+                )
+                for file_path in files
+            ],
+            how="diagonal_relaxed",
+        )
+        .with_columns(
+            (
+                pl.col("team_stats_info_run_play")
+                + pl.col("team_stats_info_passing_attempts_info_attempts")
+            ).alias("plays"),
+        )
+        .select(
+            "game",
+            pl.col("team_stats_info_team_name").alias("team_name"),
+            pl.col("team_stats_info_opponent_name").alias("opponent_name"),
+            *(
+                expression.alias(f"{metric}_{part}")
+                for metric, expressions in METRICS.items()
+                for part, expression in zip(("value", "weight"), expressions)
+            ),
+        )
+        .collect()
+    )
+
+
+def _rows_schema() -> dict[str, pl.DataType]:
+    schema: dict[str, pl.DataType] = {
+        "game": pl.String(),
+        "team_name": pl.String(),
+        "opponent_name": pl.String(),
+    }
+    for metric in METRICS:
+        schema[f"{metric}_value"] = pl.Float64()
+        schema[f"{metric}_weight"] = pl.Float64()
+    return schema
+
+
+def build_design_matrix(
+    team_names: pl.Series, opponent_names: pl.Series, teams: list[str]
+) -> csr_matrix:
+    """
+    Returns the sparse (rows x 2 * teams) design of "offense vs defense".
+
+    Row i has +1 in the offense column of team_names[i] and -1 in the
+    defense column of opponent_names[i] (columns len(teams) onwards), so a
+    positive defensive rating means the team holds opponents below average.
+    """
+    index = {team: position for position, team in enumerate(teams)}
+    n_rows = len(team_names)
+    offense = np.fromiter((index[team] for team in team_names), int, n_rows)
+    defense = np.fromiter((index[team] for team in opponent_names), int, n_rows)
+    return csr_matrix(
+        (
+            np.tile([1.0, -1.0], n_rows),
+            np.column_stack([offense, len(teams) + defense]).ravel(),
+            np.arange(0, 2 * n_rows + 1, 2),
+        ),
+        shape=(n_rows, 2 * len(teams)),
+    )
+
+
+def solve_ratings(
+    rows: pl.DataFrame,
+    damp: float = DEFAULT_DAMP,
+    previous: pl.DataFrame | None = None,
+) -> pl.DataFrame:
+    """
+    Solves the opponent-adjusted offensive and defensive rating of every team.
+
+    For each metric, value = average + offense[team] - defense[opponent]
+    is fitted by weighted, damped least squares with scipy's lsqr on the
+    sparse design, so memory grows with the number of games, never with
+    teams squared.
+
+    Args:
+        rows (pl.DataFrame): The output of load_game_rows.
+        damp (float): The damping (ridge) factor of lsqr.
+        previous (pl.DataFrame, optional): Earlier ratings to start from.
+            lsqr then solves for the correction to them, with the damping
+            still applied to the ratings themselves, so the result is the
+            same as without previous but adding a few games takes only a
+            few iterations.
+
+    Returns:
+        pl.DataFrame: team_name, games, and per metric the average,
+            offense and defense columns.
+    """
+    teams = sorted(set(rows["team_name"]) | set(rows["opponent_name"]))
+    ratings = pl.DataFrame({"team_name": teams}).join(
+        rows.group_by("team_name").agg(pl.col("game").n_unique().alias("games")),
+        on="team_name",
+        how="left",
+    )
+    for metric in METRICS:
+        metric_rows = rows.filter(pl.col(f"{metric}_weight") > 0)
+        values = metric_rows[f"{metric}_value"].to_numpy()
+        weights = metric_rows[f"{metric}_weight"].to_numpy()
+        average = float(np.average(values, weights=weights)) if len(values) else 0.0
+        # 重み付き最小二乗は、各行をsqrt(重み)倍した通常の最小二乗になる
+        scale = np.sqrt(weights / weights.mean()) if len(weights) else weights
+        design = build_design_matrix(
+            metric_rows["team_name"], metric_rows["opponent_name"], teams
+        )
+        design = csr_matrix(design.multiply(scale[:, None]))
+        target = (values - average) * scale
+        if previous is not None and f"{metric}_offense" in previous.columns:
+            # lsqrのx0はx - x0を罰するので、罰則の行を自分で加えて補正量を解く
+            x0 = _previous_solution(previous, teams, metric)
+            correction, _, iterations, *_ = lsqr(
+                vstack([design, damp * identity(len(x0), format="csr")]),
+                np.concatenate([target - design @ x0, -damp * x0]),
+            )
+            solution = x0 + correction
+        else:
+            solution, _, iterations, *_ = lsqr(design, target, damp=damp)
+        logger.debug("%s: lsqrの反復回数 %d", metric, iterations)
+        ratings = ratings.with_columns(
+            pl.lit(average).alias(f"{metric}_average"),
+            pl.Series(f"{metric}_offense", solution[: len(teams)]),
+            pl.Series(f"{metric}_defense", solution[len(teams) :]),
+        )
+    return ratings
+
+
+def _previous_solution(previous: pl.DataFrame, teams: list[str], metric: str):
+    # 新しく加わったチームは0から始める
+    aligned = (
+        pl.DataFrame({"team_name": teams})
+        .join(previous, on="team_name", how="left")
+        .fill_null(0.0)
+    )
+    return np.concatenate(
+        [
+            aligned[f"{metric}_offense"].to_numpy(),
+            aligned[f"{metric}_defense"].to_numpy(),
+        ]
+    )
+
+
+class RatingsStore:
+    """
+    The team-game rows seen so far and the ratings solved from them.
+
+    update() only reads the stats CSVs of games that are not stored yet,
+    and warm-starts the solver from the stored ratings. Games are keyed by
+    game_key (folder and file name).
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.rows_path = self.root / ROWS_FILE_NAME
+        self.ratings_path = self.root / RATINGS_FILE_NAME
+
+    def rows(self) -> pl.DataFrame:
+        if not self.rows_path.exists():
+            return pl.DataFrame(schema=_rows_schema())
+        return pl.read_parquet(self.rows_path)
+
+    def ratings(self) -> pl.DataFrame | None:
+        if not self.ratings_path.exists():
+            return None
+        return pl.read_parquet(self.ratings_path)
+
+    def update(
+        self, folders: Iterable[Path], damp: float = DEFAULT_DAMP
+    ) -> pl.DataFrame:
+        """
+        Adds the games of the stats CSVs in folders and re-solves the ratings.
+
+        Returns:
+            pl.DataFrame: The ratings (see solve_ratings).
+
+        Raises:
+            ValueError: If there is no game at all.
+        """
+        rows = self.rows()
+        known_games = set(rows["game"])
+        new_files = [
+            file_path
+            for folder in folders
+            for file_path in sorted(Path(folder).glob(STATS_GLOB))
+            if game_key(file_path) not in known_games
+        ]
+        new_rows = load_game_rows(new_files)
+        logger.info("%d試合を追加します。", new_rows["game"].n_unique())
+        rows = pl.concat([rows, new_rows.cast(_rows_schema())])
+        if rows.is_empty():
+            raise ValueError("試合ごとのStatsのCSVが見つかりません")
+        previous = self.ratings()
+        if new_rows.is_empty() and previous is not None:
+            return previous
+        ratings = solve_ratings(rows, damp=damp, previous=previous)
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_parquet(rows, self.rows_path)
+        atomic_write_parquet(ratings, self.ratings_path)
+        return ratings
+
+
+@click.command()
+@click.argument("store_dir", type=Path)
+@click.argument("folders", nargs=-1, type=Path)
+@click.option(
+    "--metric",
+    type=click.Choice(list(METRICS)),
+    default="points",
+    show_default=True,
+    help="表示する指標",
+)
+@click.option("--damp", type=click.FloatRange(min=0), default=DEFAULT_DAMP)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    store_dir: Path,
+    folders: tuple[Path, ...],
+    metric: str,
+    damp: float,
+    log_level: str,
+):
+    """
+    Opponent-adjusted offensive/defensive ratings from the per-game stats
+    CSVs in FOLDERS, accumulated in STORE_DIR across runs.
+    """
+    set_log_level(log_level)
+    ratings = RatingsStore(store_dir).update(folders, damp=damp)
+    with pl.Config(tbl_rows=-1):
+        click.echo(
+            ratings.select(
+                "team_name",
+                "games",
+                f"{metric}_offense",
+                f"{metric}_defense",
+                (pl.col(f"{metric}_offense") + pl.col(f"{metric}_defense")).alias(
+                    f"{metric}_net"
+                ),
+            ).sort(f"{metric}_net", descending=True)
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import click
+
+from analyzer import game_results_to_frame
+from logger import logger, set_log_level
+from summarize_data import summarize_stats, write_summary
+from utils import (
+    INTERMEDIATE_SUFFIX,
+    export_game_result,
+    load_config_from_file,
+    load_game_intermediate,
+)
+
+
+def recompute(
+    intermediate_dir: Path,
+    config_path: Path,
+    output_dir: Path,
+    result_dir: Path | None = None,
+) -> int:
+    """
+    Rebuilds the per-game outputs (and optionally the summaries) from the
+    intermediate files under another config, without opening any PDF.
+
+    Args:
+        intermediate_dir (Path): The output_dir of an earlier main_multi run.
+        config_path (Path): The new config.json.
+        output_dir (Path): Where the per-game files are written again; may
+            be intermediate_dir itself.
+        result_dir (Path, optional): Where team_stats.csv and
+            opponent_stats.csv are written.
+
+    Returns:
+        int: The number of games recomputed.
+    """
+    config = load_config_from_file(config_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    game_results = []
+    for file_path in sorted(intermediate_dir.glob(f"*{INTERMEDIATE_SUFFIX}")):
+        game = file_path.name.removesuffix(INTERMEDIATE_SUFFIX)
+        game_result = load_game_intermediate(file_path, config)
+        export_game_result(game_result, Path(game), output_dir)
+        game_results.append(game_result)
+    if result_dir is not None and game_results:
+        df_team_stats, df_opponent_stats = summarize_stats(
+            game_results_to_frame(game_results)
+        )
+        write_summary(df_team_stats, df_opponent_stats, result_dir)
+    return len(game_results)
+
+
+@click.command()
+@click.argument("intermediate_dir", type=Path)
+@click.argument("config_path", type=Path, default="config.json")
+@click.argument("output_dir", type=Path, default="output")
+@click.option(
+    "--result-dir",
+    type=Path,
+    default=None,
+    help="指定した場合、team_stats.csv / opponent_stats.csvも作り直す",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    intermediate_dir: Path,
+    config_path: Path,
+    output_dir: Path,
+    result_dir: Path | None,
+    log_level: str,
+):
+    """
+    Re-derives every Stats export from the *_game.json files written by
+    main_multi.py, under CONFIG_PATH.
+    """
+    set_log_level(log_level)
+    count = recompute(intermediate_dir, config_path, output_dir, result_dir)
+    logger.info("%d試合を %s の設定で出力し直しました。", count, config_path)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,318 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+import click
+import numpy as np
+import polars as pl
+
+from logger import logger, set_log_level
+from ratings import STATS_GLOB, load_game_rows, solve_ratings
+from utils import load_team_names_from_file
+
+DEFAULT_SIMULATIONS = 100_000
+DEFAULT_PLAYOFF_TEAMS = 4
+# 得点のばらつき(標準偏差)の事前値と、その重みとなる仮想試合数。
+# 試合数の少ないチームは評価で残差がほぼ0になるため、この値に寄せる
+SPREAD_PRIOR = 10.0
+SPREAD_PRIOR_GAMES = 4
+
+
+class ScoringModel:
+    """
+    Per-team scoring distributions fitted on the games played so far.
+
+    A team's score against an opponent is drawn from a normal distribution
+    with mean = league average + offense[team] - defense[opponent] (the
+    opponent-adjusted points ratings of ratings.py) and the spread of the
+    team's own residuals, shrunk toward SPREAD_PRIOR. Scores are
+    rounded and floored at 0.
+    """
+
+    def __init__(self, rows: pl.DataFrame, teams: list[str]):
+        self.teams = teams
+        self.index = {team: position for position, team in enumerate(teams)}
+        ratings = (
+            pl.DataFrame({"team_name": teams})
+            .join(solve_ratings(rows), on="team_name", how="left")
+            .fill_null(0.0)
+        )
+        self.average = float(rows["points_value"].mean() or 0.0)
+        self.offense = ratings["points_offense"].to_numpy()
+        self.defense = ratings["points_defense"].to_numpy()
+        self.spread = self._fit_spread(rows)
+
+    def mean(self, team: np.ndarray, opponent: np.ndarray) -> np.ndarray:
+        return self.average + self.offense[team] - self.defense[opponent]
+
+    def _fit_spread(self, rows: pl.DataFrame) -> np.ndarray:
+        rows = rows.filter(
+            pl.col("team_name").is_in(self.teams),
+            pl.col("opponent_name").is_in(self.teams),
+        )
+        team = np.array([self.index[name] for name in rows["team_name"]], dtype=int)
+        opponent = np.array(
+            [self.index[name] for name in rows["opponent_name"]], dtype=int
+        )
+        squared = (rows["points_value"].to_numpy() - self.mean(team, opponent)) ** 2
+        games = np.bincount(team, minlength=len(self.teams))
+        team_squared = np.bincount(team, weights=squared, minlength=len(self.teams))
+        variance = (team_squared + SPREAD_PRIOR_GAMES * SPREAD_PRIOR**2) / (
+            games + SPREAD_PRIOR_GAMES
+        )
+        return np.sqrt(variance)
+
+    def play(
+        self, home: np.ndarray, visitor: np.ndarray, rng: np.random.Generator
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Simulates games between the team indices home and visitor (any shape).
+
+        Returns:
+            tuple: home scores, visitor scores and whether the home team won
+                (ties, which go to overtime, are decided by a coin flip).
+        """
+        home_score = np.maximum(
+            np.rint(rng.normal(self.mean(home, visitor), self.spread[home])), 0
+        )
+        visitor_score = np.maximum(
+            np.rint(rng.normal(self.mean(visitor, home), self.spread[visitor])), 0
+        )
+        home_won = (home_score > visitor_score) | (
+            (home_score == visitor_score) & (rng.random(home_score.shape) < 0.5)
+        )
+        return home_score, visitor_score, home_won
+
+
+def _bracket_order(n_teams: int) -> list[int]:
+    # 1位と最下位、2位と下から2番目...が当たり、上位同士は勝ち上がるまで当たらない並び
+    order = [0]
+    while len(order) < n_teams:
+        size = len(order) * 2
+        order = [seed for top in order for seed in (top, size - 1 - top)]
+    return order
+
+
+def simulate_season(
+    rows: pl.DataFrame,
+    teams: list[str],
+    remaining_games: list[tuple[str, str]],
+    n_simulations: int = DEFAULT_SIMULATIONS,
+    playoff_teams: int = DEFAULT_PLAYOFF_TEAMS,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """
+    Simulates the rest of the regular season and the playoff bracket.
+
+    Every remaining game of every simulation is drawn in one batch, and
+    standings, placements and bracket rounds are computed with array
+    operations, so there is no Python loop over games or simulations.
+
+    Args:
+        rows (pl.DataFrame): The games played so far (ratings.load_game_rows).
+        teams (list[str]): The teams of the league, e.g. from teams.json.
+        remaining_games (list[tuple[str, str]]): (home, visitor) to simulate.
+        n_simulations (int): The number of simulated seasons.
+        playoff_teams (int): The size of the single-elimination bracket
+            (a power of two) filled by the top of the standings.
+        seed (int): The seed; the same inputs and seed give the same result.
+
+    Returns:
+        pl.DataFrame: One row per team with the probability of each final
+            place (place_1, ...), of making the playoffs and of the title.
+
+    Raises:
+        ValueError: If playoff_teams is not a power of two up to len(teams).
+    """
+    n_teams = len(teams)
+    if playoff_teams > n_teams or playoff_teams & (playoff_teams - 1):
+        raise ValueError(
+            f"プレーオフのチーム数は{n_teams}以下の2のべき乗にしてください"
+        )
+    model = ScoringModel(rows, teams)
+    rng = np.random.default_rng(seed)
+
+    # 消化済みの試合の勝ち数と得失点差
+    played = rows.filter(
+        pl.col("team_name").is_in(teams), pl.col("opponent_name").is_in(teams)
+    )
+    margins = (
+        played.join(
+            played.select(
+                "game",
+                pl.col("team_name").alias("opponent_name"),
+                pl.col("points_value").alias("allowed"),
+            ),
+            on=["game", "opponent_name"],
+        )
+        .group_by("team_name")
+        .agg(
+            (pl.col("points_value") > pl.col("allowed")).sum().alias("wins"),
+            (pl.col("points_value") - pl.col("allowed")).sum().alias("difference"),
+        )
+    )
+    wins = np.zeros(n_teams)
+    difference = np.zeros(n_teams)
+    for team_name, team_wins, team_difference in margins.iter_rows():
+        wins[model.index[team_name]] = team_wins
+        difference[model.index[team_name]] = team_difference
+
+    # 残り試合: (シミュレーション数, 試合数)で一度に引く
+    home = np.array([model.index[game[0]] for game in remaining_games], dtype=int)
+    visitor = np.array([model.index[game[1]] for game in remaining_games], dtype=int)
+    home_score, visitor_score, home_won = model.play(
+        np.broadcast_to(home, (n_simulations, len(home))),
+        np.broadcast_to(visitor, (n_simulations, len(visitor))),
+        rng,
+    )
+    home_onehot = np.eye(n_teams)[home]
+    visitor_onehot = np.eye(n_teams)[visitor]
+    season_wins = wins + home_won @ home_onehot + (~home_won) @ visitor_onehot
+    season_difference = (
+        difference
+        + (home_score - visitor_score) @ home_onehot
+        + (visitor_score - home_score) @ visitor_onehot
+    )
+
+    # 勝ち数、得失点差の順に並べ、それでも並んだら無作為に決める
+    standings = np.lexsort(
+        (rng.random((n_simulations, n_teams)), -season_difference, -season_wins),
+        axis=1,
+    )
+    places = np.empty_like(standings)
+    np.put_along_axis(places, standings, np.arange(n_teams), axis=1)
+    place_counts = np.bincount(
+        (np.arange(n_teams) * n_teams + places).ravel(), minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+
+    # プレーオフ: 勝ち上がったチームを隣同士で対戦させ、1チームになるまで繰り返す
+    bracket = standings[:, _bracket_order(playoff_teams)]
+    while bracket.shape[1] > 1:
+        _, _, top_won = model.play(bracket[:, ::2], bracket[:, 1::2], rng)
+        bracket = np.where(top_won, bracket[:, ::2], bracket[:, 1::2])
+    champions = np.bincount(bracket[:, 0], minlength=n_teams)
+
+    return pl.DataFrame(
+        {
+            "team_name": teams,
+            **{
+                f"place_{place + 1}": place_counts[:, place] / n_simulations
+                for place in range(n_teams)
+            },
+            "playoffs": place_counts[:, :playoff_teams].sum(axis=1) / n_simulations,
+            "champion": champions / n_simulations,
+        }
+    ).sort("champion", descending=True)
+
+
+def remaining_round_robin(
+    rows: pl.DataFrame, teams: list[str]
+) -> list[tuple[str, str]]:
+    """
+    Returns the round-robin pairings of teams that have not been played yet.
+
+    Only teams that appear in rows are paired, so teams of another division
+    listed in teams.json are not scheduled against this one.
+    """
+    played = {
+        frozenset(pair)
+        for pair in rows.select("team_name", "opponent_name").iter_rows()
+    }
+    # 消化済みの試合に出てこないチーム(別の地区など)は組み合わせない
+    played_teams = set(rows["team_name"])
+    league = [team for team in teams if team in played_teams]
+    return [
+        (home, visitor)
+        for position, home in enumerate(league)
+        for visitor in league[position + 1 :]
+        if frozenset((home, visitor)) not in played
+    ]
+
+
+def load_schedule(file_path: Path) -> list[tuple[str, str]]:
+    """
+    Reads the remaining games from a CSV with home_team and visitor_team columns.
+    """
+    schedule = pl.read_csv(file_path)
+    return list(schedule.select("home_team", "visitor_team").iter_rows())
+
+
+def load_played_games(folders: Iterable[Path]) -> pl.DataFrame:
+    return load_game_rows(
+        [
+            file_path
+            for folder in folders
+            for file_path in sorted(Path(folder).glob(STATS_GLOB))
+        ]
+    )
+
+
+@click.command()
+@click.argument("folders", nargs=-1, type=Path)
+@click.option("--teams-file", type=Path, default=Path("teams.json"), show_default=True)
+@click.option(
+    "--schedule",
+    type=Path,
+    default=None,
+    help="残り試合のCSV (home_team, visitor_team)。省略時は未対戦の総当たり",
+)
+@click.option(
+    "--simulations",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SIMULATIONS,
+    show_default=True,
+)
+@click.option(
+    "--playoff-teams",
+    type=click.IntRange(min=1),
+    default=DEFAULT_PLAYOFF_TEAMS,
+    show_default=True,
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option("--output", type=Path, default=None, help="結果を書き出すCSV")
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    folders: tuple[Path, ...],
+    teams_file: Path,
+    schedule: Path | None,
+    simulations: int,
+    playoff_teams: int,
+    seed: int,
+    output: Path | None,
+    log_level: str,
+):
+    """
+    Simulates the rest of the season and the playoffs from the per-game
+    stats CSVs in FOLDERS.
+    """
+    set_log_level(log_level)
+    teams, _, _ = load_team_names_from_file(teams_file)
+    rows = load_played_games(folders)
+    remaining_games = (
+        load_schedule(schedule) if schedule else remaining_round_robin(rows, teams)
+    )
+    logger.info(
+        "消化済み%d試合、残り%d試合を%d回シミュレーションします。",
+        rows["game"].n_unique(),
+        len(remaining_games),
+        simulations,
+    )
+    result = simulate_season(
+        rows,
+        teams,
+        remaining_games,
+        n_simulations=simulations,
+        playoff_teams=playoff_teams,
+        seed=seed,
+    )
+    if output:
+        result.write_csv(output)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        click.echo(result.select("team_name", "place_1", "playoffs", "champion"))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -350,10 +350,10 @@ def process_team_data(df: pl.DataFrame):
     return df_stats
 
 
-@click.command()
-@click.argument("folder_path")
-@click.argument("output_folder")
-def main(folder_path, output_folder):
+def load_stats_csvs(folder_path) -> pl.DataFrame:
+    """
+    Loads every per-game stats CSV in folder_path into one DataFrame.
+    """
     # "stats"という文字列を含むcsvファイルのみを選択
     csv_list = glob(os.path.join(folder_path, "*stats*.csv"))
 
@@ -361,8 +361,19 @@ def main(folder_path, output_folder):
     df_list = [pl.read_csv(csv) for csv in csv_list]
 
     # データフレームを結合
-    df_concat = pl.concat(df_list)
+    return pl.concat(df_list)
 
+
+def summarize_stats(df_concat: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Aggregates per-game stats rows into the team and opponent summaries.
+
+    Args:
+        df_concat (pl.DataFrame): One row per team and game.
+
+    Returns:
+        tuple[pl.DataFrame, pl.DataFrame]: The team stats and the opponent stats.
+    """
     # チーム名が含まれるデータ
     df_team = df_concat.filter(pl.col("team_stats_info_team_name").is_in(target_teams))
 
@@ -382,7 +393,12 @@ def main(folder_path, output_folder):
     # データ処理
     df_team_stats = process_team_data(df_team)
     df_opponent_stats = process_team_data(df_opponent)
+    return df_team_stats, df_opponent_stats
+
 
+def write_summary(
+    df_team_stats: pl.DataFrame, df_opponent_stats: pl.DataFrame, output_folder
+) -> None:
     # output_folderが存在しない場合、作成
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
@@ -390,6 +406,17 @@ def main(folder_path, output_folder):
     df_team_stats.write_csv(os.path.join(output_folder, "team_stats.csv"))
     df_opponent_stats.write_csv(os.path.join(output_folder, "opponent_stats.csv"))
 
+
+@click.command()
+@click.argument("folder_path")
+@click.argument("output_folder")
+def main(folder_path, output_folder):
+    df_concat = load_stats_csvs(folder_path)
+
+    df_team_stats, df_opponent_stats = summarize_stats(df_concat)
+
+    write_summary(df_team_stats, df_opponent_stats, output_folder)
+
     # 結果を表示
     print("チーム名が含まれるデータ:")
     print(df_team_stats)
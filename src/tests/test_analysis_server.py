@@ -0,0 +1,142 @@
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from analysis_server import AnalysisService, LRUCache, run_server
+from analyzer import init_worker
+
+TEST_PDF = Path("test/data/test1.pdf")
+
+
+class TestLRUCache:
+    """LRUCacheクラスのテスト"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+        assert cache.hits == 3
+        assert cache.misses == 1
+
+
+async def _request(port: int, method: str, target: str, body: bytes = b"", headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        (
+            f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n{headers}"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii")
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, json.loads(payload)
+
+
+async def _exercise_server():
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    server_task = asyncio.create_task(
+        run_server("127.0.0.1", 0, Path("config.json"), 1, 4, ready=ready)
+    )
+    port = await ready
+    try:
+        pdf_bytes = TEST_PDF.read_bytes()
+        results = {}
+        results["upload"] = await _request(port, "POST", "/analyze", pdf_bytes)
+        results["again"] = await _request(port, "POST", "/analyze", pdf_bytes)
+        results["path"] = await _request(
+            port,
+            "POST",
+            "/analyze",
+            json.dumps({"path": str(TEST_PDF)}).encode(),
+            "Content-Type: application/json\r\n",
+        )
+        results["broken"] = await _request(port, "POST", "/analyze", b"not a pdf")
+        results["missing"] = await _request(port, "GET", "/analyze?path=missing.pdf")
+        results["unknown"] = await _request(port, "GET", "/unknown")
+        results["health"] = await _request(port, "GET", "/health")
+        return results
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+
+
+class TestAnalysisServer:
+    """ローカルHTTP解析サービスのテスト"""
+
+    def test_endpoints(self):
+        results = asyncio.run(_exercise_server())
+
+        status, payload = results["upload"]
+        assert status == 200
+        assert payload["cached"] is False
+        assert payload["home_stats"]["team_stats_info"]["team_name"] == (
+            "富士通フロンティアーズ"
+        )
+        assert payload["visitor_stats"]["team_score"] == 14
+        assert payload["home_stats"]["run_yards"]
+        assert payload["field_position"]["home_team_starting_field_position"]
+
+        status, again = results["again"]
+        assert status == 200
+        assert again["cached"] is True
+        assert again["sha256"] == payload["sha256"]
+
+        status, by_path = results["path"]
+        assert status == 200
+        assert by_path["cached"] is True
+
+        assert results["broken"][0] == 422
+        assert results["missing"][0] == 404
+        assert results["unknown"][0] == 404
+        assert results["health"][1]["cache_entries"] == 1
+
+    def test_timeout_returns_504_and_recycles_workers(self):
+        async def exercise():
+            service = AnalysisService(
+                partial(
+                    ProcessPoolExecutor,
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(Path("config.json"),),
+                ),
+                cache_size=4,
+                # ワーカーの起動も間に合わない時間
+                timeout=0.001,
+            )
+            try:
+                hung_executor = service.executor
+                pdf_bytes = TEST_PDF.read_bytes()
+                # 同じPDFを待っているリクエストにも504を返す
+                timed_out = await asyncio.gather(
+                    service.handle("POST", "/analyze", {}, pdf_bytes),
+                    service.handle("POST", "/analyze", {}, pdf_bytes),
+                )
+                recycled = service.executor is not hung_executor
+                service.timeout = 60
+                recovered = await service.handle("POST", "/analyze", {}, pdf_bytes)
+                return timed_out, recycled, recovered
+            finally:
+                service.close()
+
+        timed_out, recycled, recovered = asyncio.run(exercise())
+        assert [status for status, _ in timed_out] == [504, 504]
+        assert recycled
+        assert recovered[0] == 200
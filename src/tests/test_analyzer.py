@@ -0,0 +1,96 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pymupdf  # type: ignore
+import pytest
+
+from analyzer import (
+    GameAnalysisError,
+    analyze_game,
+    analyze_games,
+    analyze_pdf,
+    load_analysis_context,
+    resolve_fields,
+)
+from models import FIELD_TIERS
+from summarize_data import summarize_stats
+from utils import stats_to_flat_dict
+
+TEST_DATA_DIR = Path("test/data")
+CONFIG_PATH = Path("config.json").resolve()
+TEAMS_PATH = Path("teams.json").resolve()
+
+
+class TestAnalyzeGame:
+    """analyze_game関数のテスト"""
+
+    def test_path_bytes_and_document_give_same_result(self, tmp_path, monkeypatch):
+        pdf_path = (TEST_DATA_DIR / "test1.pdf").resolve()
+        monkeypatch.chdir(tmp_path)
+
+        from_path = analyze_game(pdf_path, CONFIG_PATH, TEAMS_PATH)
+        from_bytes = analyze_game(pdf_path.read_bytes(), CONFIG_PATH, TEAMS_PATH)
+        with pymupdf.open(pdf_path) as pdf_document:
+            from_document = analyze_game(pdf_document, CONFIG_PATH, TEAMS_PATH)
+
+        assert from_path.home_stats.team_stats_info.team_name == (
+            "富士通フロンティアーズ"
+        )
+        assert from_path == from_bytes == from_document
+        # ファイルには何も書き出さない
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_pdf_raises_game_analysis_error(self):
+        with pytest.raises(GameAnalysisError) as exc_info:
+            analyze_game(b"not a pdf", CONFIG_PATH, TEAMS_PATH)
+        assert exc_info.value.stage == "open_pdf"
+
+
+class TestAnalyzeGames:
+    """analyze_games関数のテスト"""
+
+    def test_frame_matches_expected_summary(self):
+        pdf_paths = sorted(TEST_DATA_DIR.glob("*.pdf"))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            df = analyze_games(pdf_paths, executor, CONFIG_PATH, TEAMS_PATH)
+
+        assert df.height == 2 * len(pdf_paths)
+        df_team_stats, _ = summarize_stats(df)
+        expected = pd.read_csv(TEST_DATA_DIR / "result" / "team_stats.csv")
+        pd.testing.assert_frame_equal(
+            df_team_stats.to_pandas(), expected, check_dtype=False
+        )
+
+
+class TestFields:
+    """抽出グループ指定のテスト"""
+
+    def test_boxscore_only_reads_first_page(self, monkeypatch):
+        pdf_path = TEST_DATA_DIR / "test1.pdf"
+        full = analyze_game(pdf_path, CONFIG_PATH, TEAMS_PATH)
+
+        loaded_pages = set()
+        load_page = pymupdf.Document.load_page
+
+        def recording_load_page(self, page_id, *args, **kwargs):
+            loaded_pages.add(page_id)
+            return load_page(self, page_id, *args, **kwargs)
+
+        monkeypatch.setattr(pymupdf.Document, "load_page", recording_load_page)
+        config, team_names = load_analysis_context(CONFIG_PATH, TEAMS_PATH)
+        boxscore = analyze_pdf(pdf_path, config, *team_names, fields=["boxscore"])
+
+        assert loaded_pages == {0}
+        assert boxscore.fields == ("boxscore",)
+        box_columns = stats_to_flat_dict(boxscore.home_stats, boxscore.fields)
+        full_columns = stats_to_flat_dict(full.home_stats)
+        assert box_columns == {key: full_columns[key] for key in box_columns}
+        assert "penalty_info_count" not in box_columns
+        assert "kickoff_return_stats_return_num" not in box_columns
+
+    def test_resolve_fields(self):
+        assert resolve_fields(["personal"]) == ("boxscore", "personal")
+        assert resolve_fields(FIELD_TIERS) == FIELD_TIERS
+        with pytest.raises(ValueError):
+            resolve_fields(["unknown"])
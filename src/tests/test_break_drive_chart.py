@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pymupdf  # type: ignore
+import pytest
+
+from break_drive_chart import (
+    _parse_drive_row,
+    drives_to_frame,
+    get_drives,
+    get_series,
+    get_starting_field_position,
+    summarize_drives,
+)
+from models import FieldPositionRecord
+
+TEST_PDF = Path("test/data/test1.pdf")
+TEAMS = ["富士通フロンティアーズ", "IBM"]
+ABBREVIATIONS = ["FF", "BB"]
+
+
+@pytest.fixture
+def drives():
+    with pymupdf.open(TEST_PDF) as pdf_document:
+        return get_drives(pdf_document, TEAMS, ABBREVIATIONS)
+
+
+class TestGetDrives:
+    """get_drives関数のテスト"""
+
+    def test_reads_every_drive_of_both_teams(self, drives):
+        assert [drive.team_name for drive in drives] == [TEAMS[0]] * 10 + [
+            TEAMS[1]
+        ] * 11
+        first = drives[0]
+        assert (first.quarter, first.start_time, first.possession_seconds) == (
+            1,
+            "12:00",
+            11,
+        )
+        # 相手陣46ヤードからの開始は自陣54ヤード
+        assert first.start_play == "Kickoff"
+        assert first.start_yard_line == 54
+        assert first.result == "TouchDown"
+        assert first.end_yard_line == 100
+
+    def test_multi_word_cells_and_penalty_yards(self, drives):
+        drive = drives[14]
+        assert drive.team_name == TEAMS[1]
+        assert (drive.gain_yards, drive.penalty_yards, drive.total_yards) == (
+            40,
+            -5,
+            35,
+        )
+        assert drive.end_yard_line == 67
+        assert drive.result == "4th Down ×"
+
+    @pytest.mark.parametrize(
+        ("ball_on", "end", "expected"),
+        [
+            (["50"], ["BB", "20"], (50, 80)),
+            (["FF", "20"], ["50"], (20, 50)),
+        ],
+    )
+    def test_midfield_has_no_team_abbreviation(self, ball_on, end, expected):
+        # 50ヤードラインは陣地のチーム略称なしで記載される
+        columns = [["2"], ["10:00"], ["8:00"], ["2:00"], ["Punt"], ball_on]
+        columns += [["5"], ["30"], ["0"], ["30"], ["2"], end, ["FG"]]
+        drive = _parse_drive_row(columns, TEAMS[0], TEAMS[1], ABBREVIATIONS[0])
+        assert (drive.start_yard_line, drive.end_yard_line) == expected
+
+    def test_missing_page_raises_value_error(self):
+        with pymupdf.open() as pdf_document:
+            pdf_document.new_page()
+            with pytest.raises(ValueError, match="ドライブチャート"):
+                get_drives(pdf_document, TEAMS, ABBREVIATIONS)
+
+
+class TestDerivedFromDrives:
+    """ドライブから求める集計のテスト"""
+
+    def test_series_counts_the_last_drive(self, drives):
+        series = get_series(drives, TEAMS)
+        assert series.home_series_stats.series_count == 10
+        assert series.home_series_stats.score_count == 6
+        # 最後のドライブのTDも数える
+        assert series.visitor_series_stats.score_count == 2
+
+    def test_starting_field_position(self, drives):
+        field_position = get_starting_field_position(drives, TEAMS)
+        home = field_position.home_team_starting_field_position.field_position
+        assert home[0] == FieldPositionRecord(
+            team_name=TEAMS[0], opponent_name=TEAMS[1], field_position=54, score=1
+        )
+        visitor = field_position.visitor_team_starting_field_position.field_position
+        assert [record.field_position for record in visitor][:3] == [13, 17, 10]
+
+    def test_summarize_drives(self, drives):
+        summary = summarize_drives(drives_to_frame(drives)).row(1, named=True)
+        assert summary["team_name"] == TEAMS[0]
+        assert summary["drives"] == 10
+        assert summary["points_per_drive"] == pytest.approx(3.6)
+        assert summary["plays_per_drive"] == pytest.approx(3.7)
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pymupdf  # type: ignore
+import pytest
+
+from break_personal_stats import (
+    get_kick_off_return_stat,
+    get_player_stats,
+    get_punt_stat,
+)
+
+TEST_PDF = Path("test/data/test1.pdf")
+TEAMS = ["富士通フロンティアーズ", "IBM"]
+
+
+@pytest.fixture
+def player_stats():
+    with pymupdf.open(TEST_PDF) as pdf_document:
+        return get_player_stats(pdf_document, TEAMS)
+
+
+def values_of(player_stats, team_name, section, player):
+    return {
+        row.stat: row.value
+        for row in player_stats
+        if row.team_name == team_name
+        and row.section == section
+        and row.player == player
+    }
+
+
+class TestGetPlayerStats:
+    """get_player_stats関数のテスト"""
+
+    def test_reads_both_teams_of_each_section(self, player_stats):
+        assert values_of(player_stats, TEAMS[0], "RUSHING", "ニクソントラショーン") == {
+            "ATT": 4,
+            "YDS": 82,
+            "AVG": 20.5,
+            "LG": 46,
+            "TD": 3,
+        }
+        assert values_of(player_stats, TEAMS[1], "PASSING", "政本悠紀")["INT"] == 2
+        assert {row.section for row in player_stats} >= {
+            "PASS RECEIVING",
+            "INTERCEPTIONS",
+            "PUNT RETURNS",
+            "その他RETURNS",
+        }
+
+    def test_player_number_and_multi_word_name(self, player_stats):
+        rows = [row for row in player_stats if row.player == "Stewart Logan"]
+        assert {row.number for row in rows} == {"37"}
+        assert (
+            values_of(player_stats, TEAMS[1], "KICKOFF RETURNS", "Stewart Logan")["YDS"]
+            == 39
+        )
+
+    def test_team_row_and_negative_value(self, player_stats):
+        team_row = values_of(player_stats, TEAMS[0], "RUSHING", "[TEAM]")
+        assert team_row["YDS"] == -5
+
+    def test_full_width_fumbles_per_team(self, player_stats):
+        fumbles = values_of(player_stats, TEAMS[1], "FUMBLES", "平松的")
+        assert fumbles["FUM"] == 1
+        # 同じ名前の列には連番が付く
+        assert {"YDS", "TD", "YDS_2", "TD_2"} <= set(fumbles)
+
+
+class TestTeamTotals:
+    """チーム合計をplayer_statsから取り出す関数のテスト"""
+
+    def test_kick_off_return_and_punt(self, player_stats):
+        kick_off_return = get_kick_off_return_stat(player_stats, TEAMS)
+        assert kick_off_return.home_kickoff_return_info.return_yards == 26
+        assert kick_off_return.visitor_kickoff_return_info.return_num == 7
+        punt = get_punt_stat(player_stats, TEAMS)
+        assert punt.visitor_punt_info.punt_yards == 165
+
+    def test_missing_total_raises_value_error(self):
+        with pytest.raises(ValueError, match="PUNTING"):
+            get_punt_stat([], TEAMS)
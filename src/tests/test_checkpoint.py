@@ -0,0 +1,83 @@
+import pytest
+
+from atomic_io import atomic_write, tmp_path_for
+from checkpoint import JOURNAL_FILE_NAME, CheckpointJournal
+
+
+class TestAtomicWrite:
+    """atomic_write関数のテスト"""
+
+    def test_writes_file_and_removes_tmp(self, tmp_path):
+        file_path = tmp_path / "test1_stats_0.csv"
+        with atomic_write(file_path) as f:
+            f.write("a,b\n1,2\n")
+        assert file_path.read_text(encoding="utf-8") == "a,b\n1,2\n"
+        assert not tmp_path_for(file_path).exists()
+
+    def test_keeps_previous_file_on_error(self, tmp_path):
+        file_path = tmp_path / "test1_stats_0.csv"
+        file_path.write_text("old", encoding="utf-8")
+        with pytest.raises(RuntimeError), atomic_write(file_path) as f:
+            f.write("half")
+            raise RuntimeError("killed")
+        assert file_path.read_text(encoding="utf-8") == "old"
+        assert not tmp_path_for(file_path).exists()
+
+    def test_tmp_path_is_not_matched_by_stats_glob(self, tmp_path):
+        file_path = tmp_path / "test1_stats_0.csv"
+        tmp_path_for(file_path).write_text("half", encoding="utf-8")
+        assert list(tmp_path.glob("*stats*.csv")) == []
+
+
+class TestCheckpointJournal:
+    """CheckpointJournalクラスのテスト"""
+
+    @pytest.fixture
+    def pdfs(self, tmp_path):
+        pdf_paths = []
+        for name in ["test1.pdf", "test2.pdf", "test3.pdf"]:
+            pdf_path = tmp_path / "pdfs" / name
+            pdf_path.parent.mkdir(exist_ok=True)
+            pdf_path.write_bytes(b"%PDF-" + name.encode())
+            pdf_paths.append(pdf_path)
+        return pdf_paths
+
+    def test_resume_skips_completed_games(self, tmp_path, pdfs):
+        journal = CheckpointJournal(tmp_path, resume=False)
+        journal.record_completed(pdfs[0])
+        journal.record_completed(pdfs[1])
+
+        resumed = CheckpointJournal(tmp_path, resume=True)
+        assert resumed.is_completed(pdfs[0])
+        assert resumed.is_completed(pdfs[1])
+        assert not resumed.is_completed(pdfs[2])
+
+    def test_changed_pdf_is_not_completed(self, tmp_path, pdfs):
+        CheckpointJournal(tmp_path, resume=False).record_completed(pdfs[0])
+        # 同じ名前で修正版のPDFが置かれた
+        pdfs[0].write_bytes(b"%PDF-corrected")
+        assert not CheckpointJournal(tmp_path, resume=True).is_completed(pdfs[0])
+
+    def test_fresh_run_discards_journal(self, tmp_path, pdfs):
+        CheckpointJournal(tmp_path, resume=False).record_completed(pdfs[0])
+        journal = CheckpointJournal(tmp_path, resume=False)
+        assert not journal.is_completed(pdfs[0])
+        assert not (tmp_path / JOURNAL_FILE_NAME).exists()
+
+    def test_resume_ignores_torn_last_line(self, tmp_path, pdfs):
+        CheckpointJournal(tmp_path, resume=False).record_completed(pdfs[0])
+        with open(tmp_path / JOURNAL_FILE_NAME, "a", encoding="utf-8") as f:
+            f.write('{"game": "test2", "pdf_pa')
+
+        journal = CheckpointJournal(tmp_path, resume=True)
+        assert journal.is_completed(pdfs[0])
+        assert not journal.is_completed(pdfs[1])
+
+        journal.record_completed(pdfs[2])
+        assert CheckpointJournal(tmp_path, resume=True).is_completed(pdfs[2])
+
+    def test_resume_removes_partial_outputs(self, tmp_path):
+        partial = tmp_path_for(tmp_path / "test1_stats_0.csv")
+        partial.write_text("half", encoding="utf-8")
+        CheckpointJournal(tmp_path, resume=True)
+        assert not partial.exists()
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import analyzer
+from analyzer import analyze_pdf, load_analysis_context
+from extractor_cache import (
+    EXTRACTOR_VERSIONS,
+    HELPER_VERSIONS,
+    ExtractorCache,
+    pdf_digest,
+)
+
+TEST_PDF = Path("test/data/test1.pdf")
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("キャッシュが使われていません")
+
+
+class TestExtractorCache:
+    """ExtractorCacheクラスのテスト"""
+
+    def test_reruns_only_on_new_version_or_inputs(self, tmp_path, monkeypatch):
+        cache = ExtractorCache(tmp_path)
+        calls = []
+
+        def extractor(values):
+            calls.append(values)
+            return sum(values)
+
+        assert cache.get_or_run("extract_score", "pdf", extractor, [1, 2]) == 3
+        assert cache.get_or_run("extract_score", "pdf", extractor, [1, 2]) == 3
+        assert len(calls) == 1
+        cache.get_or_run("extract_score", "pdf", extractor, [1, 3])
+        assert len(calls) == 2
+        monkeypatch.setitem(EXTRACTOR_VERSIONS, "extract_score", 2)
+        cache.get_or_run("extract_score", "pdf", extractor, [1, 2])
+        assert len(calls) == 3
+
+    def test_helper_version_invalidates_every_stage(self, tmp_path, monkeypatch):
+        cache = ExtractorCache(tmp_path)
+        calls = []
+
+        def extractor(value):
+            calls.append(value)
+            return value
+
+        cache.get_or_run("extract_score", "pdf", extractor, 1)
+        cache.get_or_run("get_yards", "pdf", extractor, 1)
+        monkeypatch.setitem(HELPER_VERSIONS, "text_lines", 2)
+        cache.get_or_run("extract_score", "pdf", extractor, 1)
+        cache.get_or_run("get_yards", "pdf", extractor, 1)
+        assert len(calls) == 4
+
+    def test_unreadable_entry_is_recomputed(self, tmp_path):
+        cache = ExtractorCache(tmp_path)
+        file_path = cache.path_for(cache.stage_key("extract_score", "pdf", [1]))
+        file_path.parent.mkdir(parents=True)
+        file_path.write_bytes(b"broken")
+        assert cache.get_or_run("extract_score", "pdf", lambda value: value, 1) == 1
+
+    def test_pdf_digest(self):
+        assert pdf_digest(TEST_PDF) == pdf_digest(TEST_PDF.read_bytes())
+
+
+class TestAnalyzePdfWithCache:
+    """analyze_pdf関数のextractor_cache引数のテスト"""
+
+    def test_only_bumped_extractor_is_rerun(self, tmp_path, monkeypatch):
+        config, team_names = load_analysis_context(
+            Path("config.json"), Path("teams.json")
+        )
+        cache = ExtractorCache(tmp_path)
+        first = analyze_pdf(TEST_PDF, config, *team_names, extractor_cache=cache)
+
+        # すべての段階がキャッシュから読まれ、PDFは解析しない
+        for stage in ("extract_summary_table", "get_yards", "get_player_stats"):
+            monkeypatch.setattr(f"analyzer.{stage}", fail)
+        assert (
+            analyze_pdf(TEST_PDF, config, *team_names, extractor_cache=cache) == first
+        )
+
+        # 版を上げた段階だけが再実行される
+        monkeypatch.setitem(EXTRACTOR_VERSIONS, "extract_pr_yards", 2)
+        calls = []
+        original = analyzer.extract_pr_yards
+
+        def counting(stat_table):
+            calls.append(stat_table)
+            return original(stat_table)
+
+        monkeypatch.setattr("analyzer.extract_pr_yards", counting)
+        assert (
+            analyze_pdf(TEST_PDF, config, *team_names, extractor_cache=cache) == first
+        )
+        assert len(calls) == 1
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from field_position import (
+    LEAGUE,
+    bucket_scoring_rates,
+    field_position_files,
+    fit_logistic_batch,
+    fit_scoring_curve,
+    load_field_positions,
+    load_or_fit_scoring_curves,
+)
+from models import FieldPositionRecord, StartingFieldPosition
+
+
+def save_game(folder, game, side, team_name, opponent_name, drives):
+    StartingFieldPosition(
+        field_position=[
+            FieldPositionRecord(
+                team_name=team_name,
+                opponent_name=opponent_name,
+                field_position=field_position,
+                score=score,
+            )
+            for field_position, score in drives
+        ]
+    ).save_as_csv(folder / f"{game}_{side}_field_position.csv")
+
+
+@pytest.fixture
+def season_dir(tmp_path):
+    save_game(tmp_path, "g1", "home", "A", "B", [(20, 0), (75, 1), (35, 0)])
+    save_game(tmp_path, "g1", "visitor", "B", "A", [(15, 0), (60, 1)])
+    save_game(tmp_path, "g2", "home", "B", "A", [(25, 1)])
+    save_game(tmp_path, "g2", "visitor", "A", "B", [(80, 1)])
+    return tmp_path
+
+
+class TestLoadFieldPositions:
+    """load_field_positions関数のテスト"""
+
+    def test_loads_every_game_and_side(self, season_dir):
+        df = load_field_positions(field_position_files([season_dir]))
+        assert len(df) == 7
+        assert set(df["game"]) == {"g1", "g2"}
+        assert df.filter(team_name="A")["field_position"].sort().to_list() == [
+            20,
+            35,
+            75,
+            80,
+        ]
+
+    def test_no_files_raises_value_error(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_field_positions(field_position_files([tmp_path]))
+
+
+class TestBucketScoringRates:
+    """bucket_scoring_rates関数のテスト"""
+
+    def test_per_team_and_league(self, season_dir):
+        buckets = bucket_scoring_rates(
+            load_field_positions(field_position_files([season_dir])), bucket_size=50
+        )
+        league = buckets.filter(team_name=LEAGUE)
+        assert league["bucket"].to_list() == [0, 50]
+        assert league["drives"].to_list() == [4, 3]
+        assert league["scoring_rate"].to_list() == [0.25, 1.0]
+        assert buckets.filter(team_name="A", bucket=0)["scores"].item() == 0
+
+
+class TestScoringCurve:
+    """ロジスティック回帰による得点確率のテスト"""
+
+    def test_batch_fit_recovers_coefficients(self):
+        yard_lines = np.arange(1, 100, dtype=float)
+        scores = np.array([0.0, 1.0])
+        cells_x = np.repeat(yard_lines, 2)
+        cells_y = np.tile(scores, len(yard_lines))
+        # 期待値どおりの件数で重み付けすれば、真の係数にほぼ一致する
+        probabilities = 1 / (1 + np.exp(-(-2 + 4 * yard_lines / 100)))
+        weights = np.column_stack([1 - probabilities, probabilities]).ravel() * 1000
+        coefficients = fit_logistic_batch(cells_x, cells_y, weights[None, :])
+        assert coefficients[0] == pytest.approx([-2, 4], abs=1e-3)
+
+    def test_interval_contains_estimate(self):
+        rng = np.random.default_rng(1)
+        field_positions = rng.integers(1, 100, 500)
+        scores = (rng.random(500) < field_positions / 100).astype(int)
+        curve = fit_scoring_curve(field_positions, scores, n_bootstrap=200)
+        assert np.all(curve["lower"] <= curve["probability"])
+        assert np.all(curve["probability"] <= curve["upper"])
+        # 自陣深くより敵陣からのほうが得点しやすい
+        assert curve["probability"][0] < curve["probability"][-1]
+
+    def test_curves_are_cached(self, season_dir, monkeypatch):
+        files = field_position_files([season_dir])
+        cache_dir = season_dir / "cache"
+        first = load_or_fit_scoring_curves(files, cache_dir, n_bootstrap=50)
+        assert set(first["team_name"]) == {"A", "B", LEAGUE}
+
+        def fail(*args, **kwargs):
+            raise AssertionError("キャッシュが使われていません")
+
+        monkeypatch.setattr("field_position.scoring_curves", fail)
+        second = load_or_fit_scoring_curves(files, cache_dir, n_bootstrap=50)
+        assert second.equals(first)
@@ -0,0 +1,93 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from analyzer import GameAnalysisError
+from isolated_runner import run_isolated
+
+
+def _succeed(pdf_path, multiplier, stage_callback=None):
+    stage_callback("double")
+    return len(pdf_path.name) * multiplier
+
+
+def _fail_in_stage(pdf_path, multiplier, stage_callback=None):
+    stage_callback("extract_stat")
+    raise GameAnalysisError(
+        "extract_stat", ValueError("RUNプレイ数が見つかりませんでした。")
+    )
+
+
+def _hang(pdf_path, multiplier, stage_callback=None):
+    stage_callback("get_drive_chart_page")
+    time.sleep(60)
+
+
+def _dispatch(pdf_path, multiplier, stage_callback=None):
+    if pdf_path.stem == "broken":
+        return _fail_in_stage(pdf_path, multiplier, stage_callback)
+    if pdf_path.stem == "hang":
+        return _hang(pdf_path, multiplier, stage_callback)
+    return _succeed(pdf_path, multiplier, stage_callback)
+
+
+class TestRunIsolated:
+    """run_isolated関数のテスト"""
+
+    def test_success(self):
+        outcomes = list(run_isolated(_succeed, [Path("ab.pdf")], (2,), timeout=10))
+        assert len(outcomes) == 1
+        assert outcomes[0].failure is None
+        assert outcomes[0].result == 12
+
+    def test_failure_records_stage_and_exception(self):
+        outcomes = list(
+            run_isolated(_fail_in_stage, [Path("broken.pdf")], (1,), timeout=10)
+        )
+        failure = outcomes[0].failure
+        assert failure is not None
+        assert failure.pdf_path == "broken.pdf"
+        assert failure.stage == "extract_stat"
+        assert failure.exception == "ValueError"
+        assert "RUNプレイ数" in failure.message
+
+    def test_timeout_kills_worker_and_keeps_stage(self):
+        start = time.monotonic()
+        outcomes = list(run_isolated(_hang, [Path("hang.pdf")], (1,), timeout=0.5))
+        assert time.monotonic() - start < 10
+        failure = outcomes[0].failure
+        assert failure is not None
+        assert failure.exception == "TimeoutError"
+        assert failure.stage == "get_drive_chart_page"
+
+    def test_polls_while_a_worker_hangs(self):
+        polls = []
+        outcomes = list(
+            run_isolated(
+                _hang,
+                [Path("hang.pdf")],
+                (1,),
+                timeout=1.0,
+                on_poll=lambda: polls.append(time.monotonic()),
+                poll_interval=0.1,
+            )
+        )
+        assert outcomes[0].failure.exception == "TimeoutError"
+        # 結果を待つ間も一定間隔で呼ばれる
+        assert len(polls) >= 5
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_batch_continues_after_failures(self, workers):
+        pdf_paths = [Path("a.pdf"), Path("broken.pdf"), Path("hang.pdf"), Path("b.pdf")]
+        outcomes = list(
+            run_isolated(_dispatch, pdf_paths, (1,), timeout=0.5, workers=workers)
+        )
+        assert sorted(outcome.pdf_path.stem for outcome in outcomes) == [
+            "a",
+            "b",
+            "broken",
+            "hang",
+        ]
+        succeeded = {o.pdf_path.stem for o in outcomes if o.failure is None}
+        assert succeeded == {"a", "b"}
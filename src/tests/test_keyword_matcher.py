@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from keyword_matcher import (
+    MEMO_LIMIT,
+    NO_MATCH,
+    PLAY_MARKERS,
+    KeywordMatcher,
+    play_matcher,
+)
+
+TEAMS = ("富士通フロンティアーズ", "IBM")
+
+
+class TestKeywordMatcher:
+    """KeywordMatcherクラスのテスト"""
+
+    def test_markers_and_team_words(self):
+        matcher = KeywordMatcher(PLAY_MARKERS, TEAMS)
+        match = matcher.match("IBM 1-10 FF 25 RUN 富士通フロンティアーズ TOUCHDOWN")
+        assert match.keywords == {"IBM", "RUN", "富士通フロンティアーズ", "TOUCHDOWN"}
+        assert match.teams == (1, 0)
+        assert match.leading_team == 1
+
+    def test_team_name_inside_a_word_is_not_a_team_word(self):
+        match = KeywordMatcher(PLAY_MARKERS, TEAMS).match("IBMの攻撃 PASS")
+        # 部分文字列としては含まれるが、語としてのチーム名ではない
+        assert "IBM" in match.keywords
+        assert match.teams == ()
+        assert match.leading_team is None
+
+    def test_overlapping_keywords(self):
+        # FGの直後にGOODが重なって現れても両方見つける
+        match = KeywordMatcher(PLAY_MARKERS).match("FGOOD")
+        assert {"FG", "GOOD"} <= match.keywords
+
+    def test_line_without_keywords(self):
+        assert KeywordMatcher(PLAY_MARKERS, TEAMS).match("1st Quarter") == NO_MATCH
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_as_in_operator_and_split(self, seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            keywords = [
+                "".join(rng.choice("ABC") for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 6))
+            ]
+            teams = ["".join(rng.choice("ABC") for _ in range(2)) for _ in range(2)]
+            matcher = KeywordMatcher(keywords, teams)
+            team_index = {team: index for index, team in enumerate(teams)}
+            lines = [
+                "".join(rng.choice("ABC  ") for _ in range(rng.randint(0, 12)))
+                for _ in range(10)
+            ]
+            for line, match in zip(lines, matcher.match_lines(lines)):
+                words = line.split(" ")
+                assert match.keywords == {
+                    keyword for keyword in keywords + teams if keyword in line
+                }
+                assert match.teams == tuple(
+                    team_index[word] for word in words if word in team_index
+                )
+                assert match.leading_team == team_index.get(words[0])
+
+    def test_play_matcher_is_built_once_per_game(self):
+        assert play_matcher(TEAMS) is play_matcher(TEAMS)
+
+    def test_memo_is_bounded(self):
+        # 常駐プロセスで試合をまたいで使っても、覚える行は増え続けない
+        matcher = KeywordMatcher(PLAY_MARKERS, TEAMS)
+        for game in range(3):
+            lines = [f"{game}-{number} IBM RUN" for number in range(MEMO_LIMIT)]
+            matches = matcher.match_lines(lines)
+            assert matcher.match(lines[0]) == matches[0]
+        assert len(matcher._memo) <= 2 * MEMO_LIMIT
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pymupdf  # type: ignore
+
+from logics import iter_play_by_play_lines
+
+TEST_PDF = Path("test/data/test1.pdf")
+
+
+class TestIterPlayByPlayLines:
+    """iter_play_by_play_lines関数のテスト"""
+
+    def test_yields_section_until_lineups(self):
+        with pymupdf.open(TEST_PDF) as pdf_document:
+            lines = list(iter_play_by_play_lines(pdf_document))
+
+        # "Play by Play"の次の行から始まり、"Lineups"の行で終わる
+        assert lines[0] == "First Quarter"
+        assert "Lineups" in lines[-1]
+        assert sum("Lineups" in line for line in lines) == 1
+
+    def test_loads_pages_lazily(self, monkeypatch):
+        loaded_pages = []
+        load_page = pymupdf.Document.load_page
+
+        def recording_load_page(self, page_id):
+            loaded_pages.append(page_id)
+            return load_page(self, page_id)
+
+        monkeypatch.setattr(pymupdf.Document, "load_page", recording_load_page)
+        with pymupdf.open(TEST_PDF) as pdf_document:
+            lines = iter_play_by_play_lines(pdf_document)
+            next(lines)
+            # 最初の行を取り出した時点では、"Play by Play"のページまでしか読まない
+            first_section_page = max(loaded_pages)
+            assert first_section_page < len(pdf_document) - 1
+            assert "Play by Play" in load_page(
+                pdf_document, first_section_page
+            ).get_text("text")
+
+    def test_missing_start_marker_yields_nothing(self):
+        with pymupdf.open(TEST_PDF) as pdf_document:
+            assert list(iter_play_by_play_lines(pdf_document, "存在しない見出し")) == []
@@ -0,0 +1,71 @@
+import pytest
+
+from metrics import BatchMetrics, StageTimer, quantile, stage_phase
+
+
+class TestQuantile:
+    """quantile関数のテスト"""
+
+    def test_empty(self):
+        assert quantile([], 0.5) == 0.0
+
+    @pytest.mark.parametrize(
+        "q, expected", [(0.5, 50.0), (0.95, 95.0), (0.99, 99.0), (1.0, 100.0)]
+    )
+    def test_nearest_rank(self, q, expected):
+        values = [float(v) for v in range(1, 101)]
+        assert quantile(values, q) == expected
+
+
+class TestStageTimer:
+    """StageTimerクラスのテスト"""
+
+    def test_accumulates_repeated_stages(self):
+        timer = StageTimer()
+        timer("open_pdf")
+        timer("build_stats")
+        timer("build_stats")
+        timings = timer.finish()
+        assert set(timings) == {"open_pdf", "build_stats"}
+        assert all(seconds >= 0 for seconds in timings.values())
+
+    def test_stage_phase(self):
+        assert stage_phase("open_pdf_to_list") == "extraction"
+        # ページを読み込みながら解析するステージはextractionに含める
+        assert stage_phase("get_yards") == "extraction"
+        assert stage_phase("get_redzone_info") == "parsing"
+
+
+class TestBatchMetrics:
+    """BatchMetricsクラスのテスト"""
+
+    def test_counts_and_prometheus_output(self, tmp_path):
+        metrics_path = tmp_path / "metrics.prom"
+        metrics = BatchMetrics(total=3, metrics_path=metrics_path)
+        metrics.record_completed(
+            {"open_pdf": 0.1, "open_pdf_to_list": 0.2, "get_redzone_info": 0.3},
+            page_count=13,
+            export_seconds=0.01,
+        )
+        metrics.record_failed()
+        metrics.report(force=True)
+
+        assert metrics.latencies["extraction"] == [pytest.approx(0.3)]
+        assert metrics.latencies["parsing"] == [pytest.approx(0.3)]
+        text = metrics_path.read_text(encoding="utf-8")
+        assert "xleague_games_total 3" in text
+        assert "xleague_games_completed_total 1" in text
+        assert "xleague_games_failed_total 1" in text
+        assert "xleague_pages_processed_total 13" in text
+        assert (
+            'xleague_stage_latency_seconds{stage="export",quantile="0.99"} 0.010000'
+            in text
+        )
+
+    def test_report_respects_interval(self, tmp_path):
+        metrics_path = tmp_path / "metrics.prom"
+        metrics = BatchMetrics(total=1, metrics_path=metrics_path, report_interval=60)
+        metrics.report()
+        assert not metrics_path.exists()
+        metrics.report(force=True)
+        assert metrics_path.exists()
@@ -120,8 +120,9 @@ class TestStartingFieldPosition:
         ]
         position = StartingFieldPosition(field_position=field_data)
         assert len(position.field_position) == 2
-        assert position.field_position[0]["team_name"] == "Team A"
-        assert position.field_position[1]["field_position"] == 50
+        # 辞書からも型付きのレコードになる
+        assert position.field_position[0].team_name == "Team A"
+        assert position.field_position[1].field_position == 50
 
     def test_save_as_json(self):
         field_data = [
@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pymupdf  # type: ignore
+import pytest
+
+from page_layout import (
+    Page0Layout,
+    StatTable,
+    extract_header_lines,
+    extract_summary_table,
+    parse_clock,
+    parse_counts,
+    parse_int,
+    parse_ratio,
+)
+
+TEST_PDF = Path("test/data/test1.pdf")
+
+
+@pytest.fixture
+def pdf_document():
+    with pymupdf.open(TEST_PDF) as document:
+        yield document
+
+
+class TestExtractSummaryTable:
+    """extract_summary_table関数のテスト"""
+
+    def test_reads_label_home_visitor(self, pdf_document):
+        table = extract_summary_table(pdf_document)
+
+        assert table["3rd Down コンバージョン(更新率)"] == ("3/7(43%)", "6/17(36%)")
+        assert table["PASS 試投数－成功数－INT数"] == ("17-10-0", "54-25-2")
+        assert table["最終得点"] == ("49", "14")
+        # 攻撃時間の行で表は終わる
+        assert list(table)[-1] == "攻撃時間"
+        assert table["攻撃時間"] == ("14:59", "33:01")
+
+    def test_missing_anchor_raises_value_error(self, pdf_document):
+        layout = Page0Layout(table_anchor="存在しない見出し")
+        with pytest.raises(ValueError):
+            extract_summary_table(pdf_document, layout)
+
+    def test_layout_profile_from_json(self, tmp_path, pdf_document):
+        profile_path = tmp_path / "layout.json"
+        profile_path.write_text('{"home_x0": 360, "visitor_x0": 425}')
+        layout = Page0Layout.load_from_json(profile_path)
+        assert extract_summary_table(pdf_document, layout) == extract_summary_table(
+            pdf_document
+        )
+
+
+class TestExtractHeaderLines:
+    """extract_header_lines関数のテスト"""
+
+    def test_contains_matchup(self, pdf_document):
+        lines = extract_header_lines(pdf_document)
+        assert any("富士通フロンティアーズvs IBM BIG BLUE" in line for line in lines)
+
+
+class TestStatTable:
+    """StatTableクラスのテスト"""
+
+    def test_matches_label_substring(self):
+        table = StatTable(
+            {"RUN獲得ヤード数": ("169", "104"), "RUNプレイ数": ("20", "31")}
+        )
+        assert table.cells("RUNプレイ数") == ("20", "31")
+        assert table.parse("獲得ヤード", parse_int) == (169, 104)
+
+    def test_parsed_values_are_memoized(self):
+        calls = []
+
+        def parser(cell):
+            calls.append(cell)
+            return int(cell)
+
+        table = StatTable({"RUNプレイ数": ("20", "31")})
+        table.parse("RUNプレイ数", parser)
+        table.parse("RUNプレイ数", parser)
+        assert calls == ["20", "31"]
+
+    def test_missing_label_raises_value_error(self):
+        with pytest.raises(ValueError, match="攻撃時間"):
+            StatTable().cells("攻撃時間")
+
+
+class TestParsers:
+    """表のセルを変換する関数のテスト"""
+
+    def test_parse_counts(self):
+        assert parse_counts("17-10-0") == (17, 10, 0)
+        assert parse_counts("4-96") == (4, 96)
+        # マイナスのヤードは "--" で区切られる
+        assert parse_counts("2--5") == (2, -5)
+
+    def test_parse_ratio_and_clock(self):
+        assert parse_ratio("3/7(43%)") == (3, 7)
+        assert parse_clock("14:59") == (14, 59)
+
+    @pytest.mark.parametrize(
+        "parser, cell",
+        [(parse_counts, "2-37.0"), (parse_ratio, "3-7"), (parse_clock, "14.59")],
+    )
+    def test_invalid_cell_raises_value_error(self, parser, cell):
+        with pytest.raises(ValueError):
+            parser(cell)
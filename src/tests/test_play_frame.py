@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from play_frame import (
+    PLAY_BY_PLAY_START,
+    TEAMS_SCHEMA,
+    classify_plays,
+    load_play_lines,
+    play_lines_frame,
+    python_summary,
+    summarize_plays,
+)
+from utils import load_team_names_from_file
+
+TEST_DATA_DIR = Path("test/data")
+ABBREVIATIONS = {"AAA": "Aチーム", "BBB": "Bチーム"}
+
+
+@pytest.fixture
+def game_lines():
+    return [
+        "header",
+        PLAY_BY_PLAY_START,
+        "Aチーム 攻撃",
+        "1-10 AAA 25 RUN 5yラン",
+        "2-5 AAA 30 PASS 12yパス",
+        "1-10 AAA 42 RUN +Penalty BBB 5y",
+        "Bチーム 攻撃",
+        "1-10 BBB 20 PASS -3yパス",
+        "1-10 AAA 30 RUN +Penalty AAA 10y ディクライン",
+        "4-5 AAA 20 FG 37y GOOD",
+        "Lineups",
+        "1-10 BBB 20 RUN 99yラン",
+    ]
+
+
+def summarize(games, teams):
+    frame = pl.DataFrame(teams, schema=TEAMS_SCHEMA, orient="row")
+    return summarize_plays(
+        classify_plays(play_lines_frame(games), frame, ABBREVIATIONS), frame
+    )
+
+
+class TestSummarizePlays:
+    """summarize_plays関数のテスト"""
+
+    def test_possession_yards_penalties_and_fg(self, game_lines):
+        summary = summarize([("g1", game_lines)], [("g1", "Aチーム", "Bチーム")])
+        home, visitor = summary.iter_rows(named=True)
+        assert home["run_yards"] == [5]
+        assert home["pass_yards"] == [12]
+        # Lineupsより後の行は獲得ヤードに含めない
+        assert visitor["run_yards"] == []
+        assert visitor["pass_yards"] == [-3]
+        assert (home["penalty_count"], home["penalty_yards"]) == (1, 0)
+        assert (visitor["penalty_count"], visitor["penalty_yards"]) == (1, 5)
+        assert visitor["fg_good_trial_yards"] == 37
+
+    def test_matches_python_extractors(self, game_lines):
+        summary = summarize([("g1", game_lines)], [("g1", "Aチーム", "Bチーム")])
+        expected = python_summary(game_lines, "Aチーム", "Bチーム", ABBREVIATIONS)
+        assert summary.drop("game").to_dicts() == expected
+
+    def test_matches_python_extractors_on_test_pdfs(self):
+        team_names_list, team_abbreviation_dict, _ = load_team_names_from_file(
+            "teams.json"
+        )
+        lines, teams, games = load_play_lines(
+            sorted(TEST_DATA_DIR.glob("*.pdf")), team_names_list
+        )
+        summary = summarize_plays(
+            classify_plays(lines, teams, team_abbreviation_dict), teams
+        )
+        expected = [
+            {"game": game, **row}
+            for game, home_team, visitor_team in teams.sort("game").iter_rows()
+            for row in python_summary(
+                games[game], home_team, visitor_team, team_abbreviation_dict
+            )
+        ]
+        assert summary.to_dicts() == expected
+
+    def test_missing_play_by_play_raises_value_error(self):
+        with pytest.raises(ValueError):
+            play_lines_frame([("g1", ["header"])])
@@ -0,0 +1,108 @@
+import polars as pl
+import pytest
+
+from models import PlayerStat
+from player_store import PlayerStore
+
+
+def stat(team_name, section, player, stat_name, value, number="1"):
+    return PlayerStat(
+        team_name=team_name,
+        section=section,
+        number=number,
+        player=player,
+        stat=stat_name,
+        value=value,
+    )
+
+
+GAME1 = [
+    stat("A", "RUSHING", "山田", "YDS", 80),
+    stat("A", "RUSHING", "山田", "AVG", 8.0),
+    stat("A", "RUSHING", "佐藤", "YDS", 30, number="2"),
+    stat("A", "RUSHING", "Total", "YDS", 110, number=""),
+    stat("A", "KICKOFF RETURNS", "佐藤", "YDS", 40, number="2"),
+    stat("B", "RUSHING", "鈴木", "YDS", 50),
+    stat("B", "PUNT RETURNS", "鈴木", "YDS", 5),
+]
+GAME2 = [
+    stat("A", "RUSHING", "山田", "YDS", 40),
+    stat("A", "PUNT RETURNS", "佐藤", "YDS", 20, number="2"),
+    stat("B", "RUSHING", "高橋", "YDS", 90, number="3"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    player_store = PlayerStore(tmp_path / "players")
+    player_store.append("game1", GAME1)
+    player_store.append("game2", GAME2)
+    return player_store
+
+
+class TestPlayerStore:
+    """PlayerStoreクラスのテスト"""
+
+    def test_player_season_totals_and_averages(self, store):
+        season = store.player_season("山田")
+        # 率の項目(AVG)は合計しない
+        assert season.select(
+            "section", "stat", "total", "games", "per_game"
+        ).rows() == [("RUSHING", "YDS", 120.0, 2, 60.0)]
+
+    def test_longest_play_is_season_best(self, tmp_path):
+        store = PlayerStore(tmp_path)
+        store.append(
+            "game1",
+            [
+                stat("A", "PUNTING", "田中", "LG", 45),
+                stat("A", "PUNTING", "田中", "NET", 38.5),
+            ],
+        )
+        store.append(
+            "game2",
+            [
+                stat("A", "PUNTING", "田中", "LG", 52),
+                stat("A", "PUNTING", "田中", "NET", 41.0),
+            ],
+        )
+        # LGは2試合の合計ではなく最大値で、平均のNETは合計しない
+        assert store.player_season("田中").select(
+            "stat", "total", "games", "per_game"
+        ).rows() == [("LG", 52.0, 2, None)]
+
+    def test_top_returners_combines_return_sections(self, store):
+        top = store.top_returners(n=1)
+        assert top.select(pl.col("player").cast(pl.String), "total").rows() == [
+            ("佐藤", 60.0)
+        ]
+
+    def test_team_leaders_skip_total_rows(self, store):
+        leaders = store.team_leaders("RUSHING", "YDS")
+        assert leaders.select(
+            pl.col("team_name").cast(pl.String),
+            pl.col("player").cast(pl.String),
+            "total",
+        ).rows() == [("A", "山田", 120.0), ("B", "高橋", 90.0)]
+
+    def test_compact_keeps_rows_and_replaces_appended_game(self, store):
+        store.compact()
+        assert store.season_path.exists()
+        assert list(store.parts_dir.glob("*.parquet")) == []
+        assert store.top_players("RUSHING", "YDS", n=1)["total"].to_list() == [120.0]
+
+        # 同じ試合を追記すると、以前の行は置き換えられる
+        store.append("game2", [stat("A", "RUSHING", "山田", "YDS", 10)])
+        assert store.player_season("山田")["total"].to_list() == [90.0]
+        store.compact()
+        assert store.player_season("山田")["total"].to_list() == [90.0]
+        assert store.scan().select(pl.len()).collect().item() == len(GAME1) + 1
+
+    def test_keys_are_dictionary_encoded(self, store):
+        store.compact()
+        schema = pl.read_parquet_schema(store.season_path)
+        assert schema["player"] == pl.Categorical
+        assert schema["team_name"] == pl.Categorical
+
+    def test_empty_store(self, tmp_path):
+        assert PlayerStore(tmp_path).top_returners().is_empty()
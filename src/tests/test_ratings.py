@@ -0,0 +1,122 @@
+import polars as pl
+import pytest
+
+from ratings import RatingsStore, build_design_matrix, solve_ratings
+
+TEAMS = ["A", "B", "C"]
+# 真の(攻撃, 守備)評価。得点 = 20 + 攻撃 - 相手の守備
+TRUE_RATINGS = {"A": (7.0, 3.0), "B": (0.0, 0.0), "C": (-7.0, -3.0)}
+
+
+def points(team_name, opponent_name):
+    return 20 + TRUE_RATINGS[team_name][0] - TRUE_RATINGS[opponent_name][1]
+
+
+def write_game(folder, game, home, visitor):
+    folder.mkdir(parents=True, exist_ok=True)
+    for side, (team_name, opponent_name) in enumerate(
+        [(home, visitor), (visitor, home)]
+    ):
+        pl.DataFrame(
+            {
+                "team_score": [points(team_name, opponent_name)],
+                "third_down_stats_third_down_success": [4],
+                "third_down_stats_third_down_numbers": [10],
+                "team_stats_info_team_name": [team_name],
+                "team_stats_info_opponent_name": [opponent_name],
+                "team_stats_info_run_gain": [150],
+                "team_stats_info_run_play": [30],
+                "team_stats_info_pass_gain": [150],
+                "team_stats_info_passing_attempts_info_attempts": [30],
+            }
+        ).write_csv(folder / f"{game}_stats_{side}.csv")
+
+
+class TestBuildDesignMatrix:
+    """build_design_matrix関数のテスト"""
+
+    def test_offense_and_defense_columns(self):
+        design = build_design_matrix(
+            pl.Series(["A", "C"]), pl.Series(["B", "A"]), TEAMS
+        )
+        assert design.shape == (2, 6)
+        assert design.toarray().tolist() == [
+            [1, 0, 0, 0, -1, 0],
+            [0, 0, 1, -1, 0, 0],
+        ]
+
+
+class TestRatingsStore:
+    """RatingsStoreクラスのテスト"""
+
+    def test_recovers_schedule_adjusted_ratings(self, tmp_path):
+        write_game(tmp_path / "week1", "g1", "A", "B")
+        write_game(tmp_path / "week1", "g2", "B", "C")
+        write_game(tmp_path / "week1", "g3", "C", "A")
+        ratings = RatingsStore(tmp_path / "store").update(
+            [tmp_path / "week1"], damp=0.0
+        )
+        by_team = {row["team_name"]: row for row in ratings.iter_rows(named=True)}
+        for team_name, opponent_name in [("A", "B"), ("C", "A"), ("B", "C")]:
+            predicted = (
+                by_team[team_name]["points_average"]
+                + by_team[team_name]["points_offense"]
+                - by_team[opponent_name]["points_defense"]
+            )
+            assert predicted == pytest.approx(points(team_name, opponent_name))
+        assert by_team["A"]["yards_per_play_average"] == pytest.approx(5.0)
+
+    def test_update_only_adds_new_games(self, tmp_path):
+        store = RatingsStore(tmp_path / "store")
+        write_game(tmp_path / "week1", "g1", "A", "B")
+        store.update([tmp_path / "week1"])
+        write_game(tmp_path / "week2", "g2", "B", "C")
+        # week1を再び渡しても、保存済みの試合は読み直さない
+        ratings = store.update([tmp_path / "week1", tmp_path / "week2"])
+        assert sorted(store.rows()["game"].unique()) == ["week1/g1", "week2/g2"]
+        assert len(store.rows()) == 4
+        assert ratings.filter(team_name="B")["games"].item() == 2
+
+    def test_incremental_update_matches_full_solve(self, tmp_path):
+        write_game(tmp_path / "week1", "g1", "A", "B")
+        write_game(tmp_path / "week1", "g2", "B", "C")
+        write_game(tmp_path / "week2", "g3", "C", "A")
+        write_game(tmp_path / "week2", "g4", "A", "B")
+        store = RatingsStore(tmp_path / "store")
+        store.update([tmp_path / "week1"])
+        # 前回の評価から始めても、最初から解いた場合と同じ問題を解く
+        incremental = store.update([tmp_path / "week1", tmp_path / "week2"])
+        full = solve_ratings(store.rows())
+        for column in full.columns[2:]:
+            assert incremental[column].to_list() == pytest.approx(
+                full[column].to_list(), abs=1e-6
+            )
+
+    def test_same_game_name_in_two_folders(self, tmp_path):
+        write_game(tmp_path / "2024", "g1", "A", "B")
+        write_game(tmp_path / "2025", "g1", "B", "C")
+        store = RatingsStore(tmp_path / "store")
+        ratings = store.update([tmp_path / "2024", tmp_path / "2025"])
+        assert sorted(store.rows()["game"].unique()) == ["2024/g1", "2025/g1"]
+        assert ratings.filter(team_name="B")["games"].item() == 2
+
+    def test_no_games_raises_value_error(self, tmp_path):
+        with pytest.raises(ValueError):
+            RatingsStore(tmp_path / "store").update([tmp_path])
+
+    def test_solve_ratings_without_games_of_a_metric(self):
+        rows = pl.DataFrame(
+            {
+                "game": ["g1", "g1"],
+                "team_name": ["A", "B"],
+                "opponent_name": ["B", "A"],
+                "points_value": [21.0, 14.0],
+                "points_weight": [1.0, 1.0],
+                "yards_per_play_value": [None, None],
+                "yards_per_play_weight": [0.0, 0.0],
+                "third_down_rate_value": [None, None],
+                "third_down_rate_weight": [0.0, 0.0],
+            }
+        )
+        ratings = solve_ratings(rows)
+        assert ratings["yards_per_play_offense"].to_list() == [0.0, 0.0]
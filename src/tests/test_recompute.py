@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from analyzer import analyze_game
+from recompute import recompute
+from utils import export_game_result, load_game_intermediate
+
+TEST_PDF = Path("test/data/test1.pdf")
+
+
+@pytest.fixture(scope="module")
+def analyzed_dir(tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp("analyzed")
+    export_game_result(analyze_game(TEST_PDF), TEST_PDF, output_dir)
+    return output_dir
+
+
+def write_config(file_path, run_threshold, pass_threshold):
+    file_path.write_text(
+        json.dumps(
+            {
+                "run_long_gain_threshold": run_threshold,
+                "pass_long_gain_threshold": pass_threshold,
+            }
+        )
+    )
+    return file_path
+
+
+class TestRecompute:
+    """recompute関数のテスト"""
+
+    def test_same_config_reproduces_outputs(self, analyzed_dir, tmp_path):
+        config_path = write_config(tmp_path / "config.json", 15, 20)
+        assert recompute(analyzed_dir, config_path, tmp_path / "out") == 1
+        for side in (0, 1):
+            name = f"test1_stats_{side}.csv"
+            assert (tmp_path / "out" / name).read_bytes() == (
+                analyzed_dir / name
+            ).read_bytes()
+
+    def test_new_config_changes_derived_values(self, analyzed_dir, tmp_path):
+        config_path = write_config(tmp_path / "config.json", 5, 10)
+        recompute(analyzed_dir, config_path, tmp_path / "out", tmp_path / "result")
+        before = pl.read_csv(analyzed_dir / "test1_stats_0.csv")
+        after = pl.read_csv(tmp_path / "out" / "test1_stats_0.csv")
+        assert after["big_run_count"].item() > before["big_run_count"].item()
+        assert after["team_score"].item() == before["team_score"].item()
+        assert (tmp_path / "result" / "team_stats.csv").exists()
+
+
+class TestLoadGameIntermediate:
+    """load_game_intermediate関数のテスト"""
+
+    def test_other_version_raises_value_error(self, analyzed_dir, tmp_path):
+        data = json.loads((analyzed_dir / "test1_game.json").read_text())
+        data["version"] = 0
+        file_path = tmp_path / "old_game.json"
+        file_path.write_text(json.dumps(data))
+        with pytest.raises(ValueError, match="version=0"):
+            load_game_intermediate(file_path)
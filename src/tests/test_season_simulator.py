@@ -0,0 +1,87 @@
+import polars as pl
+import pytest
+
+from season_simulator import (
+    _bracket_order,
+    remaining_round_robin,
+    simulate_season,
+)
+
+TEAMS = ["A", "B", "C", "D"]
+
+
+def game_rows(games):
+    rows = []
+    for game, (home, visitor, home_score, visitor_score) in enumerate(games):
+        for team_name, opponent_name, score in [
+            (home, visitor, home_score),
+            (visitor, home, visitor_score),
+        ]:
+            rows.append(
+                {
+                    "game": f"g{game}",
+                    "team_name": team_name,
+                    "opponent_name": opponent_name,
+                    "points_value": float(score),
+                    "points_weight": 1.0,
+                    "yards_per_play_value": None,
+                    "yards_per_play_weight": 0.0,
+                    "third_down_rate_value": None,
+                    "third_down_rate_weight": 0.0,
+                }
+            )
+    return pl.DataFrame(rows, schema_overrides={"yards_per_play_value": pl.Float64})
+
+
+PLAYED = game_rows(
+    [("A", "B", 42, 7), ("C", "D", 21, 17), ("A", "C", 35, 10), ("B", "D", 14, 13)]
+)
+
+
+class TestBracketOrder:
+    """_bracket_order関数のテスト"""
+
+    def test_top_seeds_meet_last(self):
+        assert _bracket_order(4) == [0, 3, 1, 2]
+        assert _bracket_order(8) == [0, 7, 3, 4, 1, 6, 2, 5]
+
+
+class TestSimulateSeason:
+    """simulate_season関数のテスト"""
+
+    def test_probabilities_are_consistent(self):
+        result = simulate_season(
+            PLAYED, TEAMS, remaining_round_robin(PLAYED, TEAMS), 2000, 2
+        )
+        totals = result.select(pl.exclude("team_name")).sum().row(0, named=True)
+        assert all(
+            totals[f"place_{place}"] == pytest.approx(1.0) for place in range(1, 5)
+        )
+        assert totals["playoffs"] == pytest.approx(2.0)
+        assert totals["champion"] == pytest.approx(1.0)
+        # 大勝を重ねたチームが最も優勝しやすい
+        assert result["team_name"][0] == "A"
+
+    def test_reproducible_from_seed(self):
+        remaining_games = [("A", "D"), ("B", "C")]
+        first = simulate_season(PLAYED, TEAMS, remaining_games, 500, seed=7)
+        second = simulate_season(PLAYED, TEAMS, remaining_games, 500, seed=7)
+        assert first.equals(second)
+
+    def test_invalid_playoff_teams_raises_value_error(self):
+        with pytest.raises(ValueError):
+            simulate_season(PLAYED, TEAMS, [], 10, playoff_teams=3)
+
+
+class TestRemainingRoundRobin:
+    """remaining_round_robin関数のテスト"""
+
+    def test_skips_played_pairs(self):
+        assert remaining_round_robin(PLAYED, TEAMS) == [("A", "D"), ("B", "C")]
+
+    def test_skips_teams_without_played_games(self):
+        # 別の地区のチーム(E, F)とは組み合わせない
+        assert remaining_round_robin(PLAYED, [*TEAMS, "E", "F"]) == [
+            ("A", "D"),
+            ("B", "C"),
+        ]
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pymupdf  # type: ignore
+
+from text_lines import TextLine, group_words_into_lines, page_lines
+from utils import pdf_document_to_list
+
+TEST_PDF = Path("test/data/test2.pdf")
+
+
+def word(x0, y1, text, height=10.0):
+    return (x0, y1 - height, x0 + 10.0, y1, text, 0, 0, 0)
+
+
+class TestGroupWordsIntoLines:
+    """group_words_into_lines関数のテスト"""
+
+    def test_sorts_unordered_words_into_lines(self):
+        words = [word(50, 30, "c"), word(10, 10, "a"), word(30, 10.5, "b")]
+        lines = group_words_into_lines(words)
+        assert [line.text for line in lines] == ["a b", "c"]
+
+    def test_larger_font_joins_its_baseline(self):
+        # 見出しの大きな文字はy0が離れていても、ベースラインが同じなら同じ行
+        words = [word(10, 113.6, "Play", height=10.7), word(80, 113.6, "First", 17.5)]
+        assert [line.text for line in group_words_into_lines(words)] == ["Play First"]
+
+    def test_empty_words(self):
+        assert group_words_into_lines([]) == []
+
+
+class TestTextLine:
+    """TextLineクラスのテスト"""
+
+    def test_columns_split_at_boundaries(self):
+        line = TextLine(
+            y1=10.0,
+            words=(word(57, 10, "Total"), word(177, 10, "3"), word(315, 10, "Total")),
+        )
+        assert line.columns(297.0) == [["Total", "3"], ["Total"]]
+
+
+class TestPageLines:
+    """page_lines関数のテスト"""
+
+    def test_memoized_per_page(self):
+        with pymupdf.open(TEST_PDF) as pdf_document:
+            assert page_lines(pdf_document, 1) is page_lines(pdf_document, 1)
+
+    def test_keeps_last_line_of_each_page(self):
+        with pymupdf.open(TEST_PDF) as pdf_document:
+            same_line_words = pdf_document_to_list(pdf_document)
+        # 以前はページ末尾の行が落ちていた
+        assert "1 & G - EF 10 M RUN [TEAM] -3yラン" in same_line_words
@@ -0,0 +1,96 @@
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from watch_daemon import StableFileTracker, WatchDaemon
+
+TEST_DATA_DIR = Path("test/data")
+
+
+class TestStableFileTracker:
+    """StableFileTrackerクラスのテスト"""
+
+    def test_file_becomes_stable_after_settle_time(self, tmp_path):
+        tracker = StableFileTracker(settle_seconds=0.2)
+        pdf_path = tmp_path / "game.pdf"
+        pdf_path.write_bytes(b"%PDF-partial")
+        assert tracker.poll(tmp_path) == []
+        assert tracker.poll(tmp_path) == []
+        time.sleep(0.25)
+        assert tracker.poll(tmp_path) == [pdf_path]
+
+    def test_growing_file_is_not_stable(self, tmp_path):
+        tracker = StableFileTracker(settle_seconds=0)
+        pdf_path = tmp_path / "game.pdf"
+        pdf_path.write_bytes(b"%PDF-1")
+        tracker.poll(tmp_path)
+        with open(pdf_path, "ab") as f:
+            f.write(b"more")
+        assert tracker.poll(tmp_path) == []
+        assert tracker.poll(tmp_path) == [pdf_path]
+
+
+class TestWatchDaemon:
+    """WatchDaemonクラスのテスト"""
+
+    @pytest.fixture
+    def daemon(self, tmp_path):
+        watch_dir = tmp_path / "drop"
+        watch_dir.mkdir()
+        daemon = WatchDaemon(
+            watch_dir,
+            Path("config.json"),
+            tmp_path / "output",
+            tmp_path / "result",
+            workers=2,
+            settle_seconds=0,
+            timeout=60,
+        )
+        yield daemon
+        daemon.close()
+
+    def _poll_until(self, daemon, expected_games, deadline_seconds=60):
+        deadline = time.monotonic() + deadline_seconds
+        completed = 0
+        while completed < expected_games and time.monotonic() < deadline:
+            completed += daemon.poll_once()
+            time.sleep(0.05)
+        return completed
+
+    def test_new_pdfs_update_team_summary(self, daemon):
+        for name in ["test1.pdf", "test2.pdf", "test3.pdf"]:
+            shutil.copy(TEST_DATA_DIR / name, daemon.watch_dir / name)
+
+        assert self._poll_until(daemon, 3) == 3
+        assert (daemon.output_dir / "test1_stats_0.csv").exists()
+        for file_name in ["team_stats.csv", "opponent_stats.csv"]:
+            pd.testing.assert_frame_equal(
+                pd.read_csv(daemon.result_dir / file_name),
+                pd.read_csv(TEST_DATA_DIR / "result" / file_name),
+                check_dtype=False,
+            )
+
+        # 解析済みのPDFは再解析しない
+        assert daemon.poll_once() == 0
+        assert daemon.in_flight == {}
+
+    def test_corrected_pdf_is_analyzed_again(self, daemon):
+        pdf_path = daemon.watch_dir / "game.pdf"
+        shutil.copy(TEST_DATA_DIR / "test1.pdf", pdf_path)
+        assert self._poll_until(daemon, 1) == 1
+
+        # 同じ名前で修正版が置かれたら再解析し、集計の行を置き換える
+        shutil.copy(TEST_DATA_DIR / "test2.pdf", pdf_path)
+        assert self._poll_until(daemon, 1) == 1
+        assert list(daemon.summary._frames) == ["game"]
+
+    def test_broken_pdf_is_reported_once(self, daemon):
+        (daemon.watch_dir / "broken.pdf").write_bytes(b"not a pdf")
+        self._poll_until(daemon, 1, deadline_seconds=5)
+        assert daemon.failure_report_path.exists()
+        assert Path(daemon.watch_dir / "broken.pdf") in daemon.failed
+        daemon.poll_once()
+        assert daemon.in_flight == {}
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from atomic_io import atomic_write_parquet
+from yard_distribution import (
+    count_above,
+    load_yard_distributions,
+    sweep_thresholds,
+    yards_to_frame,
+)
+
+
+def stats(team_name, opponent_name, run_yards, pass_yards):
+    # yards_to_frameが読む項目だけを持つStatsの代わり
+    return SimpleNamespace(
+        team_stats_info=SimpleNamespace(
+            team_name=team_name, opponent_name=opponent_name
+        ),
+        run_yards=run_yards,
+        pass_yards=pass_yards,
+    )
+
+
+class TestCountAbove:
+    """count_above関数のテスト"""
+
+    def test_counts_plays_greater_than_each_threshold(self):
+        sorted_yards = np.array([-3, 0, 5, 15, 16, 40])
+        assert count_above(sorted_yards, [-5, 5, 15, 40]).tolist() == [6, 3, 2, 0]
+
+    def test_empty(self):
+        assert count_above(np.array([]), [10]).tolist() == [0]
+
+
+class TestSweepThresholds:
+    """獲得ヤードの保存と、しきい値ごとの集計のテスト"""
+
+    def test_sweep_over_saved_games(self, tmp_path):
+        atomic_write_parquet(
+            yards_to_frame(
+                [
+                    stats("A", "B", [20, 3, -2], [25]),
+                    stats("B", "A", [7], [10, 30]),
+                ]
+            ),
+            tmp_path / "g1_yards.parquet",
+        )
+        atomic_write_parquet(
+            yards_to_frame([stats("A", "C", [16, 40], []), stats("C", "A", [], [])]),
+            tmp_path / "g2_yards.parquet",
+        )
+        distributions = load_yard_distributions([tmp_path])
+        a_run = distributions.filter(team_name="A", play_type="run")
+        assert a_run["yards"].item().to_list() == [-2, 3, 16, 20, 40]
+        assert a_run["games"].item() == 2
+
+        table = sweep_thresholds(distributions, [5, 15, 20])
+        row = table.filter(team_name="A", play_type="run").row(0, named=True)
+        assert (row["plays"], row["over_5"], row["over_15"], row["over_20"]) == (
+            5,
+            3,
+            3,
+            1,
+        )
+        assert table.filter(team_name="C", play_type="pass")["over_5"].item() == 0
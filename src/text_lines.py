@@ -0,0 +1,112 @@
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+import pymupdf  # type: ignore
+
+# 同じ行とみなすベースライン(y1)の差(pt)
+LINE_MARGIN = 3.0
+# ページごとの行を、そのドキュメント自身に保持する属性名
+PAGE_LINES_CACHE_ATTR = "_page_lines_cache"
+
+# pymupdfのwords: (x0, y0, x1, y1, text, block_no, line_no, word_no)
+Word = tuple[float, float, float, float, str, int, int, int]
+
+
+class TextLine(NamedTuple):
+    """A reconstructed line: its baseline y1 and its words sorted by x0."""
+
+    y1: float
+    words: tuple[Word, ...]
+
+    @property
+    def text(self) -> str:
+        return " ".join(word[4] for word in self.words)
+
+    def columns(self, *boundaries: float) -> list[list[str]]:
+        """
+        Splits the words of the line into columns at the given x positions.
+
+        Args:
+            *boundaries (float): Ascending x positions; a word belongs to the
+                column on the right of every boundary its x0 is at or past.
+
+        Returns:
+            list[list[str]]: len(boundaries) + 1 columns of word texts.
+        """
+        columns: list[list[str]] = [[] for _ in range(len(boundaries) + 1)]
+        for word in self.words:
+            columns[int(np.searchsorted(boundaries, word[0], side="right"))].append(
+                word[4]
+            )
+        return columns
+
+
+def group_words_into_lines(
+    words: Sequence[Word], margin: float = LINE_MARGIN
+) -> list[TextLine]:
+    """
+    Groups word boxes into lines, in reading order.
+
+    Words are sorted by their baseline (y1) and a new line starts wherever
+    the gap to the previous baseline reaches margin, so words set in a
+    larger font still join their line. Words within a line are then sorted
+    by x0. The order words arrive in does not matter.
+
+    Args:
+        words (Sequence[Word]): The words from page.get_text("words").
+        margin (float): The baseline gap that separates two lines.
+
+    Returns:
+        list[TextLine]: The lines from top to bottom.
+    """
+    if not words:
+        return []
+    x0 = np.fromiter((word[0] for word in words), dtype=float, count=len(words))
+    y1 = np.fromiter((word[3] for word in words), dtype=float, count=len(words))
+    by_y = np.argsort(y1, kind="stable")
+    line_ids = np.empty(len(words), dtype=np.int64)
+    line_ids[by_y] = np.concatenate(([0], np.cumsum(np.diff(y1[by_y]) >= margin)))
+    order = np.lexsort((x0, line_ids))
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(line_ids[order])) + 1))
+    ends = np.append(starts[1:], len(order))
+    return [
+        TextLine(
+            y1=float(y1[order[start]]),
+            words=tuple(words[index] for index in order[start:end]),
+        )
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def page_lines(pdf_document: pymupdf.Document, page_num: int) -> list[TextLine]:
+    """
+    Returns the reconstructed lines of a page, memoized on the document.
+
+    Every parser that reads the same page shares one extraction, and the
+    cache is released together with the document.
+
+    Args:
+        pdf_document (pymupdf.Document): The PDF document.
+        page_num (int): The 0-based page number.
+
+    Returns:
+        list[TextLine]: The lines of the page from top to bottom.
+    """
+    cache: dict[int, list[TextLine]] = pdf_document.__dict__.setdefault(
+        PAGE_LINES_CACHE_ATTR, {}
+    )
+    if page_num not in cache:
+        page = pdf_document.load_page(page_num)
+        cache[page_num] = group_words_into_lines(page.get_text("words"))
+    return cache[page_num]
+
+
+def find_page_with_text(pdf_document: pymupdf.Document, text: str) -> int:
+    """
+    Returns the first page number whose lines contain text, or -1.
+    """
+    for page_num in range(len(pdf_document)):
+        if any(text in line.text for line in page_lines(pdf_document, page_num)):
+            return page_num
+    return -1
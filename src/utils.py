@@ -1,65 +1,63 @@
 import json
 from pathlib import Path
+from typing import TextIO
 
 import pymupdf  # type: ignore
 
+from atomic_io import atomic_write, atomic_write_parquet
+from break_drive_chart import drives_to_frame
+from yard_distribution import yards_to_frame
 from logger import logger
-from models import Config, Stats
+from text_lines import find_page_with_text, page_lines
+from models import (
+    FIELD_TIERS,
+    INTERMEDIATE_VERSION,
+    STATS_FIELDS_BY_TIER,
+    Config,
+    GameIntermediate,
+    GameResult,
+    Stats,
+)
 import csv
 
 EXCLUDE_EXPORT_KEYS = {"run_yards", "pass_yards", "config"}
+# 試合ごとの中間ファイルの末尾
+INTERMEDIATE_SUFFIX = "_game.json"
 
 
-def open_pdf(file_path: Path) -> pymupdf.Document:
+def open_pdf(file_path: Path | bytes | pymupdf.Document) -> pymupdf.Document:
     """
     Opens a PDF file and returns a pymupdf.Pdf object.
 
     Args:
-        file_path (Path): The path to the PDF file to be opened.
+        file_path (Path | bytes | pymupdf.Document): The path to the PDF file, its
+            content, or an already opened document which is returned as is.
 
     Returns:
         pymupdf.Pdf: The opened PDF file as a pymupdf.Pdf object.
     """
+    if isinstance(file_path, pymupdf.Document):
+        return file_path
+    if isinstance(file_path, (bytes, bytearray)):
+        return pymupdf.open(stream=file_path, filetype="pdf")
     pdf_document = pymupdf.open(file_path)
     return pdf_document
 
 
 def open_pdf_to_list(file_path: Path) -> list:
-    pdf_document = pymupdf.open(file_path)
-    same_line_words = []
-    for page_num in range(len(pdf_document)):
-        page = pdf_document.load_page(page_num)
-        words = page.get_text("words")
-        tmp_same_line = []
-        current_y0 = 0
-        margin = 3
-        for word in words:
-            if word[1] - current_y0 < margin:
-                tmp_same_line.append(word[4])
-            else:
-                same_line_words.append(" ".join(tmp_same_line))
-                tmp_same_line = [word[4]]
-                current_y0 = word[1]
-    same_line_words.append(" ".join(tmp_same_line))
-    return same_line_words
+    return pdf_document_to_list(pymupdf.open(file_path))
+
+
+def pdf_document_to_list(pdf_document: pymupdf.Document) -> list:
+    return [
+        line.text
+        for page_num in range(len(pdf_document))
+        for line in page_lines(pdf_document, page_num)
+    ]
 
 
 def open_pdf_to_list_only_page(pdf_document: pymupdf.Document, page_num: int) -> list:
-    same_line_words = []
-    page = pdf_document.load_page(page_num)
-    words = page.get_text("words")
-    tmp_same_line = []
-    current_y0 = 0
-    margin = 3
-    for word in words:
-        if word[1] - current_y0 < margin:
-            tmp_same_line.append(word[4])
-        else:
-            same_line_words.append(" ".join(tmp_same_line))
-            tmp_same_line = [word[4]]
-            current_y0 = word[1]
-    same_line_words.append(" ".join(tmp_same_line))
-    return same_line_words
+    return [line.text for line in page_lines(pdf_document, page_num)]
 
 
 def load_config_from_file(file_path: Path) -> Config:
@@ -121,21 +119,166 @@ def flatten_dict(d, parent_key="", sep="_"):
     return dict(items)
 
 
-def export_stats_to_csv(stats: Stats, file_path: Path):
-    stats_dict = stats.model_dump(exclude=EXCLUDE_EXPORT_KEYS)
-    flat_stats = flatten_dict(stats_dict)
+def stats_to_flat_dict(stats: Stats, fields: tuple[str, ...] = FIELD_TIERS) -> dict:
+    """
+    Flattens the exported fields of a Stats object into one CSV row.
+
+    Args:
+        stats (Stats): The Stats object to be flattened.
+        fields (tuple[str, ...]): The field tiers whose columns are exported.
+
+    Returns:
+        dict: The row keyed by the CSV column names.
+    """
+    if set(fields) >= set(FIELD_TIERS):
+        return flatten_dict(stats.model_dump(exclude=EXCLUDE_EXPORT_KEYS))
+    include = {key for tier in fields for key in STATS_FIELDS_BY_TIER[tier]}
+    return flatten_dict(stats.model_dump(include=include))
+
 
-    with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+def game_result_to_records(game_result: GameResult, game: str) -> list[dict]:
+    """
+    Builds one flat record per team of a game, tagged with the game name and
+    whether the team was home or visitor.
+    """
+    return [
+        {"game": game, "side": side, **stats_to_flat_dict(stats, game_result.fields)}
+        for side, stats in (
+            ("home", game_result.home_stats),
+            ("visitor", game_result.visitor_stats),
+        )
+    ]
+
+
+def write_ndjson_records(records: list[dict], stream: TextIO) -> None:
+    """
+    Writes the records as newline-delimited JSON and flushes them immediately,
+    so downstream consumers of a pipe receive each game as soon as it is parsed.
+    """
+    stream.writelines(
+        json.dumps(record, ensure_ascii=False) + "\n" for record in records
+    )
+    stream.flush()
+
+
+def export_stats_to_csv(
+    stats: Stats, file_path: Path, fields: tuple[str, ...] = FIELD_TIERS
+):
+    flat_stats = stats_to_flat_dict(stats, fields)
+
+    with atomic_write(file_path, newline="") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=flat_stats.keys())
         writer.writeheader()
         writer.writerow(flat_stats)
 
 
+def log_stats_summary(stats: Stats) -> None:
+    logger.info(
+        "%s had %d runs greater than 15 yards.",
+        stats.team_stats_info.team_name,
+        stats.big_run_count,
+    )
+    logger.info(
+        "%s had %d passes greater than 20 yards.",
+        stats.team_stats_info.team_name,
+        stats.big_pass_count,
+    )
+    logger.info(
+        "%s had a third down conversion rate of %.2d%%.",
+        stats.team_stats_info.team_name,
+        stats.third_down_success_rate,
+    )
+    logger.info(
+        "%s did %d times penalty of %d yards.",
+        stats.team_stats_info.team_name,
+        stats.penalty_info.count,
+        stats.penalty_info.yards,
+    )
+    logger.info(
+        "%s had %d redzone attempts and %d scores.",
+        stats.team_stats_info.team_name,
+        stats.redzone_info.play_count,
+        stats.redzone_info.touchdown_count,
+    )
+
+
+def export_game_result(
+    game_result: GameResult, pdf_path: Path, output_dir: Path
+) -> None:
+    """
+    Writes the per-game CSV files (and the drive table and play yards as
+    Parquet) of one analyzed PDF into output_dir, together with the
+    intermediate file recompute.py derives them from again.
+    """
+    save_game_intermediate(
+        game_result, output_dir / f"{pdf_path.stem}{INTERMEDIATE_SUFFIX}"
+    )
+    team_starting_field_position = game_result.field_position
+    if "drives" in game_result.fields:
+        team_starting_field_position.home_team_starting_field_position.save_as_csv(
+            output_dir / f"{pdf_path.stem}_home_field_position.csv"
+        )
+        team_starting_field_position.visitor_team_starting_field_position.save_as_csv(
+            output_dir / f"{pdf_path.stem}_visitor_field_position.csv"
+        )
+        atomic_write_parquet(
+            drives_to_frame(game_result.drives),
+            output_dir / f"{pdf_path.stem}_drives.parquet",
+        )
+    if "playbyplay" in game_result.fields:
+        atomic_write_parquet(
+            yards_to_frame([game_result.home_stats, game_result.visitor_stats]),
+            output_dir / f"{pdf_path.stem}_yards.parquet",
+        )
+    logger.debug("team_starting_field_position: %s", team_starting_field_position)
+    for ct, stats in enumerate([game_result.home_stats, game_result.visitor_stats]):
+        if set(game_result.fields) >= set(FIELD_TIERS):
+            log_stats_summary(stats)
+        export_stats_to_csv(
+            stats,
+            output_dir / f"{pdf_path.stem}_stats_{ct}.csv",
+            game_result.fields,
+        )
+
+
+def save_game_intermediate(game_result: GameResult, file_path: Path) -> None:
+    with atomic_write(file_path) as f:
+        f.write(GameIntermediate(game_result=game_result).model_dump_json())
+
+
+def load_game_intermediate(file_path: Path, config: Config | None = None) -> GameResult:
+    """
+    Loads a game saved by save_game_intermediate.
+
+    Args:
+        file_path (Path): The *_game.json file.
+        config (Config, optional): Derives the config-dependent values of
+            Stats (big_run_count, ...) again under this config.
+
+    Returns:
+        GameResult: The game as if it had been analyzed with config.
+
+    Raises:
+        ValueError: If the file was written by another intermediate version.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != INTERMEDIATE_VERSION:
+        raise ValueError(
+            f"{file_path} の形式(version={data.get('version')})は"
+            f"このバージョン({INTERMEDIATE_VERSION})では読めません"
+        )
+    game_result = GameIntermediate.model_validate(data).game_result
+    if config is None:
+        return game_result
+    # Statsの派生値はコンストラクタで求めるため、設定を差し替えて作り直す
+    return game_result.model_copy(
+        update={
+            side: Stats(**{**getattr(game_result, side).model_dump(), "config": config})
+            for side in ("home_stats", "visitor_stats")
+        }
+    )
+
+
 def find_page_include_word(pdf_document: pymupdf.Document, word: str):
-    for page_num in range(len(pdf_document)):
-        page = pdf_document.load_page(page_num)
-        words = page.get_text("words")
-        for w in words:
-            if word in w[4]:
-                return page_num
-    return -1
+    return find_page_with_text(pdf_document, word)
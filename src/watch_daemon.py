@@ -0,0 +1,332 @@
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from multiprocessing.pool import AsyncResult, Pool
+from pathlib import Path
+
+import click
+import polars as pl
+
+from analyzer import analyze_pdf_in_worker, game_results_to_frame, init_worker
+from checkpoint import FAILURE_REPORT_FILE_NAME, CheckpointJournal
+from logger import logger, set_log_level
+from models import FailureRecord, FailureReport, GameResult
+from summarize_data import summarize_stats, write_summary
+from utils import export_game_result
+
+
+class StableFileTracker:
+    """
+    Detects PDFs whose write has completed.
+
+    A file is considered complete once its size and mtime have not changed for
+    settle_seconds.
+    """
+
+    def __init__(self, settle_seconds: float):
+        self.settle_seconds = settle_seconds
+        self._observed: dict[Path, tuple[int, int, float]] = {}
+
+    def poll(self, watch_dir: Path) -> list[Path]:
+        """
+        Scans watch_dir and returns the PDFs that have become stable.
+
+        Args:
+            watch_dir (Path): The directory to scan.
+
+        Returns:
+            list[Path]: The stable PDFs, including ones returned previously.
+        """
+        now = time.monotonic()
+        stable = []
+        seen = set()
+        for pdf_path in sorted(watch_dir.glob("*.pdf")):
+            try:
+                stat = pdf_path.stat()
+            except FileNotFoundError:
+                continue
+            seen.add(pdf_path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self._observed.get(pdf_path)
+            if previous is None or previous[:2] != signature:
+                self._observed[pdf_path] = (*signature, now)
+                continue
+            if stat.st_size > 0 and now - previous[2] >= self.settle_seconds:
+                stable.append(pdf_path)
+        for pdf_path in set(self._observed) - seen:
+            del self._observed[pdf_path]
+        return stable
+
+    def signature(self, pdf_path: Path) -> tuple[int, int] | None:
+        observed = self._observed.get(pdf_path)
+        return None if observed is None else observed[:2]
+
+
+class IncrementalSummary:
+    """
+    Keeps the per-game stats rows in memory and rebuilds the team summaries
+    from them, so a new game does not require re-reading every CSV.
+    Rows are kept per game, so a re-analyzed game replaces its old rows.
+    """
+
+    def __init__(self, output_dir: Path):
+        # 出力済みのCSV ({試合}_stats_{0,1}.csv) を試合ごとにまとめて読み込む
+        game_frames: dict[str, list[pl.DataFrame]] = {}
+        for csv_path in sorted(output_dir.glob("*_stats_*.csv")):
+            game = csv_path.name.rsplit("_stats_", 1)[0]
+            game_frames.setdefault(game, []).append(pl.read_csv(csv_path))
+        self._frames: dict[str, pl.DataFrame] = {
+            game: pl.concat(frames) for game, frames in game_frames.items()
+        }
+
+    def add_game(self, game: str, game_result: GameResult) -> None:
+        self._frames[game] = game_results_to_frame([game_result])
+
+    def write(self, result_dir: Path) -> None:
+        if not self._frames:
+            return
+        df_concat = pl.concat(self._frames.values(), how="vertical_relaxed")
+        df_team_stats, df_opponent_stats = summarize_stats(df_concat)
+        write_summary(df_team_stats, df_opponent_stats, result_dir)
+
+
+class _InFlight:
+    def __init__(self, async_result: AsyncResult, signature: tuple[int, int] | None):
+        self.async_result = async_result
+        self.signature = signature
+        self.started = time.monotonic()
+
+
+class WatchDaemon:
+    """
+    Watches a drop directory and analyzes each new PDF with a warm worker pool.
+    """
+
+    def __init__(
+        self,
+        watch_dir: Path,
+        config_path: Path,
+        output_dir: Path,
+        result_dir: Path,
+        workers: int,
+        settle_seconds: float,
+        timeout: float,
+    ):
+        self.watch_dir = watch_dir
+        self.config_path = config_path
+        self.output_dir = output_dir
+        self.result_dir = result_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.tracker = StableFileTracker(settle_seconds)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.journal = CheckpointJournal(output_dir, resume=True)
+        self.summary = IncrementalSummary(output_dir)
+        self.failure_report_path = output_dir / FAILURE_REPORT_FILE_NAME
+        # 失敗したPDFは内容が変わるまで再解析しない
+        self.failed: dict[Path, tuple[int, int] | None] = {}
+        self.in_flight: dict[Path, _InFlight] = {}
+        self.pool = self._start_pool()
+
+    def _start_pool(self) -> Pool:
+        return multiprocessing.get_context().Pool(
+            processes=self.workers,
+            initializer=init_worker,
+            initargs=(self.config_path,),
+        )
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+
+    def _submit(self, pdf_path: Path, signature: tuple[int, int] | None) -> None:
+        logger.info("解析を開始します: %s", pdf_path)
+        self.in_flight[pdf_path] = _InFlight(
+            self.pool.apply_async(analyze_pdf_in_worker, (pdf_path,)), signature
+        )
+
+    def _record_failure(
+        self, failure: FailureRecord, signature: tuple[int, int] | None
+    ) -> None:
+        logger.error(
+            "%s の解析に失敗しました。stage=%s %s: %s",
+            failure.pdf_path,
+            failure.stage,
+            failure.exception,
+            failure.message,
+        )
+        self.failed[Path(failure.pdf_path)] = signature
+        failures = []
+        if self.failure_report_path.exists():
+            failures = FailureReport.load_from_json(self.failure_report_path).failures
+        failures = [f for f in failures if f.pdf_path != failure.pdf_path]
+        FailureReport(failures=[*failures, failure]).save_as_json(
+            self.failure_report_path
+        )
+
+    def _restart_pool(self) -> None:
+        """
+        Kills the pool (the only way to stop a hung worker) and resubmits the
+        PDFs that were still running.
+        """
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = self._start_pool()
+        for pdf_path, in_flight in list(self.in_flight.items()):
+            self._submit(pdf_path, in_flight.signature)
+
+    def _collect(self) -> int:
+        completed = 0
+        timed_out = False
+        for pdf_path, in_flight in list(self.in_flight.items()):
+            elapsed = time.monotonic() - in_flight.started
+            if not in_flight.async_result.ready():
+                if elapsed > self.timeout:
+                    del self.in_flight[pdf_path]
+                    self._record_failure(
+                        FailureRecord(
+                            pdf_path=str(pdf_path),
+                            stage="unknown",
+                            exception="TimeoutError",
+                            message=f"exceeded {self.timeout} seconds",
+                            elapsed=round(elapsed, 3),
+                        ),
+                        in_flight.signature,
+                    )
+                    timed_out = True
+                continue
+            del self.in_flight[pdf_path]
+            try:
+                game_result, _ = in_flight.async_result.get()
+            except Exception as exc:  # noqa: BLE001
+                # ワーカー内のどんな例外も、そのPDFの失敗として記録する
+                cause = getattr(exc, "cause", exc)
+                self._record_failure(
+                    FailureRecord(
+                        pdf_path=str(pdf_path),
+                        stage=getattr(exc, "stage", "unknown"),
+                        exception=type(cause).__name__,
+                        message=str(cause),
+                        elapsed=round(elapsed, 3),
+                    ),
+                    in_flight.signature,
+                )
+                continue
+            export_game_result(game_result, pdf_path, self.output_dir)
+            self.journal.record_completed(pdf_path, in_flight.signature)
+            self.summary.add_game(pdf_path.stem, game_result)
+            self.failed.pop(pdf_path, None)
+            completed += 1
+            logger.info("解析が完了しました: %s (%.2fs)", pdf_path, elapsed)
+        if timed_out:
+            self._restart_pool()
+        return completed
+
+    def poll_once(self) -> int:
+        """
+        Submits newly completed PDFs, collects finished results and updates the
+        team summaries if any game was added.
+
+        Returns:
+            int: The number of games completed in this poll.
+        """
+        for pdf_path in self.tracker.poll(self.watch_dir):
+            # 待ち行列で時間切れにならないよう、空いているワーカーの数だけ投入する
+            if len(self.in_flight) >= self.workers:
+                break
+            signature = self.tracker.signature(pdf_path)
+            if (
+                pdf_path in self.in_flight
+                or self.journal.is_completed(pdf_path)
+                or self.failed.get(pdf_path) == signature
+            ):
+                continue
+            self._submit(pdf_path, signature)
+
+        completed = self._collect()
+        if completed:
+            try:
+                self.summary.write(self.result_dir)
+                logger.info("チームスタッツを更新しました: %s", self.result_dir)
+            except Exception as exc:  # noqa: BLE001
+                # 集計に失敗しても監視は続ける
+                logger.error("チームスタッツの更新に失敗しました: %s", exc)
+        return completed
+
+
+@click.command()
+@click.argument("watch_dir", type=Path)
+@click.argument("config_path", type=Path, default="config.json")
+@click.argument("output_dir", type=Path, default="output")
+@click.argument("result_dir", type=Path, default="result")
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="常駐させるワーカープロセスの数",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help="監視ディレクトリを確認する間隔(秒)",
+)
+@click.option(
+    "--settle-seconds",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="サイズと更新時刻がこの秒数変化しなければ書き込み完了とみなす",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=120.0,
+    show_default=True,
+    help="1つのPDFの解析に許容する秒数",
+)
+def main(
+    watch_dir: Path,
+    config_path: Path,
+    output_dir: Path,
+    result_dir: Path,
+    log_level: str,
+    workers: int,
+    poll_interval: float,
+    settle_seconds: float,
+    timeout: float,
+):
+    set_log_level(log_level)
+    daemon = WatchDaemon(
+        watch_dir,
+        config_path,
+        output_dir,
+        result_dir,
+        workers=workers,
+        settle_seconds=settle_seconds,
+        timeout=timeout,
+    )
+    # SIGTERMでもワーカープールを片付けてから終了する
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    logger.info("%s の監視を開始します。", watch_dir)
+    try:
+        while True:
+            daemon.poll_once()
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        logger.info("監視を終了します。")
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,170 @@
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+import numpy as np
+import polars as pl
+
+from logger import set_log_level
+
+if TYPE_CHECKING:
+    from models import Stats
+
+# main_multi.pyが試合ごとに書き出す、各プレイの獲得ヤードのParquet
+YARDS_GLOB = "*_yards.parquet"
+YARDS_SCHEMA = {
+    "team_name": pl.String,
+    "opponent_name": pl.String,
+    "play_type": pl.String,
+    "yards": pl.List(pl.Int16),
+}
+PLAY_TYPES = ("run", "pass")
+# 爆発的プレイの表の既定のしきい値
+DEFAULT_THRESHOLDS = tuple(range(5, 45, 5))
+
+
+def count_above(
+    sorted_yards: np.ndarray, thresholds: Sequence[int] | np.ndarray
+) -> np.ndarray:
+    """
+    Returns, for every threshold, the number of plays gaining more than it.
+
+    Args:
+        sorted_yards (np.ndarray): The yards of the plays in ascending order.
+        thresholds (Sequence[int] | np.ndarray): Any number of thresholds.
+
+    Returns:
+        np.ndarray: One count per threshold.
+    """
+    return len(sorted_yards) - np.searchsorted(
+        sorted_yards, np.asarray(thresholds), side="right"
+    )
+
+
+def yards_to_frame(stats_list: Iterable["Stats"]) -> pl.DataFrame:
+    """
+    Returns the run and pass yards of each team of a game as sorted arrays,
+    one row per team and play type.
+    """
+    return pl.DataFrame(
+        [
+            {
+                "team_name": stats.team_stats_info.team_name,
+                "opponent_name": stats.team_stats_info.opponent_name,
+                "play_type": play_type,
+                "yards": sorted(yards),
+            }
+            for stats in stats_list
+            for play_type, yards in zip(PLAY_TYPES, (stats.run_yards, stats.pass_yards))
+        ],
+        schema=YARDS_SCHEMA,
+    )
+
+
+def load_yard_distributions(folders: Iterable[Path]) -> pl.DataFrame:
+    """
+    Merges the per-game yard arrays of the given output folders into one
+    sorted array per team and play type.
+
+    Returns:
+        pl.DataFrame: team_name, play_type, games and yards (sorted).
+    """
+    files = sorted(
+        file_path for folder in folders for file_path in Path(folder).glob(YARDS_GLOB)
+    )
+    if not files:
+        raise ValueError("獲得ヤードのParquetが見つかりません")
+    return (
+        pl.scan_parquet(files)
+        .group_by("team_name", "play_type")
+        .agg(
+            pl.len().alias("games"),
+            # 空のリストはflattenでnullになるため落とす
+            pl.col("yards").flatten().drop_nulls().sort(),
+        )
+        .sort("team_name", "play_type")
+        .collect()
+    )
+
+
+def sweep_thresholds(
+    distributions: pl.DataFrame, thresholds: Sequence[int] = DEFAULT_THRESHOLDS
+) -> pl.DataFrame:
+    """
+    Returns the number of plays over each threshold for every team and play
+    type, e.g. the explosive-play table for 5 to 40 yards.
+
+    Every team's counts for all thresholds come from one searchsorted over
+    its sorted yards, so changing or adding thresholds never needs the PDFs.
+
+    Args:
+        distributions (pl.DataFrame): The output of load_yard_distributions.
+        thresholds (Sequence[int]): The thresholds; a play counts when it
+            gains more than the threshold, as big_run_count does.
+
+    Returns:
+        pl.DataFrame: team_name, play_type, games, plays and one over_<n>
+            column per threshold.
+    """
+    counts = np.array(
+        [
+            count_above(np.asarray(yards), thresholds)
+            for yards in distributions["yards"].to_list()
+        ],
+        dtype=np.int64,
+    ).reshape(len(distributions), len(thresholds))
+    return distributions.select(
+        "team_name",
+        "play_type",
+        "games",
+        pl.col("yards").list.len().alias("plays"),
+    ).with_columns(
+        pl.Series(f"over_{threshold}", counts[:, column])
+        for column, threshold in enumerate(thresholds)
+    )
+
+
+@click.command()
+@click.argument("folders", nargs=-1, required=True, type=Path)
+@click.option(
+    "--thresholds",
+    default=",".join(map(str, DEFAULT_THRESHOLDS)),
+    show_default=True,
+    help="カンマ区切りのしきい値(ヤード)",
+)
+@click.option(
+    "--play-type", type=click.Choice(PLAY_TYPES), default=None, help="ラン/パスのみ"
+)
+@click.option("--output", type=Path, default=None, help="結果を書き出すCSV")
+@click.option(
+    "--log-level",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    default="INFO",
+)
+def main(
+    folders: tuple[Path, ...],
+    thresholds: str,
+    play_type: str | None,
+    output: Path | None,
+    log_level: str,
+):
+    """
+    Big-play counts over any thresholds from the per-game yard arrays in
+    FOLDERS, without re-reading the PDFs.
+    """
+    set_log_level(log_level)
+    table = sweep_thresholds(
+        load_yard_distributions(folders),
+        [int(threshold) for threshold in thresholds.split(",")],
+    )
+    if play_type:
+        table = table.filter(play_type=play_type)
+    if output:
+        table.write_csv(output)
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        click.echo(table)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -1,7 +1,9 @@
+import json
 import subprocess
 import shutil
 import pandas as pd
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tempfile
 import os
@@ -202,6 +204,156 @@ class TestE2EPipeline:
             "opponent_stats.csv",
         )
 
+    def test_pipeline_with_result_comparison(self):
+        """pipeline.pyの実行と結果比較テスト（中間ファイルを書き出さない）"""
+        result = subprocess.run(
+            [
+                "uv",
+                "run",
+                "src/pipeline.py",
+                "test/data",
+                "config.json",
+                str(self.temp_result_dir),
+            ],
+            capture_output=True,
+            text=True,
+            cwd=Path.cwd(),
+            check=False,
+        )
+
+        assert result.returncode == 0, f"pipeline.py failed: {result.stderr}"
+        assert sorted(p.name for p in self.temp_result_dir.iterdir()) == [
+            "opponent_stats.csv",
+            "team_stats.csv",
+        ]
+
+        expected_result_dir = Path("test/data/result")
+        self.compare_csv_files(
+            self.temp_result_dir / "team_stats.csv",
+            expected_result_dir / "team_stats.csv",
+            "team_stats.csv",
+        )
+        self.compare_csv_files(
+            self.temp_result_dir / "opponent_stats.csv",
+            expected_result_dir / "opponent_stats.csv",
+            "opponent_stats.csv",
+        )
+
+    def test_main_ndjson_from_stdin(self):
+        """main.pyが標準入力のPDFを読み、JSON Linesで結果を出力することを確認"""
+        result = subprocess.run(
+            [
+                "uv",
+                "run",
+                str(Path.cwd() / "src/main.py"),
+                "-",
+                str(Path.cwd() / "config.json"),
+                "--ndjson",
+            ],
+            input=Path("test/data/test1.pdf").read_bytes(),
+            capture_output=True,
+            cwd=Path.cwd(),
+            check=False,
+        )
+
+        assert result.returncode == 0, f"main.py failed: {result.stderr}"
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [(r["game"], r["side"]) for r in records] == [
+            ("stdin", "home"),
+            ("stdin", "visitor"),
+        ]
+        assert records[0]["team_stats_info_team_name"] == "富士通フロンティアーズ"
+        assert records[1]["team_score"] == 14
+
+    def test_main_rejects_path_list_without_ndjson(self):
+        """main.pyが複数のパスを受け取ったとき、何も書き出す前にエラーにすることを確認"""
+        shutil.copy("teams.json", self.temp_output_dir / "teams.json")
+        result = subprocess.run(
+            [
+                "uv",
+                "run",
+                str(Path.cwd() / "src/main.py"),
+                "-",
+                str(Path.cwd() / "config.json"),
+            ],
+            input="\n".join(
+                str(Path.cwd() / "test/data" / name)
+                for name in ("test1.pdf", "test2.pdf")
+            ),
+            capture_output=True,
+            text=True,
+            cwd=self.temp_output_dir,
+            check=False,
+        )
+
+        assert result.returncode != 0
+        assert "--ndjson" in result.stderr
+        assert sorted(p.name for p in self.temp_output_dir.iterdir()) == ["teams.json"]
+
+    def test_main_multi_ndjson(self):
+        """main_multi.pyがCSVを書かずにJSON Linesで全試合の結果を出力することを確認"""
+        result = subprocess.run(
+            [
+                "uv",
+                "run",
+                "src/main_multi.py",
+                "test/data",
+                "config.json",
+                str(self.temp_output_dir),
+                "--ndjson",
+                "--workers",
+                "3",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=Path.cwd(),
+            check=False,
+        )
+
+        assert result.returncode == 0, f"main_multi.py failed: {result.stderr}"
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert sorted((r["game"], r["side"]) for r in records) == [
+            (game, side)
+            for game in ("test1", "test2", "test3")
+            for side in ("home", "visitor")
+        ]
+        assert not list(self.temp_output_dir.glob("*.csv"))
+        # CSVを書かない実行は、CSVの--resumeが使うジャーナルに記録しない
+        assert not (self.temp_output_dir / "journal.jsonl").exists()
+
+    def test_main_ndjson_streams_paths_from_stdin(self):
+        """main.pyが標準入力のパスを、入力の終わりを待たずに1行ずつ解析することを確認"""
+        process = subprocess.Popen(
+            [
+                "uv",
+                "run",
+                "src/main.py",
+                "-",
+                "config.json",
+                "--ndjson",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=Path.cwd(),
+        )
+        try:
+            process.stdin.write(b"test/data/test1.pdf\n")
+            process.stdin.flush()
+            # 標準入力を閉じる前に最初の試合の結果が届く
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                first_line = executor.submit(process.stdout.readline).result(
+                    timeout=120
+                )
+            assert json.loads(first_line)["game"] == "test1"
+            process.stdin.write(b"test/data/test2.pdf\n")
+            process.stdin.close()
+            games = [json.loads(line)["game"] for line in process.stdout]
+            assert games == ["test1", "test2", "test2"]
+        finally:
+            process.kill()
+            process.wait()
+
     def test_config_file_usage(self):
         """config.jsonが正しく使用されることを確認"""
         # config.jsonの存在確認